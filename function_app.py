@@ -80,12 +80,11 @@ def test(req: func.HttpRequest) -> func.HttpResponse:
     logger.debug(f"Selectors: {selectors_str}")
 
     if selectors:
-        instructions = dc.read_instruction_files()
-        bookings = dc.get_all_bb_posts()
-        asset_stock_accounts = dc.get_all_bb_accounts()
-        expected_bookings = dc.read_expected_bookings()
+        # Instructions, postings and expected bookings are loaded concurrently, only for the selected sendings
+        inputs = dc.load_report_inputs(trigger_selector=selectors)
+        instructions = inputs['instructions']
         reports = dc.build_reports(
-            bookings, expected_bookings, instructions, asset_stock_accounts)
+            inputs['bookings'], inputs['expected_bookings'], instructions)
         dc.send_reports(reports,
                         instructions['distribution'],
                         trigger_selector=selectors,
@@ -181,12 +180,11 @@ def reportrequest(req: func.HttpRequest) -> func.HttpResponse:
     logger.debug(f"Selectors: {selectors_str}")
 
     if selectors:
-        instructions = dc.read_instruction_files()
-        bookings = dc.get_all_bb_posts()
-        asset_stock_accounts = dc.get_all_bb_accounts()
-        expected_bookings = dc.read_expected_bookings()
+        # Instructions, postings and expected bookings are loaded concurrently, only for the selected sendings
+        inputs = dc.load_report_inputs(trigger_selector=selectors)
+        instructions = inputs['instructions']
         reports = dc.build_reports(
-            bookings, expected_bookings, instructions, asset_stock_accounts)
+            inputs['bookings'], inputs['expected_bookings'], instructions)
         dc.send_reports(reports,
                         instructions['distribution'],
                         trigger_selector=selectors,
@@ -215,3 +213,42 @@ def reportrequest(req: func.HttpRequest) -> func.HttpResponse:
     html_page = replace_and_format_html_template(html_page, replace_data)
 
     return func.HttpResponse(html_page, mimetype="text/html", status_code=200)
+
+
+# # # # # # # # # # # # # # # # # # # # # # # # # # # #
+#
+#   Blob triggers, the workbooks are compiled into snapshots when they are uploaded,
+#   so the HTTP functions only load the snapshots instead of parsing Excel files
+#
+# # # # # # # # # # # # # # # # # # # # # # # # # # # #
+
+def compile_workbook_snapshot(workbook: func.InputStream, kind: str):
+    logger = logging.getLogger(__name__)
+    logger.setLevel(logging.INFO)
+    logger.info(f"Workbook {workbook.name} changed, compiling the {kind} snapshot.")
+
+    dc = DevIntConnector(parent_logger=logger,
+                         settings_file="hrmlib/devint_settings.yaml")
+    config = SecretsAndSettingsManager(parent_logger=logger)
+    dc.setup(config)
+
+    # The host already downloaded the workbook, it is only downloaded again if a newer version was uploaded since
+    blob_name = workbook.name.split('/', 1)[-1]
+    etag = (workbook.blob_properties or {}).get('ETag')
+    workbook_contents = {blob_name: (etag, workbook.read())}
+    if kind == 'instructions':
+        dc.read_instruction_files(workbook_contents=workbook_contents)
+    else:
+        dc.read_expected_bookings(workbook_contents=workbook_contents)
+
+
+@app.blob_trigger(arg_name="workbook", path="templates/{name}.xlsx",
+                  connection="AzureWebJobsStorage", source=func.BlobSource.EVENT_GRID)
+def compileinstructions(workbook: func.InputStream):
+    compile_workbook_snapshot(workbook, 'instructions')
+
+
+@app.blob_trigger(arg_name="workbook", path="financialplanning/Expected Bookings.xlsx",
+                  connection="AzureWebJobsStorage", source=func.BlobSource.EVENT_GRID)
+def compileexpectedbookings(workbook: func.InputStream):
+    compile_workbook_snapshot(workbook, 'expected_bookings')
@@ -0,0 +1,114 @@
+import hashlib
+import heapq
+import json
+import logging
+import math
+from bisect import bisect_right
+
+import numpy as np
+
+
+class AccountClassifier:
+    """
+    Interval index over a Kontenrahmen for classifying posting accounts.
+
+    A Kontenrahmen is a list of account ranges (accountRangeStart to accountRangeEnd) with the types and
+    categories of their accounts. If ranges overlap, the first one in the list applies. The ranges are split
+    once into disjoint segments, each owned by the first range covering it, so an account is classified by
+    bisecting the segment starts instead of scanning the list:
+    - classify(account): the Kontenrahmen entry of a single account number
+    - classify_array(accounts): the entry positions of a whole account number column at once
+
+    Attributes:
+    kontenrahmen (list): The Kontenrahmen entries, in their original order.
+    fingerprint (str): Hash of the entries, changes whenever the classification of any account can change.
+    categories (list): The categories of each entry, without empty ones.
+    segment_starts (np.ndarray): First account number of each segment, sorted.
+    segment_ends (np.ndarray): Last account number of each segment.
+    segment_entries (np.ndarray): Position of the entry owning each segment.
+    """
+
+    def __init__(self, kontenrahmen: list, parent_logger=None):
+        try:
+            if parent_logger is not None:
+                self.logger = parent_logger.getChild(__class__.__name__)
+            else:
+                self.logger = logging.getLogger(
+                    f"{__name__}.{__class__.__name__}")
+        except:
+            self.logger = logging.getLogger(__name__)
+
+        self.kontenrahmen = kontenrahmen
+        self.fingerprint = hashlib.sha256(json.dumps(
+            kontenrahmen, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+        self.categories = [[category for category in (entry.get('category1'), entry.get('category2'), entry.get('category3'))
+                            if category] for entry in kontenrahmen]
+
+        # Account numbers are integers, a range covers the integers between its limits
+        ranges = []
+        for position, entry in enumerate(kontenrahmen):
+            try:
+                start = math.ceil(entry['accountRangeStart'])
+                end = math.floor(entry['accountRangeEnd'])
+            except (KeyError, TypeError, ValueError, OverflowError):
+                self.logger.debug(
+                    f"Kontenrahmen entry {position} has no valid account range, it is ignored.")
+                continue
+            if start <= end:
+                ranges.append((start, end, position))
+
+        # Sweep over the range limits, the active range with the lowest position owns each segment
+        boundaries = sorted({start for start, _, _ in ranges} | {end + 1 for _, end, _ in ranges})
+        ranges.sort()
+        active = []
+        next_range = 0
+        segments = []
+        for segment_start, segment_next in zip(boundaries, boundaries[1:]):
+            while next_range < len(ranges) and ranges[next_range][0] <= segment_start:
+                heapq.heappush(active, (ranges[next_range][2], ranges[next_range][1]))
+                next_range += 1
+            while active and active[0][1] < segment_start:
+                heapq.heappop(active)
+            if not active:
+                continue
+            position = active[0][0]
+            if segments and segments[-1][2] == position and segments[-1][1] == segment_start - 1:
+                segments[-1][1] = segment_next - 1
+            else:
+                segments.append([segment_start, segment_next - 1, position])
+
+        self.segment_starts = np.array([segment[0] for segment in segments], dtype=np.int64)
+        self.segment_ends = np.array([segment[1] for segment in segments], dtype=np.int64)
+        self.segment_entries = np.array([segment[2] for segment in segments], dtype=np.int64)
+        self._starts = self.segment_starts.tolist()
+        self.logger.debug(
+            f"Indexed {len(kontenrahmen)} Kontenrahmen entries in {len(segments)} segments.")
+
+    def position(self, account: int) -> int:
+        """
+        Returns the position of the Kontenrahmen entry of an account number, -1 if no range covers it.
+        """
+        segment = bisect_right(self._starts, account) - 1
+        if segment < 0 or account > self.segment_ends[segment]:
+            return -1
+        return int(self.segment_entries[segment])
+
+    def classify(self, account: int):
+        """
+        Returns the Kontenrahmen entry of an account number, None if no range covers it.
+        """
+        position = self.position(account)
+        return self.kontenrahmen[position] if position >= 0 else None
+
+    def classify_array(self, accounts) -> np.ndarray:
+        """
+        Returns the positions of the Kontenrahmen entries of an array of account numbers, -1 where no range covers it.
+        """
+        accounts = np.asarray(accounts, dtype=np.int64)
+        if len(self.segment_starts) == 0:
+            return np.full(len(accounts), -1, dtype=np.int64)
+        segments = np.searchsorted(self.segment_starts, accounts, side='right') - 1
+        valid = segments >= 0
+        segments = np.where(valid, segments, 0)
+        valid &= accounts <= self.segment_ends[segments]
+        return np.where(valid, self.segment_entries[segments], -1)
@@ -0,0 +1,473 @@
+import logging
+import json
+import sys
+import codecs
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.auth import HTTPBasicAuth
+
+
+class CircuitOpenError(requests.exceptions.ConnectionError):
+    """Raised without sending a request while the circuit breaker of a RequestScheduler is open."""
+
+
+class RequestScheduler:
+    """
+    Paces, retries and guards all requests to one API host.
+
+    - A token bucket limits the request rate. On a 429 response the rate is halved and all requests pause
+      for the Retry-After time, while every successful response slowly raises the rate again.
+    - Failed attempts (connection errors, timeouts, 429, 5xx and HTML error pages) are retried with
+      exponential backoff and full jitter.
+    - A circuit breaker opens after a series of consecutive HTML or 5xx answers and then fails fast with
+      CircuitOpenError until reset_seconds have passed. The next request after that is a trial request.
+
+    Use RequestScheduler.for_host() to share one scheduler between all clients of the same API.
+
+    Attributes:
+    logger (logging.Logger): The logger to use for logging messages.
+    rate (float): Current requests per second.
+    """
+
+    _shared = {}
+    _shared_lock = threading.Lock()
+
+    def __init__(self,
+                 rate: float = 5,
+                 burst: int = 5,
+                 min_rate: float = 0.5,
+                 max_retries: int = 3,
+                 backoff_factor: float = 0.5,
+                 max_backoff: float = 30,
+                 failure_threshold: int = 5,
+                 reset_seconds: float = 60,
+                 parent_logger=None):
+        """
+        Initializes the RequestScheduler.
+
+        Parameters:
+        rate (float, optional): Requests per second to start with, also the maximum rate. Default is 5.
+        burst (int, optional): Number of requests which may be sent at once. Default is 5.
+        min_rate (float, optional): The rate is never lowered below this. Default is 0.5.
+        max_retries (int, optional): Number of retries of a failed request. Default is 3.
+        backoff_factor (float, optional): Base of the exponential backoff in seconds. Default is 0.5.
+        max_backoff (float, optional): Upper limit of a single backoff or Retry-After pause in seconds. Default is 30.
+        failure_threshold (int, optional): Consecutive HTML or 5xx answers which open the circuit. Default is 5.
+        reset_seconds (float, optional): How long the circuit stays open. Default is 60.
+        parent_logger (logging.Logger, optional): The parent logger. If none is provided, a new logger is created.
+        """
+        try:
+            if parent_logger is not None:
+                self.logger = parent_logger.getChild(__class__.__name__)
+            else:
+                self.logger = logging.getLogger(
+                    f"{__name__}.{__class__.__name__}")
+        except:
+            self.logger = logging.getLogger(__name__)
+
+        self.max_rate = rate
+        self.rate = rate
+        self.burst = max(1, burst)
+        self.min_rate = min(min_rate, rate)
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.max_backoff = max_backoff
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+
+        self.lock = threading.Lock()
+        self.tokens = float(self.burst)
+        self.refilled_at = time.monotonic()
+        self.paused_until = 0.0
+        self.consecutive_failures = 0
+        self.opened_at = None
+
+    @classmethod
+    def for_host(cls, base_url: str, **kwargs) -> "RequestScheduler":
+        """Returns the scheduler shared by all clients of base_url, creating it with kwargs on first use."""
+        base_url = base_url.rstrip('/')
+        with cls._shared_lock:
+            if base_url not in cls._shared:
+                cls._shared[base_url] = cls(**kwargs)
+            return cls._shared[base_url]
+
+    def acquire(self):
+        """Blocks until the circuit allows a request and a token is available."""
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                if self.opened_at is not None:
+                    if now - self.opened_at < self.reset_seconds:
+                        raise CircuitOpenError(
+                            f"Circuit open after {self.consecutive_failures} consecutive API failures, "
+                            f"retry in {self.reset_seconds - (now - self.opened_at):.0f} seconds.")
+                    # half open: let this request through as a trial, the next failure opens the circuit again
+                    self.opened_at = None
+                    self.consecutive_failures = self.failure_threshold - 1
+                self.tokens = min(self.burst, self.tokens +
+                                  (now - self.refilled_at) * self.rate)
+                self.refilled_at = now
+                if now >= self.paused_until and self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = max(self.paused_until - now,
+                           (1 - self.tokens) / self.rate)
+            time.sleep(wait)
+
+    def record_success(self):
+        with self.lock:
+            self.consecutive_failures = 0
+            # additive increase, about one request per second more after every 'rate' successes
+            self.rate = min(self.max_rate, self.rate + 1 / max(self.rate, 1))
+
+    def record_failure(self):
+        """Registers an HTML or 5xx answer, which counts towards opening the circuit."""
+        with self.lock:
+            self.consecutive_failures += 1
+            if self.consecutive_failures >= self.failure_threshold and self.opened_at is None:
+                self.opened_at = time.monotonic()
+                self.logger.warning(
+                    f"Opening circuit for {self.reset_seconds} seconds after {self.consecutive_failures} consecutive API failures.")
+
+    def record_throttled(self, retry_after: float = None):
+        """Registers a 429 answer, halves the rate and pauses all requests for retry_after seconds."""
+        with self.lock:
+            self.rate = max(self.min_rate, self.rate / 2)
+            pause = min(self.max_backoff, retry_after if retry_after is not None else 1 / self.rate)
+            self.paused_until = max(self.paused_until, time.monotonic() + pause)
+            self.tokens = 0
+            self.logger.info(
+                f"Throttled by the API, pausing {pause:.1f} seconds and lowering the rate to {self.rate:.2f} requests per second.")
+
+    def backoff(self, attempt: int) -> float:
+        """Exponential backoff with full jitter for the given (0 based) retry attempt."""
+        return random.uniform(0, min(self.max_backoff, self.backoff_factor * 2 ** attempt))
+
+    @staticmethod
+    def retry_after_seconds(response) -> float:
+        """Parses the Retry-After header (seconds or HTTP date), None if it is missing or invalid."""
+        value = response.headers.get('Retry-After')
+        if not value:
+            return None
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            pass
+        try:
+            return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+        except (TypeError, ValueError):
+            return None
+
+    @staticmethod
+    def is_html(response) -> bool:
+        return 'text/html' in response.headers.get('Content-Type', '').lower()
+
+
+class BBClient:
+    """
+    Reusable HTTP client for the BuchhaltungsButler API.
+
+    All requests go through one requests.Session, so connections are pooled and kept alive between
+    pages instead of doing a new TCP and TLS handshake per request. Requests are paced and retried by the
+    RequestScheduler shared by all clients of the same base URL (see RequestScheduler).
+
+    Two authentication styles are supported:
+    - header authentication with the 'Authorization' header and the 'bbutler' cookie (webapp API)
+    - HTTP Basic authentication with API client and API secret (app API)
+
+    Attributes:
+    logger (logging.Logger): The logger to use for logging messages.
+    base_url (str): The base URL of the API, requests are sent to base_url + endpoint.
+    api_key (str): The BB API key, added to the payload of every request.
+    session (requests.Session): The pooled session used for all requests.
+    scheduler (RequestScheduler): Rate limiter, retry scheduler and circuit breaker of the requests.
+    """
+
+    def __init__(self,
+                 base_url: str = "https://webapp.buchhaltungsbutler.de/api/v1",
+                 api_key: str = None,
+                 authorization: str = None,
+                 cookie: str = None,
+                 api_client: str = None,
+                 api_secret: str = None,
+                 api_version: str = None,
+                 json_payload: bool = True,
+                 timeout: float = 20,
+                 connect_timeout: float = 5,
+                 max_retries: int = 3,
+                 backoff_factor: float = 0.5,
+                 pool_maxsize: int = 10,
+                 scheduler: RequestScheduler = None,
+                 parent_logger=None):
+        """
+        Initializes the BBClient.
+
+        Parameters:
+        base_url (str, optional): The base URL of the API. Default is the webapp API.
+        api_key (str, optional): The BB API key, added as 'api_key' to every payload.
+        authorization (str, optional): Value of the 'Authorization' header for header authentication.
+        cookie (str, optional): Value of the 'bbutler' cookie for header authentication.
+        api_client (str, optional): The API client id for HTTP Basic authentication.
+        api_secret (str, optional): The API secret for HTTP Basic authentication.
+        api_version (str, optional): Sent as 'X-API-Version' header if given.
+        json_payload (bool, optional): Send payloads JSON encoded (True) or form encoded (False). Default is True.
+        timeout (float, optional): Read timeout in seconds. Default is 20.
+        connect_timeout (float, optional): Connect timeout in seconds. Default is 5.
+        max_retries (int, optional): Number of retries for transient failures. Default is 3.
+        backoff_factor (float, optional): Backoff factor between retries in seconds. Default is 0.5.
+        pool_maxsize (int, optional): Number of pooled connections, should be at least the number of concurrent requests. Default is 10.
+        scheduler (RequestScheduler, optional): The scheduler to use. Default is the one shared for base_url,
+            created with max_retries and backoff_factor if it does not exist yet.
+        parent_logger (logging.Logger, optional): The parent logger. If none is provided, a new logger is created.
+        """
+        try:
+            if parent_logger is not None:
+                self.logger = parent_logger.getChild(__class__.__name__)
+            else:
+                self.logger = logging.getLogger(
+                    f"{__name__}.{__class__.__name__}")
+        except:
+            self.logger = logging.getLogger(__name__)
+
+        self.base_url = base_url.rstrip('/')
+        self.api_key = api_key
+        self.json_payload = json_payload
+        self.timeout = (connect_timeout, timeout)
+
+        # Retries are done by the scheduler, which also paces and guards them
+        self.scheduler = scheduler or RequestScheduler.for_host(
+            self.base_url, max_retries=max_retries, backoff_factor=backoff_factor,
+            parent_logger=parent_logger)
+        adapter = HTTPAdapter(pool_connections=1,
+                              pool_maxsize=pool_maxsize, max_retries=0)
+
+        self.session = requests.Session()
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        self.session.headers.update({
+            'Content-Type': 'application/json' if json_payload else 'application/x-www-form-urlencoded',
+            'Accept': 'application/json',
+            'Accept-Encoding': 'gzip, deflate',
+            'Connection': 'keep-alive'
+        })
+        if api_version:
+            self.session.headers['X-API-Version'] = api_version
+
+        if api_client and api_secret:
+            self.session.auth = HTTPBasicAuth(api_client, api_secret)
+        if authorization:
+            self.session.headers['Authorization'] = authorization
+        if cookie:
+            self.session.headers['Cookie'] = 'bbutler=' + cookie
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        self.session.close()
+
+    def post(self, endpoint: str, payload: dict = None, timeout=None, **kwargs) -> requests.Response:
+        """
+        Sends a POST request to the API.
+
+        Parameters:
+        endpoint (str): The API endpoint, e.g. '/postings/get'.
+        payload (dict, optional): The request parameters. The API key is added automatically.
+        timeout (float or tuple, optional): Overrides the client's timeout for this request.
+        kwargs: Passed on to requests.Session.post, e.g. stream=True.
+
+        Returns:
+        requests.Response: The first successful response, or the response of the last attempt.
+
+        Raises:
+        CircuitOpenError: If the circuit breaker is open because the API keeps failing.
+        requests.RequestException: If the last attempt failed without a response (e.g. a timeout).
+        """
+        data = {'api_key': self.api_key} if self.api_key else {}
+        data.update(payload or {})
+        url = f"{self.base_url}{endpoint}"
+        scheduler = self.scheduler
+
+        for attempt in range(scheduler.max_retries + 1):
+            last_attempt = attempt == scheduler.max_retries
+            scheduler.acquire()
+            self.logger.debug(f"POST {endpoint}")
+            try:
+                response = self.session.post(
+                    url,
+                    data=json.dumps(data) if self.json_payload else data,
+                    timeout=timeout or self.timeout,
+                    **kwargs)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                if last_attempt:
+                    raise
+                self.logger.warning(
+                    f"POST {endpoint} failed ({e.__class__.__name__}), retrying.")
+                time.sleep(scheduler.backoff(attempt))
+                continue
+
+            if response.status_code == 429:
+                # acquire() waits for the Retry-After pause before the next attempt
+                scheduler.record_throttled(
+                    scheduler.retry_after_seconds(response))
+                pause = 0
+            elif response.status_code >= 500 or scheduler.is_html(response):
+                scheduler.record_failure()
+                pause = scheduler.backoff(attempt)
+            else:
+                scheduler.record_success()
+                return response
+            if last_attempt:
+                return response
+            self.logger.warning(
+                f"POST {endpoint} answered with status {response.status_code} ({response.headers.get('Content-Type')}), retrying.")
+            response.close()
+            time.sleep(pause)
+
+    def post_json(self, endpoint: str, payload: dict = None, timeout=None) -> dict:
+        """
+        Sends a POST request and decodes the JSON response.
+
+        Returns:
+        dict: The decoded response.
+
+        Raises:
+        requests.HTTPError: If the API answered with an error status.
+        ValueError: If the response is not valid JSON.
+        """
+        response = self.post(endpoint, payload, timeout=timeout)
+        response.raise_for_status()
+        return response.json()
+
+
+class _JSONStreamReader:
+    """Reads JSON values one by one from a chunked text stream, keeping only the unread rest in memory."""
+
+    whitespace = ' \t\n\r'
+
+    def __init__(self, chunks):
+        self.chunks = chunks
+        self.text_decoder = codecs.getincrementaldecoder('utf-8')()
+        self.json_decoder = json.JSONDecoder()
+        self.buffer = ''
+        self.pos = 0
+        self.exhausted = False
+
+    def read_more(self) -> bool:
+        if self.exhausted:
+            return False
+        self.buffer = self.buffer[self.pos:]
+        self.pos = 0
+        for chunk in self.chunks:
+            text = self.text_decoder.decode(chunk)
+            if text:
+                self.buffer += text
+                return True
+        self.buffer += self.text_decoder.decode(b'', final=True)
+        self.exhausted = True
+        return False
+
+    def peek(self) -> str:
+        """Return the next non-whitespace character without consuming it, '' at the end of the stream."""
+        while True:
+            while self.pos < len(self.buffer) and self.buffer[self.pos] in self.whitespace:
+                self.pos += 1
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self.read_more():
+                return ''
+
+    def expect(self, chars: str) -> str:
+        char = self.peek()
+        if not char or char not in chars:
+            raise ValueError(
+                f"Expected one of {chars!r} in JSON stream but found {char!r}.")
+        self.pos += 1
+        return char
+
+    def decode_value(self):
+        self.peek()
+        while True:
+            try:
+                value, end = self.json_decoder.raw_decode(
+                    self.buffer, self.pos)
+                # a value touching the end of the buffer may be cut off (e.g. a number), so read on
+                if end < len(self.buffer) or self.exhausted:
+                    self.pos = end
+                    return value
+            except json.JSONDecodeError:
+                if self.exhausted:
+                    raise ValueError("Invalid or truncated JSON in stream.")
+            self.read_more()
+
+
+def stream_json_array(response, array_key: str = 'data', record_hook=None, chunk_size: int = 65536):
+    """
+    Yields the elements of one array of a JSON object response while it is being downloaded.
+
+    Only the current chunk and the current element are held in memory, the response body is never
+    materialised as a whole string or as one decoded dict tree.
+
+    Parameters:
+    response (requests.Response): A response requested with stream=True.
+    array_key (str, optional): The key of the top level array to stream. Default is 'data'.
+    record_hook (callable, optional): Applied to every element before it is yielded, e.g. compact_record.
+    chunk_size (int, optional): Size of the byte chunks read from the connection. Default is 65536.
+
+    Yields:
+    The (hooked) elements of the array.
+
+    Raises:
+    ValueError: If the body is not a JSON object (e.g. an HTML error page) or does not contain the array.
+    """
+    reader = _JSONStreamReader(response.iter_content(chunk_size=chunk_size))
+    try:
+        reader.expect('{')
+        found = False
+        if reader.peek() == '}':
+            reader.pos += 1
+        else:
+            while True:
+                key = reader.decode_value()
+                reader.expect(':')
+                if key == array_key and reader.peek() == '[':
+                    found = True
+                    reader.pos += 1
+                    if reader.peek() == ']':
+                        reader.pos += 1
+                    else:
+                        while True:
+                            element = reader.decode_value()
+                            yield record_hook(element) if record_hook else element
+                            if reader.expect(',]') == ']':
+                                break
+                else:
+                    reader.decode_value()
+                if reader.expect(',}') == '}':
+                    break
+        if not found:
+            raise ValueError(
+                f"JSON response does not contain a '{array_key}' array.")
+    finally:
+        response.close()
+
+
+def compact_record(record: dict, max_interned_length: int = 24, fields=None) -> dict:
+    """
+    Returns a memory lean copy of a decoded record.
+
+    Keys and short string values (dates, account numbers, codes, currencies, amounts) are interned, so the
+    many repetitions across thousands of postings share one string object instead of one copy each.
+    If fields are given, all other fields are dropped.
+    """
+    intern = sys.intern
+    return {intern(key): intern(value) if isinstance(value, str) and len(value) <= max_interned_length else value
+            for key, value in record.items() if fields is None or key in fields}
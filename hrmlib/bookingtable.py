@@ -0,0 +1,181 @@
+import logging
+from collections.abc import Sequence
+
+import numpy as np
+import pandas as pd
+
+
+class BookingTable(Sequence):
+    """
+    Columnar in-memory representation of BB postings.
+
+    The postings are parsed once into typed NumPy columns, so the report stages can filter, group and sum
+    without re-parsing the amount and date strings of every booking at every use:
+    - amount_cents (int64): the amount in cents
+    - date (datetime64[s]): the posting date
+    - debit_account, credit_account (int32): the posting account numbers, -1 if missing
+    - categorical codes (int32) for cost location, currency and the booking types, -1 if missing
+
+    The table is a sequence of the original posting dicts, so code that iterates over bookings, indexes them
+    or reads booking['amount'] keeps working unchanged and can be migrated to the columns step by step.
+    Subsets created with take() share the records and the categories of the table they are taken from.
+
+    Attributes:
+    records (list): The posting dicts, in table order.
+    amount_cents (np.ndarray): Amounts in cents.
+    date (np.ndarray): Posting dates.
+    debit_account (np.ndarray): Debit posting account numbers.
+    credit_account (np.ndarray): Credit posting account numbers.
+    codes (dict): Categorical codes per categorical field.
+    categories (dict): pd.Index of the category values per categorical field.
+    """
+
+    categorical_fields = ('cost_location', 'currency',
+                          'debit_booking_type_1', 'debit_booking_type_2',
+                          'credit_booking_type_1', 'credit_booking_type_2')
+
+    def __init__(self, records: list, amount_cents: np.ndarray, date: np.ndarray,
+                 debit_account: np.ndarray, credit_account: np.ndarray,
+                 codes: dict, categories: dict, parent_logger=None):
+        try:
+            if parent_logger is not None:
+                self.logger = parent_logger.getChild(__class__.__name__)
+            else:
+                self.logger = logging.getLogger(
+                    f"{__name__}.{__class__.__name__}")
+        except:
+            self.logger = logging.getLogger(__name__)
+
+        self.records = records
+        self.amount_cents = amount_cents
+        self.date = date
+        self.debit_account = debit_account
+        self.credit_account = credit_account
+        self.codes = codes
+        self.categories = categories
+
+    @classmethod
+    def from_records(cls, records: list, parent_logger=None) -> "BookingTable":
+        """
+        Builds the table from a list of posting dicts as returned by the BB API.
+
+        Parameters:
+        records (list): The posting dicts. They are kept as they are, not copied.
+        parent_logger (logging.Logger, optional): The parent logger.
+
+        Returns:
+        BookingTable: The table with all columns parsed.
+        """
+        records = records if isinstance(records, list) else list(records)
+        table = cls(records, None, None, None, None, {}, {}, parent_logger)
+        table.refresh()
+        return table
+
+    def refresh(self, fields=None):
+        """
+        (Re)parses columns from the records, e.g. after the booking types were added to the postings.
+
+        Parameters:
+        fields (list, optional): Categorical fields to parse. If None, all columns are parsed.
+        """
+        records = self.records
+        if fields is None:
+            amounts = pd.to_numeric(pd.Series(
+                [r.get('amount') for r in records], dtype=object), errors='coerce')
+            if amounts.isna().any():
+                self.logger.warning(
+                    f"{int(amounts.isna().sum())} postings without a valid amount, using 0.")
+            self.amount_cents = np.rint(amounts.fillna(
+                0).to_numpy(dtype=np.float64) * 100).astype(np.int64)
+            self.date = pd.to_datetime(pd.Series([r.get('date') for r in records], dtype=object),
+                                       format='%Y-%m-%d %H:%M:%S', errors='coerce').to_numpy(dtype='datetime64[s]')
+            self.debit_account = self._parse_accounts(
+                [r.get('debit_postingaccount_number') for r in records])
+            self.credit_account = self._parse_accounts(
+                [r.get('credit_postingaccount_number') for r in records])
+            fields = self.categorical_fields
+        for field in fields:
+            categorical = pd.Categorical([r.get(field) for r in records])
+            self.codes[field] = categorical.codes.astype(np.int32)
+            self.categories[field] = categorical.categories
+
+    @staticmethod
+    def _parse_accounts(values: list) -> np.ndarray:
+        return pd.to_numeric(pd.Series(values, dtype=object), errors='coerce').fillna(-1).to_numpy(dtype=np.int32)
+
+    def __len__(self):
+        return len(self.records)
+
+    def __getitem__(self, key):
+        if isinstance(key, (int, np.integer)):
+            return self.records[key]
+        if isinstance(key, slice):
+            return self.take(np.arange(len(self.records))[key])
+        return self.take(np.asarray(key))
+
+    def __iter__(self):
+        return iter(self.records)
+
+    def __repr__(self):
+        return f"BookingTable({len(self)} bookings)"
+
+    def take(self, selection) -> "BookingTable":
+        """
+        Returns a sub table with the rows given by a boolean mask or an array of positions, in that order.
+        """
+        selection = np.asarray(selection)
+        positions = np.flatnonzero(
+            selection) if selection.dtype == bool else selection.astype(np.intp)
+        return BookingTable([self.records[i] for i in positions],
+                            self.amount_cents[positions], self.date[positions],
+                            self.debit_account[positions], self.credit_account[positions],
+                            {field: codes[positions]
+                                for field, codes in self.codes.items()},
+                            self.categories, parent_logger=self.logger.parent)
+
+    def sort_by_date(self) -> "BookingTable":
+        """Returns the table sorted by date, keeping the order of bookings with the same date."""
+        return self.take(np.argsort(self.date, kind='stable'))
+
+    def isin(self, field: str, values) -> np.ndarray:
+        """Returns a boolean mask of the rows whose categorical field has one of the values."""
+        positions = self.categories[field].get_indexer(
+            pd.Index(list(values), dtype=object).unique())
+        return np.isin(self.codes[field], positions[positions >= 0])
+
+    def equals(self, field: str, value) -> np.ndarray:
+        """Returns a boolean mask of the rows whose categorical field equals the value."""
+        return self.isin(field, [value])
+
+    def between_dates(self, start_date=None, end_date=None) -> np.ndarray:
+        """Returns a boolean mask of the rows with start_date <= date <= end_date. Bounds of None are open."""
+        mask = np.ones(len(self), dtype=bool)
+        if start_date is not None:
+            mask &= self.date >= np.datetime64(pd.Timestamp(start_date))
+        if end_date is not None:
+            mask &= self.date <= np.datetime64(pd.Timestamp(end_date))
+        return mask
+
+    def group_by(self, field: str) -> dict:
+        """
+        Groups the rows by a categorical field.
+
+        Returns:
+        dict: Category value (None for missing values) -> BookingTable, groups keep the table order.
+        """
+        codes = self.codes[field]
+        order = np.argsort(codes, kind='stable')
+        boundaries = np.flatnonzero(np.diff(codes[order])) + 1
+        groups = {}
+        for positions in np.split(order, boundaries):
+            if len(positions) == 0:
+                continue
+            code = codes[positions[0]]
+            value = None if code < 0 else self.categories[field][code]
+            groups[value] = self.take(positions)
+        return groups
+
+    def sum_amounts(self, mask=None) -> float:
+        """Returns the sum of the amounts of all rows, or of the rows selected by a boolean mask."""
+        cents = self.amount_cents if mask is None else self.amount_cents[mask]
+        return int(cents.sum()) / 100
@@ -0,0 +1,143 @@
+import logging
+from bisect import bisect_left, bisect_right
+
+
+class CostLocationIndex:
+    """
+    Sorted interval index over the groups and items of a Kostenstellenplan.
+
+    A group covers the cost location numbers costLocations.min to costLocations.max, an item has a single number.
+    The intervals are built from the starting digits of the groups, padded to four digits, so two groups are
+    either nested or disjoint. Each group's parent is the innermost group around it, found in one pass over the
+    groups sorted by interval. Queries bisect the sorted intervals instead of comparing every pair of entries:
+    - groups_containing(number): the groups around a cost location number, outermost first
+    - items_under(group_id), groups_under(group_id), children_of(group_id): the entries inside a group, in plan order
+    - groups_with_prefix(code): the groups whose starting digits are a prefix of a cost location code
+
+    Attributes:
+    costlocations (dict): The Kostenstellenplan, cost location id -> group or item.
+    parents (dict): Group id -> id of the innermost enclosing group, None for top level groups.
+    """
+
+    def __init__(self, costlocations: dict, parent_logger=None):
+        try:
+            if parent_logger is not None:
+                self.logger = parent_logger.getChild(__class__.__name__)
+            else:
+                self.logger = logging.getLogger(
+                    f"{__name__}.{__class__.__name__}")
+        except:
+            self.logger = logging.getLogger(__name__)
+
+        self.costlocations = costlocations
+        self.positions = {cl_id: position for position,
+                          cl_id in enumerate(costlocations)}
+
+        # Groups sorted by interval start, wider intervals first, and items sorted by number
+        groups = sorted(((entry['costLocations']['min'], -entry['costLocations']['max'], self.positions[cl_id], cl_id)
+                         for cl_id, entry in costlocations.items() if entry['type'] == 'group'))
+        self.group_ids = [group[3] for group in groups]
+        self.group_mins = [group[0] for group in groups]
+        self.group_maxs = [-group[1] for group in groups]
+        items = sorted((entry['number'], self.positions[cl_id], cl_id)
+                       for cl_id, entry in costlocations.items() if entry['type'] == 'item')
+        self.item_ids = [item[2] for item in items]
+        self.item_numbers = [item[0] for item in items]
+
+        # The open groups form a stack, the innermost one still covering a group is its parent
+        self.parents = {}
+        open_groups = []
+        for group_id, group_min, group_max in zip(self.group_ids, self.group_mins, self.group_maxs):
+            while open_groups and self._max(open_groups[-1]) < group_min:
+                open_groups.pop()
+            self.parents[group_id] = open_groups[-1] if open_groups else None
+            open_groups.append(group_id)
+
+        self.prefixes = {entry['costLocations']['startingDigits']: cl_id
+                         for cl_id, entry in costlocations.items() if entry['type'] == 'group'}
+        self.prefix_lengths = sorted({len(prefix) for prefix in self.prefixes})
+        self.logger.debug(
+            f"Indexed {len(self.group_ids)} cost location groups and {len(self.item_ids)} items.")
+
+    @classmethod
+    def from_prefixes(cls, prefixes, parent_logger=None) -> "CostLocationIndex":
+        """
+        Builds an index of groups given only by their starting digits, e.g. the devint_cost_location_groups.
+
+        Parameters:
+        prefixes (list): The starting digits of the groups, also used as group ids.
+        parent_logger (logging.Logger, optional): The parent logger.
+
+        Returns:
+        CostLocationIndex: The index, without items.
+        """
+        costlocations = {}
+        for prefix in prefixes:
+            padding = max(4 - len(prefix), 0)
+            costlocations[prefix] = {
+                'type': 'group',
+                'costLocations': {
+                    'startingDigits': prefix,
+                    'min': int(prefix + '0' * padding),
+                    'max': int(prefix + '9' * padding)
+                }
+            }
+        return cls(costlocations, parent_logger)
+
+    def _min(self, group_id):
+        return self.costlocations[group_id]['costLocations']['min']
+
+    def _max(self, group_id):
+        return self.costlocations[group_id]['costLocations']['max']
+
+    def groups_containing(self, number: int) -> list:
+        """
+        Returns the ids of the groups whose interval contains a cost location number, outermost first.
+        """
+        position = bisect_right(self.group_mins, number) - 1
+        if position < 0:
+            return []
+
+        # The last group starting at or before the number, or one of its ancestors, is the innermost one around it
+        group_id = self.group_ids[position]
+        while group_id is not None and self._max(group_id) < number:
+            group_id = self.parents[group_id]
+        containing = []
+        while group_id is not None:
+            containing.append(group_id)
+            group_id = self.parents[group_id]
+        return containing[::-1]
+
+    def items_under(self, group_id) -> list:
+        """
+        Returns the ids of the items whose number lies in the interval of a group, in plan order.
+        """
+        start = bisect_left(self.item_numbers, self._min(group_id))
+        end = bisect_right(self.item_numbers, self._max(group_id))
+        return sorted(self.item_ids[start:end], key=self.positions.get)
+
+    def groups_under(self, group_id) -> list:
+        """
+        Returns the ids of the other groups whose interval lies in the interval of a group, in plan order.
+        """
+        group_max = self._max(group_id)
+        start = bisect_left(self.group_mins, self._min(group_id))
+        end = bisect_right(self.group_mins, group_max)
+        return sorted((self.group_ids[position] for position in range(start, end)
+                       if self.group_maxs[position] <= group_max and self.group_ids[position] != group_id),
+                      key=self.positions.get)
+
+    def children_of(self, group_id) -> list:
+        """
+        Returns the ids of all items and groups inside a group, in plan order.
+        """
+        return sorted(self.items_under(group_id) + self.groups_under(group_id), key=self.positions.get)
+
+    def groups_with_prefix(self, code: str) -> list:
+        """
+        Returns the ids of the groups whose starting digits are a prefix of a cost location code, shortest first.
+        """
+        if not isinstance(code, str):
+            return []
+        return [self.prefixes[code[:length]] for length in self.prefix_lengths
+                if length <= len(code) and code[:length] in self.prefixes]
@@ -23,6 +23,30 @@
 # HTMLListHandler.emit ( <- 0 x)
 # HTMLListHandler.get_html_log ( <- 0 x)
 
+# ========== [ Class: PostingStore ] ==========
+# PostingStore.__init__ ( <- 0 x)
+# PostingStore.is_empty ( <- 0 x)
+# PostingStore.has_fields ( <- 1 x)
+# PostingStore.load ( <- 0 x)
+#   -> PostingStore.has_fields
+# PostingStore.save ( <- 0 x)
+# PostingStore.merge ( <- 0 x)
+# PostingStore.month_checksums ( <- 0 x)
+# PostingStore.get_postings ( <- 0 x)
+
+# ========== [ Class: EnrichmentCache ] ==========
+# EnrichmentCache.__init__ ( <- 0 x)
+# EnrichmentCache.load ( <- 0 x)
+# EnrichmentCache.save ( <- 0 x)
+# EnrichmentCache.enrich ( <- 0 x)
+# EnrichmentCache.prune ( <- 0 x)
+
+# ========== [ Class: TTLCache ] ==========
+# TTLCache.__init__ ( <- 0 x)
+# TTLCache.get ( <- 1 x)
+#   -> TTLCache.get
+# TTLCache.invalidate ( <- 0 x)
+
 # ========== [ Class: DevIntConnector ] ==========
 # DevIntConnector.__init__ ( <- 0 x)
 # DevIntConnector._colchar ( <- 7 x)
@@ -35,27 +59,99 @@
 #   -> DevIntConnector.set_key_vault_access
 # DevIntConnector.build_clients ( <- 0 x)
 # DevIntConnector.analyse_received_http_request ( <- 0 x)
-# DevIntConnector.download_all_sheets ( <- 2 x)
+# DevIntConnector._download_blob ( <- 1 x)
+# DevIntConnector.get_excel_engine ( <- 5 x)
+# DevIntConnector.download_all_sheets ( <- 1 x)
+#   -> DevIntConnector._download_blob
+#   -> DevIntConnector.get_excel_engine
+# DevIntConnector.download_workbooks ( <- 1 x)
+# DevIntConnector.download_all_workbooks ( <- 1 x)
+#   -> DevIntConnector.get_excel_engine
 # DevIntConnector.read_time_slots ( <- 1 x)
 # DevIntConnector.read_kontenrahmen ( <- 1 x)
 # DevIntConnector.read_kostenstellenplan ( <- 1 x)
 # DevIntConnector.read_reports_overview ( <- 1 x)
+# DevIntConnector.parse_slot_cell ( <- 1 x)
 # DevIntConnector.read_report_schema_into ( <- 1 x)
+#   -> DevIntConnector.parse_slot_cell
 # DevIntConnector.read_distribution_instructions ( <- 1 x)
-# DevIntConnector.read_instruction_files ( <- 0 x)
+# DevIntConnector.read_instruction_files ( <- 1 x)
+# DevIntConnector.get_selected_report_ids ( <- 2 x)
+# DevIntConnector.select_reports ( <- 0 x)
+#   -> DevIntConnector.get_selected_report_ids
+# DevIntConnector.read_compiled_workbooks ( <- 1 x)
+# DevIntConnector._get_snapshot_blob ( <- 2 x)
+# DevIntConnector._snapshot_metadata ( <- 2 x)
+#   -> DevIntConnector.get_excel_engine
+# DevIntConnector._load_snapshot ( <- 0 x)
+#   -> DevIntConnector._get_snapshot_blob
+#   -> DevIntConnector._snapshot_metadata
+# DevIntConnector._save_snapshot ( <- 0 x)
+#   -> DevIntConnector._get_snapshot_blob
+#   -> DevIntConnector._snapshot_metadata
+# DevIntConnector.parse_instruction_files ( <- 0 x)
+#   -> DevIntConnector.download_workbooks
+#   -> DevIntConnector.get_excel_engine
+#   -> DevIntConnector.get_selected_report_ids
+#   -> DevIntConnector.download_all_workbooks
+#   -> DevIntConnector.read_distribution_instructions
 #   -> DevIntConnector.read_time_slots
 #   -> DevIntConnector.read_kontenrahmen
 #   -> DevIntConnector.read_kostenstellenplan
 #   -> DevIntConnector.read_reports_overview
-#   -> DevIntConnector.read_distribution_instructions
-#   -> DevIntConnector.download_all_sheets
 #   -> DevIntConnector.read_report_schema_into
-# DevIntConnector.get_all_bb_posts ( <- 0 x)
+# DevIntConnector.get_posting_fields ( <- 3 x)
+# DevIntConnector._fetch_bb_posts_page ( <- 2 x)
+# DevIntConnector._deduplicate_posts ( <- 1 x)
+# DevIntConnector._get_all_bb_posts_keyset ( <- 1 x)
+#   -> DevIntConnector._fetch_bb_posts_page
+# DevIntConnector.get_all_bb_posts ( <- 3 x)
+#   -> DevIntConnector.get_posting_fields
+#   -> DevIntConnector._fetch_bb_posts_page
+#   -> DevIntConnector._deduplicate_posts
+#   -> DevIntConnector._get_all_bb_posts_keyset
+# DevIntConnector.get_posting_store ( <- 2 x)
+# DevIntConnector._shift_months ( <- 2 x)
+# DevIntConnector.get_bb_posts_partitions ( <- 1 x)
+#   -> DevIntConnector._shift_months
+# DevIntConnector._months_between ( <- 2 x)
+#   -> DevIntConnector._shift_months
+# DevIntConnector._mark_months_verified ( <- 2 x)
+#   -> DevIntConnector._months_between
+# DevIntConnector._reconcile_posting_store ( <- 2 x)
+#   -> DevIntConnector._months_between
+#   -> DevIntConnector.get_all_bb_posts
+# DevIntConnector._load_closed_partition ( <- 0 x)
+#   -> DevIntConnector.get_posting_store
+#   -> DevIntConnector.get_posting_fields
+#   -> DevIntConnector.get_all_bb_posts
+#   -> DevIntConnector._mark_months_verified
+#   -> DevIntConnector._reconcile_posting_store
+# DevIntConnector._sync_open_posts ( <- 0 x)
+#   -> DevIntConnector.get_posting_store
+#   -> DevIntConnector.get_posting_fields
+#   -> DevIntConnector.get_all_bb_posts
+#   -> DevIntConnector._mark_months_verified
+#   -> DevIntConnector._reconcile_posting_store
+# DevIntConnector.sync_bb_posts ( <- 1 x)
+#   -> DevIntConnector.get_bb_posts_partitions
+# DevIntConnector._fetch_bb_accounts ( <- 1 x)
 # DevIntConnector.get_all_bb_accounts ( <- 0 x)
+#   -> DevIntConnector._fetch_bb_accounts
+# DevIntConnector.get_bb_accounts ( <- 0 x)
 # DevIntConnector.read_expected_bookings ( <- 0 x)
+#   -> DevIntConnector.read_compiled_workbooks
+# DevIntConnector.parse_expected_bookings ( <- 0 x)
 #   -> DevIntConnector.download_all_sheets
+#   -> DevIntConnector.get_excel_engine
 # DevIntConnector.add_more_account_information_to_bookings ( <- 1 x)
+# DevIntConnector.get_enrichment_cache ( <- 1 x)
+# DevIntConnector.enrich_bookings ( <- 1 x)
+#   -> DevIntConnector.get_enrichment_cache
+#   -> DevIntConnector.add_more_account_information_to_bookings
+# DevIntConnector.get_account_classifier ( <- 2 x)
 # DevIntConnector.collect_all_accounts ( <- 1 x)
+#   -> DevIntConnector.get_account_classifier
 # DevIntConnector.add_up_bookings ( <- 2 x)
 # DevIntConnector.collect_all_costlocations ( <- 1 x)
 #   -> DevIntConnector.add_up_bookings
@@ -80,10 +176,10 @@
 # DevIntConnector._get_column_letter_by_column_header ( <- 1 x)
 # DevIntConnector.fill_row_to_sheet ( <- 1 x)
 #   -> DevIntConnector.get_bookings_sheet_name
-#   -> DevIntConnector.build_group_summation_formula
 #   -> DevIntConnector._get_column_letter_by_column_header
+#   -> DevIntConnector.build_group_summation_formula
 #   -> DevIntConnector._colchar
-# DevIntConnector._set_border_to_area ( <- 1 x)
+# DevIntConnector._set_border_to_area ( <- 2 x)
 # DevIntConnector.fill_report_to_sheet ( <- 1 x)
 #   -> DevIntConnector.fill_bookings_to_sheet
 #   -> DevIntConnector._add_slot_header
@@ -93,6 +189,7 @@
 #   -> DevIntConnector.get_listings_sheet_name
 #   -> DevIntConnector.fill_listings_sheet
 # DevIntConnector.fill_personnel_bookings_to_sheet ( <- 1 x)
+#   -> DevIntConnector._set_border_to_area
 #   -> DevIntConnector._colchar
 # DevIntConnector.build_personnel_bookings ( <- 1 x)
 # DevIntConnector.compile_all_xls_sheets ( <- 1 x)
@@ -103,8 +200,12 @@
 #   -> DevIntConnector.fill_report_to_sheet
 #   -> DevIntConnector.get_bookings_sheet_name
 #   -> DevIntConnector.get_listings_sheet_name
+# DevIntConnector.load_report_inputs ( <- 0 x)
+#   -> DevIntConnector.read_instruction_files
+#   -> DevIntConnector.sync_bb_posts
 # DevIntConnector.build_reports ( <- 0 x)
-#   -> DevIntConnector.add_more_account_information_to_bookings
+#   -> DevIntConnector.get_account_classifier
+#   -> DevIntConnector.enrich_bookings
 #   -> DevIntConnector.build_personnel_bookings
 #   -> DevIntConnector.collect_all_accounts
 #   -> DevIntConnector.collect_all_costlocations
@@ -134,7 +235,13 @@
 # extract_data_from_received_http_request ( <- 0 x)
 # replace_and_format_html_template ( <- 0 x)
 # get_db_config_from_keyvault ( <- 0 x)
+# get_excel_engine ( <- 0 x)
+# read_all_sheets ( <- 0 x)
+# column_values ( <- 0 x)
 # save_virtual_workbook ( <- 0 x)
+# get_workbook_fingerprint ( <- 0 x)
+# get_current_contents ( <- 0 x)
+# get_snapshot_schema_hash ( <- 0 x)
 
 # ╔══════════════════════════════════════════════════════════════╗
 # ║                     END DEPENDENCY GRAPH                     ║
@@ -147,12 +254,23 @@ import os
 from os import getenv
 import re
 import datetime
-import requests
 import json
+import gzip
+import hashlib
+import inspect
+import functools
+import pickle
 import base64
+import threading
+import time
+import multiprocessing
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
 from typing import List
 from io import StringIO, BytesIO
 from pytz import timezone
+import numpy as np
 import pandas as pd
 from bs4 import BeautifulSoup
 
@@ -174,6 +292,11 @@ from sendgrid.helpers.mail import (
     Mail, Attachment, FileContent, FileName, FileType, Disposition)  # ContentId
 import pymsteams
 
+from hrmlib.bbclient import BBClient, RequestScheduler, stream_json_array, compact_record
+from hrmlib.bookingtable import BookingTable
+from hrmlib.costlocationindex import CostLocationIndex
+from hrmlib.accountclassifier import AccountClassifier
+
 
 class BytesIOWrapper:
     def __init__(self, string_buffer, encoding='utf-8'):
@@ -567,6 +690,52 @@ def get_db_config_from_keyvault(config: SecretsAndSettingsManager, logger: loggi
     return db_con_data
 
 
+def get_excel_engine(engine: str = 'auto') -> str:
+    """
+    Resolves the pandas engine used to read Excel workbooks.
+
+    Parameters:
+    engine (str): 'calamine', 'openpyxl' or 'auto' for calamine if python-calamine is installed, else openpyxl.
+
+    Returns:
+    str: The engine name for pd.read_excel.
+    """
+    if engine != 'auto':
+        return engine
+    try:
+        import python_calamine  # noqa: F401
+        return 'calamine'
+    except ImportError:
+        return 'openpyxl'
+
+
+def read_all_sheets(data: bytes, engine: str = 'openpyxl', skip_sheets=()) -> dict:
+    """
+    Parses the sheets of an Excel workbook into DataFrames in a single pass.
+
+    A module level function, so workbooks can be parsed in worker processes.
+
+    Parameters:
+    data (bytes): The workbook file.
+    engine (str, optional): The pandas Excel engine.
+    skip_sheets (optional): Names of sheets that are not parsed at all.
+    """
+    if not skip_sheets:
+        return pd.read_excel(BytesIO(data), sheet_name=None, engine=engine)
+    workbook = pd.ExcelFile(BytesIO(data), engine=engine)
+    selected = [sheet for sheet in workbook.sheet_names if sheet not in skip_sheets]
+    return pd.read_excel(workbook, sheet_name=selected) if selected else {}
+
+
+def column_values(df: pd.DataFrame, column: str) -> list:
+    """
+    Returns the values of a DataFrame column as a list of Python scalars, None for every row if the column is missing.
+    """
+    if column not in df.columns:
+        return [None] * len(df)
+    return df[column].tolist()
+
+
 def save_virtual_workbook(workbook):
     """Save an openpyxl workbook in memory."""
 
@@ -585,6 +754,513 @@ def save_virtual_workbook(workbook):
         raise
 
 
+class PostingStore:
+    """
+    Persistent store of BuchhaltungsButler postings, kept as a gzipped JSON snapshot in Azure Blob Storage.
+
+    Postings are keyed by their 'id_by_customer'. A checkpoint records the newest posting date that was
+    synchronised, so that following runs only need to download postings from that date onwards, and when
+    each month was last verified against the API, so edited historical postings are found by reconciliation.
+
+    Attributes:
+    logger (logging.Logger): The logger to use for logging messages.
+    container (azure.storage.blob.ContainerClient): The container holding the snapshot blob.
+    blob_name (str): The name of the snapshot blob.
+    postings (dict): The stored postings keyed by 'id_by_customer'.
+    checkpoint (dict): Information about the last synchronisation.
+    """
+
+    format_version = 1
+    checksum_fields = ('id_by_customer', 'date', 'amount', 'currency',
+                       'debit_postingaccount_number', 'credit_postingaccount_number',
+                       'cost_location', 'postingtext')
+
+    def __init__(self, container=None, blob_name="cache/bb_postings.json.gz", parent_logger=None):
+        """
+        Initializes the PostingStore.
+
+        Parameters:
+        container (azure.storage.blob.ContainerClient, optional): The container holding the snapshot. Without a container the store only lives in memory.
+        blob_name (str, optional): The name of the snapshot blob. Default is "cache/bb_postings.json.gz".
+        parent_logger (logging.Logger, optional): The parent logger. If none is provided, a new logger is created.
+        """
+        try:
+            if parent_logger is not None:
+                self.logger = parent_logger.getChild(__class__.__name__)
+            else:
+                self.logger = logging.getLogger(
+                    f"{__name__}.{__class__.__name__}")
+        except:
+            self.logger = logging.getLogger(__name__)
+
+        self.container = container
+        self.blob_name = blob_name
+        self.postings = {}
+        self.checkpoint = {}
+
+    def is_empty(self) -> bool:
+        return not self.postings or not self.checkpoint.get('lastPostingDate')
+
+    def has_fields(self, fields: list = None) -> bool:
+        """Whether the stored postings contain the fields, None meaning all fields of the API."""
+        stored_fields = self.checkpoint.get('fields')
+        if stored_fields is None:
+            return True
+        return fields is not None and set(fields) <= set(stored_fields)
+
+    def load(self, fields: list = None) -> bool:
+        """
+        Loads the snapshot from blob storage.
+
+        Parameters:
+        fields (list, optional): Fields to keep of the stored postings, if the snapshot contains all of them.
+
+        Returns:
+        bool: True if a snapshot was loaded, False if none exists or it could not be read.
+        """
+        self.postings = {}
+        self.checkpoint = {}
+        if self.container is None:
+            return False
+        try:
+            blob_client = self.container.get_blob_client(self.blob_name)
+            if not blob_client.exists():
+                self.logger.info(
+                    f"No posting snapshot found at {self.container.container_name}/{self.blob_name}.")
+                return False
+            snapshot = json.loads(gzip.decompress(
+                blob_client.download_blob().readall()))
+            if snapshot.get('version') != self.format_version:
+                self.logger.warning(
+                    f"Ignoring posting snapshot with format version {snapshot.get('version')}.")
+                return False
+            self.checkpoint = snapshot.get('checkpoint', {})
+            self.postings = {str(posting['id_by_customer']): posting
+                             for posting in snapshot.get('postings', [])}
+            if fields is not None and self.has_fields(fields):
+                # Snapshots written with a wider projection shrink to the current one
+                keep = set(fields)
+                self.postings = {key: {field: value for field, value in posting.items() if field in keep}
+                                 for key, posting in self.postings.items()}
+                self.checkpoint['fields'] = sorted(keep)
+            self.logger.debug(
+                f"Loaded {len(self.postings)} postings from snapshot, last posting date {self.checkpoint.get('lastPostingDate')}.")
+            return True
+        except Exception as e:
+            self.logger.warning(
+                f"Reading posting snapshot failed, a full download will be done: {e}")
+            self.postings = {}
+            self.checkpoint = {}
+            return False
+
+    def save(self) -> bool:
+        """
+        Writes the snapshot to blob storage.
+
+        Returns:
+        bool: True if the snapshot was written.
+        """
+        if self.container is None:
+            return False
+        snapshot = {
+            'version': self.format_version,
+            'checkpoint': self.checkpoint,
+            'postings': self.get_postings()
+        }
+        try:
+            blob_client = self.container.get_blob_client(self.blob_name)
+            blob_client.upload_blob(gzip.compress(json.dumps(
+                snapshot).encode('utf-8')), overwrite=True)
+            self.logger.debug(
+                f"Saved {len(self.postings)} postings to {self.container.container_name}/{self.blob_name}.")
+            return True
+        except Exception as e:
+            self.logger.error(f"Saving posting snapshot failed: {e}")
+            return False
+
+    def merge(self, postings: list, window_start: str = None, window_end: str = None) -> dict:
+        """
+        Merges freshly downloaded postings into the store by 'id_by_customer'.
+
+        If a window is given, the downloaded postings are taken as the complete content of that date window,
+        so stored postings inside the window which were not downloaded again are removed (deleted in BB).
+
+        Parameters:
+        postings (list): The downloaded postings.
+        window_start (str, optional): First date (YYYY-MM-DD) covered by the download.
+        window_end (str, optional): Last date (YYYY-MM-DD) covered by the download.
+
+        Returns:
+        dict: Counts of 'added', 'updated' and 'removed' postings.
+        """
+        counts = {'added': 0, 'updated': 0, 'removed': 0}
+        fetched_ids = set()
+        for posting in postings:
+            key = str(posting['id_by_customer'])
+            fetched_ids.add(key)
+            if key not in self.postings:
+                counts['added'] += 1
+            elif self.postings[key] != posting:
+                counts['updated'] += 1
+            self.postings[key] = posting
+
+        if window_start is not None:
+            for key in [key for key, posting in self.postings.items()
+                        if key not in fetched_ids
+                        and posting['date'][:10] >= window_start
+                        and (window_end is None or posting['date'][:10] <= window_end)]:
+                del self.postings[key]
+                counts['removed'] += 1
+
+        if self.postings:
+            self.checkpoint['lastPostingDate'] = max(
+                posting['date'] for posting in self.postings.values())[:10]
+        self.checkpoint['syncedAt'] = datetime.datetime.now(
+            datetime.timezone.utc).strftime('%Y-%m-%d %H:%M:%S')
+        self.logger.debug(
+            f"Merged postings: {counts['added']} added, {counts['updated']} updated, {counts['removed']} removed.")
+        return counts
+
+    @classmethod
+    def month_checksums(cls, postings) -> dict:
+        """
+        Computes a checksum per posting month over the fields the reports depend on.
+
+        The rows of a month are hashed in sorted order, so the checksum does not depend on the download order.
+
+        Parameters:
+        postings (iterable): The postings.
+
+        Returns:
+        dict: Month ('YYYY-MM') -> SHA-256 hex digest.
+        """
+        months = {}
+        for posting in postings:
+            months.setdefault(posting['date'][:7], []).append(
+                [str(posting.get(field) or '') for field in cls.checksum_fields])
+        return {month: hashlib.sha256(json.dumps(sorted(rows)).encode('utf-8')).hexdigest()
+                for month, rows in months.items()}
+
+    def get_postings(self, start_date: str = None, end_date: str = None) -> list:
+        """Return the stored postings within the date range, ordered by date and booking number."""
+        postings = [posting for posting in self.postings.values()
+                    if (start_date is None or posting['date'][:10] >= start_date)
+                    and (end_date is None or posting['date'][:10] <= end_date)]
+        postings.sort(key=lambda posting: (
+            posting['date'], str(posting['id_by_customer']).zfill(12)))
+        return postings
+
+
+class EnrichmentCache:
+    """
+    Persistent account types and categories of BuchhaltungsButler postings, kept as a gzipped JSON blob.
+
+    The enrichment of a posting only depends on its debit and credit account and the Kontenrahmen, so it is
+    stored by 'id_by_customer' together with both account numbers and reused as long as the fingerprint of the
+    Kontenrahmen is the same. Only new postings and postings booked on other accounts are classified again.
+    Entries of postings which are no longer stored are pruned, and all entries are dropped when the Kontenrahmen changes,
+    so the cache never holds more than one entry per stored posting.
+
+    Attributes:
+    logger (logging.Logger): The logger to use for logging messages.
+    container (azure.storage.blob.ContainerClient): The container holding the blob.
+    blob_name (str): The name of the blob.
+    fingerprint (str): Fingerprint of the Kontenrahmen the stored postings were classified against.
+    enrichments (dict): 'id_by_customer' -> [debit account, credit account, enriched fields].
+    dropped (int): Number of stored entries dropped by load because they belong to another Kontenrahmen.
+    """
+
+    format_version = 1
+    enriched_fields = ('debit_booking_type_1', 'debit_booking_type_2', 'debit_booking_categories',
+                       'credit_booking_type_1', 'credit_booking_type_2', 'credit_booking_categories',
+                       'realisation')
+
+    def __init__(self, container=None, blob_name="cache/bb_enrichment.json.gz", parent_logger=None):
+        """
+        Initializes the EnrichmentCache.
+
+        Parameters:
+        container (azure.storage.blob.ContainerClient, optional): The container holding the blob. Without a container the cache only lives in memory.
+        blob_name (str, optional): The name of the blob. Default is "cache/bb_enrichment.json.gz".
+        parent_logger (logging.Logger, optional): The parent logger. If none is provided, a new logger is created.
+        """
+        try:
+            if parent_logger is not None:
+                self.logger = parent_logger.getChild(__class__.__name__)
+            else:
+                self.logger = logging.getLogger(
+                    f"{__name__}.{__class__.__name__}")
+        except:
+            self.logger = logging.getLogger(__name__)
+
+        self.container = container
+        self.blob_name = blob_name
+        self.fingerprint = None
+        self.enrichments = {}
+        self.dropped = 0
+
+    def load(self, fingerprint: str) -> bool:
+        """
+        Loads the stored enrichments, if they were classified against the Kontenrahmen with the fingerprint.
+
+        Parameters:
+        fingerprint (str): Fingerprint of the current Kontenrahmen.
+
+        Returns:
+        bool: True if stored enrichments were loaded, False if none exist, they are outdated or could not be read.
+        """
+        self.fingerprint = fingerprint
+        self.enrichments = {}
+        self.dropped = 0
+        if self.container is None:
+            return False
+        try:
+            blob_client = self.container.get_blob_client(self.blob_name)
+            if not blob_client.exists():
+                self.logger.info(
+                    f"No stored enrichments found at {self.container.container_name}/{self.blob_name}.")
+                return False
+            stored = json.loads(gzip.decompress(
+                blob_client.download_blob().readall()))
+            if stored.get('version') != self.format_version:
+                self.logger.warning(
+                    f"Ignoring stored enrichments with format version {stored.get('version')}.")
+                return False
+            if stored.get('fingerprint') != fingerprint:
+                self.dropped = len(stored.get('enrichments', {}))
+                self.logger.info(
+                    f"The Kontenrahmen changed, dropping {self.dropped} stored enrichments and classifying all postings again.")
+                return False
+            self.enrichments = stored.get('enrichments', {})
+            self.logger.debug(
+                f"Loaded enrichments of {len(self.enrichments)} postings.")
+            return True
+        except Exception as e:
+            self.logger.warning(
+                f"Reading stored enrichments failed, all postings are classified again: {e}")
+            self.enrichments = {}
+            return False
+
+    def save(self) -> bool:
+        """
+        Writes the enrichments to blob storage.
+
+        Returns:
+        bool: True if the enrichments were written.
+        """
+        if self.container is None:
+            return False
+        stored = {
+            'version': self.format_version,
+            'fingerprint': self.fingerprint,
+            'enrichments': self.enrichments
+        }
+        try:
+            blob_client = self.container.get_blob_client(self.blob_name)
+            blob_client.upload_blob(gzip.compress(json.dumps(
+                stored).encode('utf-8')), overwrite=True)
+            self.logger.debug(
+                f"Saved enrichments of {len(self.enrichments)} postings to {self.container.container_name}/{self.blob_name}.")
+            return True
+        except Exception as e:
+            self.logger.error(f"Saving enrichments failed: {e}")
+            return False
+
+    def enrich(self, bookings: list, classify) -> dict:
+        """
+        Adds the stored enriched fields to the bookings and classifies the others.
+
+        Parameters:
+        bookings (list): The bookings, modified in place.
+        classify (callable): Adds the enriched fields to a list of bookings.
+
+        Returns:
+        dict: Counts of 'reused' and 'classified' bookings.
+        """
+        pending = []
+        for booking in bookings:
+            stored = self.enrichments.get(str(booking.get('id_by_customer')))
+            if stored is not None and stored[0] == str(booking['debit_postingaccount_number']) \
+                    and stored[1] == str(booking['credit_postingaccount_number']):
+                booking.update(stored[2])
+            else:
+                pending.append(booking)
+
+        if pending:
+            classify(pending)
+            for booking in pending:
+                if booking.get('id_by_customer') is None:
+                    continue
+                self.enrichments[str(booking['id_by_customer'])] = [
+                    str(booking['debit_postingaccount_number']),
+                    str(booking['credit_postingaccount_number']),
+                    {field: booking[field] for field in self.enriched_fields if field in booking}]
+
+        counts = {'reused': len(bookings) - len(pending),
+                  'classified': len(pending)}
+        self.logger.debug(
+            f"Enriched bookings: {counts['reused']} reused, {counts['classified']} classified.")
+        return counts
+
+    def prune(self, posting_ids) -> int:
+        """
+        Removes the entries of postings which are not stored any more, e.g. deleted in BB.
+
+        Parameters:
+        posting_ids (iterable): The 'id_by_customer' of all stored postings.
+
+        Returns:
+        int: The number of removed entries.
+        """
+        keep = {str(posting_id) for posting_id in posting_ids}
+        removed = [key for key in self.enrichments if key not in keep]
+        for key in removed:
+            del self.enrichments[key]
+        if removed:
+            self.logger.debug(
+                f"Pruned enrichments of {len(removed)} postings which are no longer stored.")
+        return len(removed)
+
+
+SNAPSHOT_FORMAT = '2'
+
+
+def get_workbook_fingerprint(files: list, workbook_names: list = None) -> str:
+    """
+    Returns a hash of the names and ETags of the Excel files in a container listing.
+
+    Parameters:
+    files (list): The blob properties of the files in the container.
+    workbook_names (list, optional): The workbooks to include, all .xlsx files if None.
+    """
+    return hashlib.sha256(json.dumps(sorted(
+        [file.name, str(file.etag or file.last_modified)] for file in files
+        if file.name.endswith(".xlsx") and (workbook_names is None or file.name in workbook_names))).encode('utf-8')).hexdigest()
+
+
+def get_current_contents(files: list, workbook_contents: dict = None) -> dict:
+    """
+    Returns the already downloaded workbooks which are still the version in a container listing.
+
+    Parameters:
+    files (list): The blob properties of the files in the container.
+    workbook_contents (dict, optional): Blob name -> (ETag, file content), e.g. the workbook of a blob trigger.
+
+    Returns:
+    dict: Blob name -> file content of the workbooks whose ETag matches the listing.
+    """
+    etags = {file.name: str(file.etag).strip('"') for file in files if file.etag}
+    return {name: data for name, (etag, data) in (workbook_contents or {}).items()
+            if etag and etags.get(name) == str(etag).strip('"')}
+
+
+@functools.lru_cache(maxsize=None)
+def get_snapshot_schema_hash(engine: str) -> str:
+    """
+    Returns a hash of the code that compiles the workbook snapshots, the Excel engine and the pandas version.
+
+    A snapshot written by other parsers is stale, so a deployment that changes a parser invalidates the
+    snapshots without a manual version bump.
+    """
+    sources = [read_all_sheets, column_values, CostLocationIndex] + [
+        getattr(DevIntConnector, name) for name in DevIntConnector.snapshot_parsers]
+    try:
+        code = "".join(inspect.getsource(source) for source in sources)
+    except (OSError, TypeError):
+        # Deployed without sources, only the format version identifies the parsers
+        code = ""
+    return hashlib.sha256(json.dumps([SNAPSHOT_FORMAT, engine, pd.__version__, code]).encode('utf-8')).hexdigest()
+
+
+class TTLCache:
+    """
+    Thread-safe in-process cache with a time to live per entry.
+
+    Module level instances live as long as the Azure Functions worker process, so their entries are shared
+    across warm invocations. Expired entries are refreshed through a loader, which gets the validator
+    (e.g. an ETag) of the cached value and can report that the value did not change.
+
+    Attributes:
+    logger (logging.Logger): The logger to use for logging messages.
+    entries (dict): Cache key -> dict with 'value', 'validator' and 'loadedAt' (time.monotonic()).
+    """
+
+    NOT_MODIFIED = object()
+
+    def __init__(self, parent_logger=None):
+        """
+        Initializes the TTLCache.
+
+        Parameters:
+        parent_logger (logging.Logger, optional): The parent logger. If none is provided, a new logger is created.
+        """
+        try:
+            if parent_logger is not None:
+                self.logger = parent_logger.getChild(__class__.__name__)
+            else:
+                self.logger = logging.getLogger(
+                    f"{__name__}.{__class__.__name__}")
+        except:
+            self.logger = logging.getLogger(__name__)
+
+        self.entries = {}
+        self.lock = threading.Lock()
+        self.key_locks = {}
+
+    def get(self, key: str, loader, ttl_seconds: float, stale_if_error_seconds: float = 0):
+        """
+        Returns the cached value for the key, loading or refreshing it if it is missing or expired.
+
+        Parameters:
+        key (str): The cache key.
+        loader (callable): Called with the validator of the cached value (None if there is none). Returns a tuple
+            (value, validator), or (TTLCache.NOT_MODIFIED, validator) to keep the cached value for another ttl.
+        ttl_seconds (float): How long a loaded value is served without asking the loader again.
+        stale_if_error_seconds (float, optional): How long an expired value may still be served if refreshing fails.
+
+        Returns:
+        The cached or freshly loaded value.
+        """
+        with self.lock:
+            key_lock = self.key_locks.setdefault(key, threading.Lock())
+
+        # Only one caller loads a key, concurrent callers wait and then use its result
+        with key_lock:
+            entry = self.entries.get(key)
+            now = time.monotonic()
+            if entry is not None and now - entry['loadedAt'] < ttl_seconds:
+                return entry['value']
+
+            try:
+                value, validator = loader(
+                    entry['validator'] if entry is not None else None)
+            except Exception as e:
+                if entry is not None and now - entry['loadedAt'] < ttl_seconds + stale_if_error_seconds:
+                    self.logger.warning(
+                        f"Refreshing '{key}' failed, serving the cached value: {e}")
+                    return entry['value']
+                raise
+
+            if value is self.NOT_MODIFIED and entry is not None:
+                self.logger.debug(f"'{key}' not modified, extending its ttl.")
+                value = entry['value']
+            self.entries[key] = {'value': value,
+                                 'validator': validator, 'loadedAt': now}
+            return value
+
+    def invalidate(self, key: str = None):
+        """Removes one key, or all keys if none is given."""
+        with self.lock:
+            if key is None:
+                self.entries.clear()
+            else:
+                self.entries.pop(key, None)
+
+
+# Shared by all DevIntConnector instances of the worker process
+warm_cache = TTLCache()
+
+
 class DevIntConnector:
 
     def __init__(self, parent_logger=None, settings_file='devint_settings.yaml'):
@@ -716,6 +1392,31 @@ class DevIntConnector:
             settings['secrets']['bb_authorization'])
         bb_cookie = self.key_vault.get_secret(settings['secrets']['bb_cookie'])
 
+        # One pooled keep-alive client for all BB requests of this connector
+        bb_api_settings = settings.get('bb_api', {})
+        bb_base_url = bb_api_settings.get(
+            'base_url', "https://webapp.buchhaltungsbutler.de/api/v1")
+        # One scheduler per API host paces, retries and guards all BB requests of the worker process
+        bb_scheduler = RequestScheduler.for_host(
+            bb_base_url,
+            rate=bb_api_settings.get('requests_per_second', 5),
+            burst=bb_api_settings.get('max_concurrency', 4),
+            max_retries=bb_api_settings.get('max_retries', 3),
+            backoff_factor=bb_api_settings.get('backoff_factor', 0.5),
+            failure_threshold=bb_api_settings.get(
+                'circuit_failure_threshold', 5),
+            reset_seconds=bb_api_settings.get('circuit_reset_seconds', 60),
+            parent_logger=self.logger)
+        bb_client = BBClient(
+            base_url=bb_base_url,
+            api_key=bb_api_key,
+            authorization=bb_authorization,
+            cookie=bb_cookie,
+            timeout=bb_api_settings.get('timeout', 60),
+            pool_maxsize=max(10, bb_api_settings.get('max_concurrency', 4)),
+            scheduler=bb_scheduler,
+            parent_logger=self.logger)
+
         # Sendgrid API Information
         sendgrid_api_key = self.key_vault.get_secret(
             settings['secrets']['sendgrid_api_key'])
@@ -794,6 +1495,7 @@ class DevIntConnector:
             "bb_api_key": bb_api_key,
             "bb_authorization": bb_authorization,
             "bb_cookie": bb_cookie,
+            "bb_client": bb_client,
             "db": db
         }
         return self.conn_clients
@@ -827,44 +1529,116 @@ class DevIntConnector:
         self.logger.log(f"received data with method: {data['method']}<br>")
         return post_data
 
+    def _download_blob(self, blob_client) -> bytes:
+        # Large blobs are downloaded in parallel chunks
+        return blob_client.download_blob(max_concurrency=self.settings.get(
+            'instruction_files', {}).get('max_concurrency', 2)).readall()
+
+    def get_excel_engine(self) -> str:
+        # pandas engine for the instruction and expected bookings workbooks
+        return get_excel_engine(self.settings.get('excel_reader', {}).get('engine', 'auto'))
+
     def download_all_sheets(self, blob_client):
         self.logger.debug(
             f"Starting download_all_sheets from {blob_client.container_name}/{blob_client.blob_name}.")
 
         try:
-            # Initiate download stream
-            self.logger.debug("Initializing blob download stream...")
-            stream = BytesIO()
-            blob_downloader = blob_client.download_blob()
-
-            # Download blob data to stream
-            blob_downloader.download_to_stream(stream)
-            self.logger.debug(
-                "Blob downloaded successfully into memory stream.")
+            # Download blob data into memory
+            self.logger.debug("Downloading blob...")
+            data = self._download_blob(blob_client)
+            self.logger.debug("Blob downloaded successfully into memory.")
 
-            # Load Excel data from stream
-            get_blob_data = pd.ExcelFile(stream, engine='openpyxl')
+            # Load Excel data and read each sheet into a DataFrame
+            dataframes = read_all_sheets(data, self.get_excel_engine())
             self.logger.debug(
-                f"Excel file loaded. Sheets found: {get_blob_data.sheet_names}")
-
-            # Process each sheet and store in dictionary
-            dataframes = {}
-            for sheet in get_blob_data.sheet_names:
-                # self.logger.debug(f"start processing sheet: {sheet}")
-                new_df = pd.read_excel(
-                    get_blob_data, engine='openpyxl', sheet_name=sheet)
-                dataframes[sheet] = new_df
-                # self.logger.debug(
-                #     f"Sheet '{sheet}' read into DataFrame with {new_df.shape[0]} rows and {new_df.shape[1]} columns.")
-
-            # self.logger.info(
-            #     "All sheets downloaded and processed successfully.")
+                f"Excel file loaded. Sheets found: {list(dataframes.keys())}")
             return dataframes
 
         except Exception as e:
             self.logger.error(f"Error in download_all_sheets: {e}")
             raise
 
+    def download_workbooks(self, container, blob_names: list, contents: dict = None) -> dict:
+        """
+        Downloads several workbooks concurrently without parsing them.
+
+        Parameters:
+        container (azure.storage.blob.ContainerClient): The container with the workbooks.
+        blob_names (list): The names of the workbooks.
+        contents (dict, optional): Workbook file contents by blob name that were already downloaded.
+
+        Returns:
+        dict: Blob name -> workbook file content, in the order of blob_names.
+        """
+        file_settings = self.settings.get('instruction_files', {})
+        contents = contents or {}
+        with ThreadPoolExecutor(max_workers=max(1, file_settings.get('download_concurrency', 4))) as downloader:
+            downloads = {name: downloader.submit(self._download_blob, container.get_blob_client(name))
+                         for name in blob_names if name not in contents}
+            return {name: contents[name] if name in contents else downloads[name].result() for name in blob_names}
+
+    def download_all_workbooks(self, container, blob_names: list, skip_sheets=(), contents: dict = None) -> dict:
+        """
+        Downloads several workbooks concurrently and parses them in worker processes.
+
+        Parsing with openpyxl is CPU bound, so with 'parse_processes' above 1 each workbook is parsed in its own
+        process as soon as it is downloaded. The workers are started by a fork server (spawned where there is none),
+        as forking the multi-threaded Functions worker can copy held locks and hang the child. If worker processes
+        are not available or do not finish within 'parse_timeout_seconds', the workbooks are parsed in this process.
+
+        Parameters:
+        container (azure.storage.blob.ContainerClient): The container with the workbooks.
+        blob_names (list): The names of the workbooks.
+        skip_sheets (optional): Names of sheets not to parse.
+        contents (dict, optional): Workbook file contents by blob name that were already downloaded.
+
+        Returns:
+        dict: Blob name -> dict of sheet name -> DataFrame, in the order of blob_names.
+        """
+        self.logger.debug(
+            f"Starting download_all_workbooks with {len(blob_names)} workbooks.")
+        file_settings = self.settings.get('instruction_files', {})
+        processes = min(file_settings.get(
+            'parse_processes', 1), len(blob_names))
+        engine = self.get_excel_engine()
+        contents = contents or {}
+
+        with ThreadPoolExecutor(max_workers=max(1, file_settings.get('download_concurrency', 4))) as downloader:
+            downloads = {name: downloader.submit(self._download_blob, container.get_blob_client(name))
+                         for name in blob_names if name not in contents}
+
+            def content(name):
+                return contents[name] if name in contents else downloads[name].result()
+
+            if processes > 1:
+                start_method = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+                parser = None
+                completed = False
+                try:
+                    parser = ProcessPoolExecutor(
+                        max_workers=processes, mp_context=multiprocessing.get_context(start_method))
+                    parsed = {name: parser.submit(read_all_sheets, content(name), engine, skip_sheets)
+                              for name in blob_names}
+                    deadline = time.monotonic() + \
+                        file_settings.get('parse_timeout_seconds', 120)
+                    result = {name: future.result(timeout=max(0, deadline - time.monotonic()))
+                              for name, future in parsed.items()}
+                    completed = True
+                    return result
+                except (OSError, BrokenProcessPool, FutureTimeoutError) as e:
+                    self.logger.warning(
+                        f"Parsing workbooks in worker processes failed, parsing them in process: {e.__class__.__name__} {e}")
+                finally:
+                    if parser is not None:
+                        # A hung worker would block a waiting shutdown, so unfinished workers are stopped
+                        workers = list(
+                            (getattr(parser, '_processes', None) or {}).values())
+                        parser.shutdown(wait=completed, cancel_futures=True)
+                        if not completed:
+                            for worker in workers:
+                                worker.terminate()
+            return {name: read_all_sheets(content(name), engine, skip_sheets) for name in blob_names}
+
     def read_time_slots(self, df: pd.DataFrame):
         self.logger.debug("Starting read_time_slots function.")
 
@@ -886,12 +1660,13 @@ class DevIntConnector:
             self.logger.debug(
                 "Processing each row to extract time slot information.")
 
-            for time_slot_ID in time_slots_df.index:
-                mdict = time_slots_df.loc[time_slot_ID].to_dict()
+            dated = [pd.notnull(start) and pd.notnull(end) for start, end in zip(
+                column_values(time_slots_df, 'start'), column_values(time_slots_df, 'end'))]
+            for time_slot_ID, mdict, is_dated in zip(time_slots_df.index, time_slots_df.to_dict('records'), dated):
                 # self.logger.debug(f"Processing time slot ID: {time_slot_ID}")
 
                 # Convert start and end to strings and store
-                if pd.notnull(mdict.get('start')) and pd.notnull(mdict.get('end')):
+                if is_dated:
                     mdict['startString'] = mdict['start'].strftime('%d.%m.%Y')
                     mdict['endString'] = mdict['end'].strftime('%d.%m.%Y')
                 else:
@@ -920,25 +1695,22 @@ class DevIntConnector:
             for key, df in dfs.items():
                 self.logger.debug(f"Processing dataframe with key: {key}")
                 entries = []
+                columns = [column_values(df, column) for column in [
+                    'Start', 'Ende', 'Typ 1', 'Typ 2', 'Kategorie 1', 'Kategorie 2', 'Kategorie 3']]
 
-                for index in df.index:
-                    mdict = df.loc[index].to_dict()
-
+                for start, end, type1, type2, *categories in zip(*columns):
                     # Construct entry dictionary with required fields
                     entry = {
-                        'accountRangeStart': mdict.get('Start'),
-                        'accountRangeEnd': mdict.get('Ende'),
-                        'type1': mdict.get('Typ 1'),
-                        'type2': mdict.get('Typ 2')
+                        'accountRangeStart': start,
+                        'accountRangeEnd': end,
+                        'type1': type1,
+                        'type2': type2
                     }
 
                     # Check and add optional categories if they are present
-                    if not pd.isna(mdict.get('Kategorie 1')):
-                        entry['category1'] = mdict['Kategorie 1']
-                    if not pd.isna(mdict.get('Kategorie 2')):
-                        entry['category2'] = mdict['Kategorie 2']
-                    if not pd.isna(mdict.get('Kategorie 3')):
-                        entry['category3'] = mdict['Kategorie 3']
+                    for number, category in enumerate(categories, start=1):
+                        if not pd.isna(category):
+                            entry[f'category{number}'] = category
                     entries.append(entry)
 
                 # Store entries list in kontenrahmen dictionary with a modified key name
@@ -984,40 +1756,42 @@ class DevIntConnector:
             ksp_df = ksp_df.dropna(subset=['Unnamed: 1'])
             max_costlocation_digits = 4
             self.logger.info("Starting to process each row in the dataframe.")
-
-            for ksp_df_index in ksp_df.index:
+            income_terms = ['income', 'Einnahmen', self.settings["income_term"]]
+            expense_terms = ['expense', 'Ausgaben', self.settings["expense_term"]]
+            digit_columns = [column_values(ksp_df, col) for col in [
+                'Unnamed: 0', 'Unnamed: 1', 'Unnamed: 2', 'Unnamed: 3']]
+            columns = [column_values(ksp_df, col) for col in [
+                'type', 'Unnamed: 10', 'Unnamed: 11', 'groupName', 'subGroupName', 'name']]
+
+            for (item_type, max_limit, extended_max_limit, group_name, sub_group_name, name), digit_values in zip(
+                    zip(*columns), zip(*digit_columns)):
                 item = {"limits": {}}
-                mdict = ksp_df.loc[ksp_df_index].to_dict()
-                # self.logger.debug(f"Processing row at index {ksp_df_index}")
 
                 # Determine item type based on type column
-                if not pd.isna(mdict['type']):
-                    if mdict['type'] in ['income', 'Einnahmen', self.settings["income_term"]]:
+                if not pd.isna(item_type):
+                    if item_type in income_terms:
                         item['type'] = 'income'
-                    elif mdict['type'] in ['expense', 'Ausgaben', self.settings["expense_term"]]:
+                    elif item_type in expense_terms:
                         item['type'] = 'expense'
-                    elif mdict['type'] == 'budget':
+                    elif item_type == 'budget':
                         item['type'] = 'budget'
-                    # self.logger.debug(f"Set item type for index {ksp_df_index}: {item['type']}")
 
                 # Process limits
-                if not pd.isna(mdict.get('Unnamed: 10')):
-                    item['limits']['max'] = float(mdict['Unnamed: 10'])
-                    # self.logger.debug(f"Set max limit for index {ksp_df_index}: {item['limits']['max']}")
-                if not pd.isna(mdict.get('Unnamed: 11')):
-                    item['limits']['extendedMax'] = float(mdict['Unnamed: 11'])
-                    # self.logger.debug(f"Set extended max limit for index {ksp_df_index}: {item['limits']['extendedMax']}")
+                if not pd.isna(max_limit):
+                    item['limits']['max'] = float(max_limit)
+                if not pd.isna(extended_max_limit):
+                    item['limits']['extendedMax'] = float(extended_max_limit)
 
                 # Handle group items
-                if not pd.isna(mdict.get('groupName')) or not pd.isna(mdict.get('subGroupName')):
+                if not pd.isna(group_name) or not pd.isna(sub_group_name):
                     item['type'] = 'group'
-                    item['name'] = mdict['subGroupName'] if not pd.isna(
-                        mdict.get('subGroupName')) else mdict['groupName']
+                    item['name'] = sub_group_name if not pd.isna(
+                        sub_group_name) else group_name
                     # self.logger.debug(f"Set item as group with name '{item['name']}'")
 
                     # Construct the ID and range of the cost location
-                    starting_digits = "".join(str(int(mdict[col])) for col in [
-                                              'Unnamed: 0', 'Unnamed: 1', 'Unnamed: 2', 'Unnamed: 3'] if not pd.isna(mdict[col]))
+                    starting_digits = "".join(str(int(value))
+                                              for value in digit_values if not pd.isna(value))
                     min_digits = starting_digits + '0' * \
                         (max_costlocation_digits - len(starting_digits))
                     max_digits = starting_digits + '9' * \
@@ -1036,11 +1810,11 @@ class DevIntConnector:
                     # self.logger.debug(f"Group item with ID '{item['id']}' has range {min_digits} - {max_digits}")
 
                 # Handle individual items
-                elif not pd.isna(mdict.get('name')):
+                elif not pd.isna(name):
                     item['type'] = 'item'
-                    item['name'] = mdict['name']
-                    digits = "".join(str(int(mdict[col])) for col in [
-                                     'Unnamed: 0', 'Unnamed: 1', 'Unnamed: 2', 'Unnamed: 3'] if not pd.isna(mdict[col]))
+                    item['name'] = name
+                    digits = "".join(str(int(value))
+                                     for value in digit_values if not pd.isna(value))
                     item['number'] = int(digits)
                     item['id'] = digits
                     costlocations[item['id']] = item
@@ -1049,15 +1823,11 @@ class DevIntConnector:
             # Assign children to groups based on their ranges
             self.logger.debug(
                 "Assigning children to groups based on cost location ranges.")
+            index = CostLocationIndex(costlocations, parent_logger=self.logger)
             for id, item in costlocations.items():
                 if item['type'] == 'group':
-                    for child_id, child_item in costlocations.items():
-                        if child_item['type'] == 'item' and item['costLocations']['min'] <= child_item['number'] <= item['costLocations']['max']:
-                            item['children'][child_id] = child_item
-                            # self.logger.debug(f"Added item '{child_id}' as a child of group '{id}'")
-                        elif child_item['type'] == 'group' and child_id != id and item['costLocations']['min'] <= child_item['costLocations']['min'] and item['costLocations']['max'] >= child_item['costLocations']['max']:
-                            item['children'][child_id] = child_item
-                            # self.logger.debug(f"Added group '{child_id}' as a subgroup of '{id}'")
+                    for child_id in index.children_of(id):
+                        item['children'][child_id] = costlocations[child_id]
 
             self.logger.info("Completed processing kostenstellenplan.")
             return costlocations
@@ -1074,20 +1844,22 @@ class DevIntConnector:
         ignored_reports = 0
         self.logger.debug("Processing report entries in the dataframe.")
 
-        for report_ID in df.index:
-            mdict = df.loc[report_ID].to_dict()
+        columns = [df[column].tolist() for column in [
+            'Plan', 'Name', 'Kostenstellenstart', 'Kostenstellenende', 'Version']] if len(df) else []
+
+        for plan, name, cost_location_start, cost_location_end, version in zip(*columns):
             report = {
-                'id': mdict["Plan"],
-                'name': mdict['Name'],
+                'id': plan,
+                'name': name,
                 'costLocationsRange': {
-                    'min': mdict['Kostenstellenstart'],
-                    'max': mdict['Kostenstellenende']
+                    'min': cost_location_start,
+                    'max': cost_location_end
                 }
             }
 
             # Include only reports with version 2
-            if mdict['Version'] == 2:
-                reports[mdict["Plan"]] = report
+            if version == 2:
+                reports[plan] = report
                 self.logger.debug(
                     f"Added report with ID '{report['id']}' and name '{report['name']}'.")
             else:
@@ -1103,6 +1875,41 @@ class DevIntConnector:
         self.logger.debug("Completed processing all report entries.")
         return reports
 
+    EMPTY_SLOT_CELL = {'type': 'empty', 'limit': 0.0, 'limitType': 'relative'}
+
+    # Methods whose code determines the content of the workbook snapshots
+    snapshot_parsers = ('download_all_sheets', 'download_all_workbooks', 'parse_instruction_files', 'read_time_slots', 'read_kontenrahmen',
+                        'read_kostenstellenplan', 'read_reports_overview', 'read_report_schema_into',
+                        'parse_slot_cell', 'read_distribution_instructions', 'parse_expected_bookings')
+
+    @staticmethod
+    def parse_slot_cell(value) -> dict:
+        """
+        Parses a filled slot cell of a report schema.
+
+        Parameters:
+        value: The cell value, e.g. 1200, 'sum', 'bookings' or '1200:+10%'.
+
+        Returns:
+        dict: The 'type' of the cell and, for budgets, its 'limit', 'limitType' and 'extendedLimit'.
+        """
+        cell = {}
+        if isinstance(value, str):
+            cell['type'] = 'sum' if value.lower() in ['fieldsum', 'cellsum', 'sum', 'summe'] else 'bookings' if value.lower() in [
+                'bookings', 'buchungen'] else 'budget'
+            if ':' in value:
+                limit, *extra = value.split(':')
+                cell['limit'] = float(limit)
+                cell['limitType'] = 'absolute' if extra and extra[0] == '!' else 'exceedable' if extra and extra[0].startswith(
+                    '+') else 'relative'
+                if extra and extra[0].startswith('+') and extra[0].endswith('%'):
+                    cell['extendedLimit'] = cell['limit'] * (
+                        1.0 + float(extra[0][1:-1]) / 100.0)
+        elif isinstance(value, (int, float)):
+            cell.update(
+                {'type': 'budget', 'limit': float(value), 'limitType': 'relative'})
+        return cell
+
     def read_report_schema_into(self, report: dict, schema_df: pd.DataFrame, time_slot_templates: dict):
         self.logger.debug("Starting read_report_schema_into function.")
 
@@ -1152,27 +1959,55 @@ class DevIntConnector:
             report['slots'] = slots_data
             report['numberSectionLevels'] = len(section_column_names)
 
+            # The slot cells are parsed column by column, each distinct cell value only once
+            slot_bases = []
+            slot_cells = []
+            for report_slot in report['slots']:
+                slot_bases.append({
+                    'timeSlotId': report_slot['timeSlotId'],
+                    'buildListing': report_slot['buildListing'],
+                    'slotDetails': report_slot,
+                    'orderNumber': report_slot['orderNumber']
+                })
+                column_name = f"s:{report_slot['timeSlotId']}"
+                if report_slot['buildListing']:
+                    column_name += ":listing"
+                if column_name not in schema_df.columns:
+                    slot_cells.append([self.EMPTY_SLOT_CELL] * len(schema_df))
+                    continue
+                parsed_values = {}
+                cells = []
+                for value, missing in zip(schema_df[column_name].tolist(), schema_df[column_name].isna().tolist()):
+                    if missing:
+                        cells.append(self.EMPTY_SLOT_CELL)
+                        continue
+                    if value not in parsed_values:
+                        parsed_values[value] = self.parse_slot_cell(value)
+                    cells.append(parsed_values[value])
+                slot_cells.append(cells)
+
             # Process items in schema
             items = []
-            order_number = 0
-            for row_id in schema_df.index:
-                mdict = schema_df.loc[row_id].to_dict()
+            section_columns = [column_values(schema_df, col)
+                               for col in section_column_names]
+            section_rows = zip(*section_columns) if section_columns else [()] * len(schema_df)
+            for order_number, (sections, name, item_type, cost_location) in enumerate(zip(
+                    section_rows, column_values(schema_df, 'Name'), column_values(schema_df, 'Type'),
+                    column_values(schema_df, 'Cost Location'))):
                 item = {'orderNumber': order_number}
-                order_number += 1
                 hierarchy_location = [
-                    mdict[col] for col in section_column_names if not pd.isna(mdict[col])
+                    section for section in sections if not pd.isna(section)
                 ]
                 item['hierarchyLocation'] = hierarchy_location
 
                 # Populate item details based on type
-                item['name'] = mdict.get('Name', '') if not pd.isna(
-                    mdict.get('Name')) else ''
-                item['type'] = mdict['Type'].lower() if mdict['Type'].lower() in [
+                item['name'] = name if not pd.isna(name) else ''
+                item['type'] = item_type.lower() if item_type.lower() in [
                     'income', 'expense', 'group'] else 'unknown'
 
                 if item['type'] in ['expense', 'income']:
-                    cost_loc_str = mdict['Cost Location'] if isinstance(
-                        mdict['Cost Location'], str) else f"{int(mdict['Cost Location']):04d}"
+                    cost_loc_str = cost_location if isinstance(
+                        cost_location, str) else f"{int(cost_location):04d}"
                     item['costLocationsStrings'] = cost_loc_str.split(',')
                     item['costLocations'] = [
                         int(cl) for cl in item['costLocationsStrings']]
@@ -1180,44 +2015,9 @@ class DevIntConnector:
                 elif item['type'] == 'group' and hierarchy_location:
                     item['name'] = hierarchy_location[-1]
 
-                # Process slot-specific info
-                slots_info = []
-                for report_slot in report['slots']:
-                    row_slot_info = {
-                        'timeSlotId': report_slot['timeSlotId'],
-                        'buildListing': report_slot['buildListing'],
-                        'slotDetails': report_slot,
-                        'orderNumber': report_slot['orderNumber']
-                    }
-                    column_name = f"s:{report_slot['timeSlotId']}"
-                    if row_slot_info['buildListing']:
-                        column_name += ":listing"
-
-                    # Parse values and set type/limits
-                    value = mdict.get(column_name)
-                    if not pd.isna(value):
-                        if isinstance(value, str):
-                            row_slot_info['type'] = 'sum' if value.lower() in ['fieldsum', 'cellsum', 'sum', 'summe'] else 'bookings' if value.lower() in [
-                                'bookings', 'buchungen'] else 'budget'
-                            if ':' in value:
-                                limit, *extra = value.split(':')
-                                row_slot_info['limit'] = float(limit)
-                                row_slot_info['limitType'] = 'absolute' if extra and extra[0] == '!' else 'exceedable' if extra and extra[0].startswith(
-                                    '+') else 'relative'
-                                if extra and extra[0].startswith('+') and extra[0].endswith('%'):
-                                    row_slot_info['extendedLimit'] = row_slot_info['limit'] * (
-                                        1.0 + float(extra[0][1:-1]) / 100.0)
-                        elif isinstance(value, (int, float)):
-                            row_slot_info.update(
-                                {'type': 'budget', 'limit': float(value), 'limitType': 'relative'})
-                    else:
-                        row_slot_info.update(
-                            {'type': 'empty', 'limit': 0.0, 'limitType': 'relative'})
-
-                    slots_info.append(row_slot_info)
-                    # self.logger.debug(f"Processed slot info for item {item['name']} with slot ID '{report_slot['timeSlotId']}'.")
-
-                item['slots'] = slots_info
+                # Slot-specific info
+                item['slots'] = [{**base, **cells[order_number]}
+                                 for base, cells in zip(slot_bases, slot_cells)]
                 items.append(item)
 
             # Collect cost locations and strings
@@ -1226,14 +2026,16 @@ class DevIntConnector:
             report['costLocationsStrings'] = list({str for i in items if i['type'] in [
                                                   'expense', 'income'] for str in i['costLocationsStrings']})
 
-            # Assign children to groups
+            # Assign children to groups, the items one level below their hierarchy location
+            children_by_parent = {}
+            for item in items:
+                if item['hierarchyLocation']:
+                    children_by_parent.setdefault(
+                        tuple(item['hierarchyLocation'][:-1]), []).append(item)
             for row in items:
                 if row['type'] == 'group':
-                    row['children'] = [
-                        item for item in items
-                        if len(item['hierarchyLocation']) == len(row['hierarchyLocation']) + 1
-                        and item['hierarchyLocation'][:-1] == row['hierarchyLocation']
-                    ]
+                    row['children'] = list(children_by_parent.get(
+                        tuple(row['hierarchyLocation']), []))
                     # if row['children']:
                     #     self.logger.debug(f"Assigned {len(row['children'])} children to group '{row['name']}'.")
 
@@ -1254,28 +2056,28 @@ class DevIntConnector:
             dist = []
             self.logger.debug("Processing each row in the dataframe.")
 
-            for row_id in df.index:
-                mdict = df.loc[row_id].to_dict()
-                entry = {'channelType': mdict['type'], 'packages': []}
-                # self.logger.debug(
-                #     f"Processing distribution entry with channel type '{mdict['type']}'.")
+            columns = [column_values(df, column) for column in [
+                'type', 'recipient', 'trigger', 'content']]
+
+            for channel_type, recipient, trigger, content_value in zip(*columns):
+                entry = {'channelType': channel_type, 'packages': []}
 
                 # Check and add recipient if available
-                if not pd.isna(mdict.get('recipient')):
-                    entry['recipient'] = mdict['recipient']
+                if not pd.isna(recipient):
+                    entry['recipient'] = recipient
                     # self.logger.debug(f"Added recipient: {entry['recipient']}")
 
                 # Process trigger information if available
-                if not pd.isna(mdict.get('trigger')):
-                    trigger_parts = mdict['trigger'].split(':')
+                if not pd.isna(trigger):
+                    trigger_parts = trigger.split(':')
                     entry['trigger'] = {'type': trigger_parts[0].strip()}
                     if len(trigger_parts) > 1:
                         entry['trigger']['condition'] = trigger_parts[1].strip()
                     # self.logger.debug(f"Added trigger: {entry['trigger']}")
 
                 # Process content information
-                if not pd.isna(mdict.get('content')):
-                    content = mdict['content'].split('),')
+                if not pd.isna(content_value):
+                    content = content_value.split('),')
                     # self.logger.debug(
                     #     f"Processing content for entry with {len(content)} content items.")
 
@@ -1309,7 +2111,7 @@ class DevIntConnector:
                 # Append completed entry to the distribution list
                 dist.append(entry)
                 self.logger.debug(
-                    f"Completed processing entry with channel type '{mdict['type']}'.")
+                    f"Completed processing entry with channel type '{channel_type}'.")
 
             self.logger.debug(
                 "Completed processing all distribution instructions.")
@@ -1319,13 +2121,205 @@ class DevIntConnector:
             self.logger.error(f"Error in read_distribution_instructions: {e}")
             raise
 
-    def read_instruction_files(self, container=None):
+    def read_instruction_files(self, container=None, trigger_selector: list = None, workbook_contents: dict = None):
+        """
+        Returns the processed instructions, parsing the instruction files only when one of them changed.
+
+        With a trigger selector, only the reports that the matching sendings of the Flow Plan refer to are
+        included, so a narrow request does not parse or build the budget plans of the other reports.
+
+        Parameters:
+        container (azure.storage.blob.ContainerClient, optional): The container with the instruction files.
+        trigger_selector (list, optional): The triggers of the request, all reports are included if None.
+        workbook_contents (dict, optional): Blob name -> (ETag, file content) of workbooks that were already
+            downloaded, e.g. by a blob trigger. They are not downloaded again if they are still the current version.
+
+        Returns:
+        dict: The processed instructions.
+        """
         self.logger.debug("Starting read_instruction_files function.")
 
         # Determine container
         container = container or self.conn_clients["templates_folder"]
         self.logger.debug(f"Using container: {container.container_name}")
 
+        def parse(container, files):
+            return self.parse_instruction_files(container, files, trigger_selector, workbook_contents)
+
+        if trigger_selector is None:
+            instructions = self.read_compiled_workbooks(
+                'instructions', container, parse)
+        else:
+            instructions = self.read_compiled_workbooks(
+                'instructions', container, parse,
+                narrow=lambda instructions: self.select_reports(
+                    instructions, trigger_selector),
+                selection=json.dumps(trigger_selector, sort_keys=True))
+        self.logger.info("Completed reading instruction files.")
+        return instructions
+
+    def get_selected_report_ids(self, distribution: list, trigger_selector: list = None):
+        """
+        Returns the ids of the reports that the sendings matching the trigger selector refer to.
+
+        Parameters:
+        distribution (list): The sendings of the Flow Plan.
+        trigger_selector (list, optional): The triggers of the request.
+
+        Returns:
+        set: The report ids, or None if all reports are needed.
+        """
+        if trigger_selector is None:
+            return None
+        report_ids = set()
+        for sending in distribution:
+            if sending.get('trigger') not in trigger_selector:
+                continue
+            for package in sending['packages']:
+                for item in package['content']:
+                    if item['type'] in ['report', 'reportsummary']:
+                        report_ids.add(item['scope'])
+                    elif item['type'] not in ['bookings', 'accounts', 'costlocations']:
+                        # A content type that may use any report
+                        return None
+        return report_ids
+
+    def select_reports(self, instructions: dict, trigger_selector: list = None) -> dict:
+        """
+        Narrows processed instructions to the reports the trigger selector needs, see get_selected_report_ids.
+
+        Returns:
+        dict: The instructions, without the other reports and their budget plan sheets.
+        """
+        report_ids = self.get_selected_report_ids(
+            instructions.get('distribution', []), trigger_selector)
+        if report_ids is None or 'reports' not in instructions:
+            return instructions
+        instructions['reports'] = {key: report for key, report in instructions['reports'].items()
+                                   if key in report_ids}
+        for sheets in ['sheets', 'unprocessedSheets', 'processedSheets']:
+            for sheet in list(instructions[sheets]):
+                if sheet.startswith("Budget Plan ") and sheet[len("Budget Plan "):] not in report_ids:
+                    del instructions[sheets][sheet]
+        self.logger.info(
+            f"Selected reports {sorted(instructions['reports'])} for the trigger selector.")
+        return instructions
+
+    def read_compiled_workbooks(self, kind: str, container, parse, workbook_names: list = None,
+                                narrow=None, selection: str = None):
+        """
+        Returns workbooks compiled by a parse function, parsing them only when one of them changed.
+
+        The cache key is built from the name and ETag of the workbooks, so listing the container is the only
+        request while nothing changed. The compiled result is kept in process memory for warm invocations and
+        as a snapshot blob for cold starts. The blob triggers compile the snapshot as soon as a workbook is
+        uploaded. A snapshot of other workbook versions or written by other parsers is stale, the workbooks are
+        then parsed on the request path. Every call returns its own copy, as the report stages modify the result.
+
+        Parameters:
+        kind (str): 'instructions' or 'expected_bookings', names the cache entry and the snapshot blob.
+        container (azure.storage.blob.ContainerClient): The container with the workbooks.
+        parse (callable): Compiles the workbooks, called with the container and the listed blob properties.
+        workbook_names (list, optional): The workbooks the result depends on, all .xlsx files if None.
+        narrow (callable, optional): Narrows a full compiled result to the selection.
+        selection (str, optional): Identifies a narrowed result, which parse then compiles. A narrowed result is
+            taken from the full snapshot if it is current and cached in process memory under its own key, but
+            never written as the snapshot.
+
+        Returns:
+        dict: The compiled workbooks.
+        """
+        # List blobs in container, their ETags identify the version of the workbooks
+        self.logger.debug("Listing blobs in container...")
+        files = list(container.list_blobs())
+        fingerprint = get_workbook_fingerprint(files, workbook_names)
+
+        cache_settings = self.settings.get('instruction_cache', {})
+        if not cache_settings.get('enabled', True):
+            return parse(container, files)
+
+        def load_compiled(cached_fingerprint):
+            if cached_fingerprint == fingerprint:
+                return TTLCache.NOT_MODIFIED, fingerprint
+            snapshot = self._load_snapshot(kind, fingerprint)
+            if snapshot is not None and selection is not None:
+                snapshot = pickle.dumps(
+                    narrow(pickle.loads(snapshot)), protocol=pickle.HIGHEST_PROTOCOL)
+            elif snapshot is None:
+                snapshot = pickle.dumps(
+                    parse(container, files), protocol=pickle.HIGHEST_PROTOCOL)
+                if selection is None:
+                    self._save_snapshot(kind, fingerprint, snapshot)
+            return snapshot, fingerprint
+
+        cache_key = f"{kind}:{container.container_name}"
+        if selection is not None:
+            cache_key += f":{hashlib.sha256(selection.encode('utf-8')).hexdigest()[:16]}"
+        snapshot = warm_cache.get(cache_key, load_compiled, ttl_seconds=0)
+        return pickle.loads(snapshot)
+
+    def _get_snapshot_blob(self, kind: str):
+        cache_settings = self.settings.get('instruction_cache', {})
+        container = self.conn_clients.get(
+            f"{cache_settings.get('container', 'financial_reports')}_folder") if self.conn_clients else None
+        if container is None:
+            return None
+        return container.get_blob_client(cache_settings.get('blob_name', 'cache/{kind}.pkl.gz').format(kind=kind))
+
+    def _snapshot_metadata(self, fingerprint: str) -> dict:
+        # Snapshots of other workbook versions, parsers or library versions are treated as missing
+        return {'fingerprint': fingerprint, 'schema': get_snapshot_schema_hash(self.get_excel_engine())}
+
+    def _load_snapshot(self, kind: str, fingerprint: str):
+        blob_client = self._get_snapshot_blob(kind)
+        if blob_client is None:
+            return None
+        try:
+            if not blob_client.exists() or blob_client.get_blob_properties().metadata != self._snapshot_metadata(fingerprint):
+                self.logger.info(
+                    f"No current snapshot in {blob_client.blob_name}, parsing the workbooks.")
+                return None
+            snapshot = gzip.decompress(blob_client.download_blob().readall())
+            self.logger.debug(
+                f"Loaded compiled workbooks from {blob_client.blob_name}.")
+            return snapshot
+        except Exception as e:
+            self.logger.warning(
+                f"Reading snapshot {blob_client.blob_name} failed, parsing the workbooks: {e}")
+            return None
+
+    def _save_snapshot(self, kind: str, fingerprint: str, snapshot: bytes):
+        blob_client = self._get_snapshot_blob(kind)
+        if blob_client is None:
+            return
+        try:
+            blob_client.upload_blob(gzip.compress(snapshot), overwrite=True,
+                                    metadata=self._snapshot_metadata(fingerprint))
+            self.logger.debug(
+                f"Saved compiled workbooks to {blob_client.blob_name}.")
+        except Exception as e:
+            self.logger.error(
+                f"Saving snapshot {blob_client.blob_name} failed: {e}")
+
+    def parse_instruction_files(self, container, instruction_files: list, trigger_selector: list = None,
+                                workbook_contents: dict = None):
+        """
+        Downloads and parses the instruction workbooks.
+
+        The Flow Plan is parsed first. With a trigger selector, the budget plans of reports that no matching
+        sending refers to are neither parsed from Excel nor processed.
+
+        Parameters:
+        container (azure.storage.blob.ContainerClient): The container with the instruction files.
+        instruction_files (list): The blob properties of the files in the container.
+        trigger_selector (list, optional): The triggers of the request, all reports are parsed if None.
+        workbook_contents (dict, optional): Blob name -> (ETag, file content) of workbooks that were already downloaded.
+
+        Returns:
+        dict: The processed instructions.
+        """
+        self.logger.debug("Starting parse_instruction_files function.")
+
         # Initialize instructions structure
         instructions = {
             "sheets": {},
@@ -1333,24 +2327,48 @@ class DevIntConnector:
             "processedSheets": {}
         }
 
-        # List and process blobs in container
-        self.logger.debug("Listing blobs in container...")
-        instruction_files_list = container.list_blobs()
-        file_count = 0
-
-        for instruction_file in instruction_files_list:
-            file_count += 1
-            blob_client = container.get_blob_client(instruction_file.name)
-            self.logger.debug(f"Processing file {instruction_file.name}")
+        # Process only .xlsx files, merged in name order so that the result does not depend on timing
+        file_count = len(instruction_files)
+        excel_files = sorted(instruction_file.name for instruction_file in instruction_files
+                             if instruction_file.name.endswith(".xlsx"))
+        self.logger.debug(f"Identified Excel files: {excel_files}")
+        contents = self.download_workbooks(
+            container, excel_files, get_current_contents(instruction_files, workbook_contents))
+
+        # Flow Plan, its sendings determine which reports are needed
+        engine = self.get_excel_engine()
+        sheet_names = {}
+        flow_plan = None
+        for name in excel_files:
+            workbook = pd.ExcelFile(BytesIO(contents[name]), engine=engine)
+            sheet_names[name] = workbook.sheet_names
+            if "Flow Plan" in workbook.sheet_names:
+                flow_plan = pd.read_excel(workbook, sheet_name="Flow Plan")
+        if flow_plan is not None:
+            self.logger.info("Found 'Flow Plan' sheet.")
+            instructions["distribution"] = self.read_distribution_instructions(
+                flow_plan)
+            instructions["sheets"]["Flow Plan"] = flow_plan
+            instructions["processedSheets"]["Flow Plan"] = flow_plan
+        else:
+            self.logger.error("No 'Flow Plan' sheet found in any Excel file.")
+        report_ids = self.get_selected_report_ids(
+            instructions.get("distribution", []), trigger_selector)
 
-            # Process only .xlsx files
-            if instruction_file.name.endswith(".xlsx"):
-                self.logger.debug(
-                    f"Identified Excel file: {instruction_file.name}")
-                dataframes = self.download_all_sheets(blob_client)
-                for key, df in dataframes.items():
-                    instructions["sheets"][key] = df
-                    instructions["unprocessedSheets"][key] = df
+        # Budget plans of other reports are not parsed
+        skip_sheets = {"Flow Plan"}
+        if report_ids is not None:
+            self.logger.info(
+                f"Parsing only the budget plans of the reports {sorted(report_ids)}.")
+            skip_sheets.update(
+                sheet for name in excel_files for sheet in sheet_names[name]
+                if sheet.startswith("Budget Plan ") and sheet[len("Budget Plan "):] not in report_ids)
+        workbooks = self.download_all_workbooks(
+            container, excel_files, skip_sheets=skip_sheets, contents=contents)
+        for name in excel_files:
+            for key, df in workbooks[name].items():
+                instructions["sheets"][key] = df
+                instructions["unprocessedSheets"][key] = df
 
         if file_count == 0:
             self.logger.warning("No files found in the container.")
@@ -1409,6 +2427,9 @@ class DevIntConnector:
                 "No 'Reports Overview' sheet found in any Excel file.")
 
         # Budget Plans
+        if "reports" in instructions and report_ids is not None:
+            instructions["reports"] = {key: report for key, report in instructions["reports"].items()
+                                       if key in report_ids}
         if "reports" in instructions:
             self.logger.info("Processing reports for budget plans.")
             for key, report in instructions['reports'].items():
@@ -1426,76 +2447,198 @@ class DevIntConnector:
             self.logger.error(
                 "No 'reports' key found in instructions dictionary.")
 
-        # Flow Plan
-        if "Flow Plan" in instructions["unprocessedSheets"]:
-            self.logger.info("Found 'Flow Plan' sheet.")
-            instructions["distribution"] = self.read_distribution_instructions(
-                instructions["unprocessedSheets"]["Flow Plan"]
-            )
-            instructions["processedSheets"]["Flow Plan"] = instructions["unprocessedSheets"]["Flow Plan"]
-            del instructions["unprocessedSheets"]["Flow Plan"]
-        else:
-            self.logger.error("No 'Flow Plan' sheet found in any Excel file.")
-
-        self.logger.info("Completed reading instruction files.")
+        self.logger.info("Completed parsing instruction files.")
         return instructions
 
-    def get_all_bb_posts(self, start_date="2021-01-01", end_date="2039-12-31"):
+    def get_posting_fields(self):
+        """
+        Returns the fields of the BB postings that the configured sheets and sendings use.
+
+        The projection is the union of the fields the pipeline reads itself, the personnel columns, the listing
+        headers, the bookings sheet columns and the columns the report formulas refer to. All other fields are
+        dropped when the postings are downloaded.
+
+        Returns:
+        list: The sorted field names, or None if 'keep_all_fields' is set for the full 'Buchungen' export.
+        """
+        projection = self.settings.get('posting_projection', {})
+        if projection.get('keep_all_fields', False):
+            return None
+        fields = set(projection.get('fields', []))
+        fields.update(PostingStore.checksum_fields)
+        fields.update(self.settings.get('keep_personnel_columns', []))
+        fields.update(self.settings.get('listing_headers', []))
+        fields.update(header for header in self.settings.get(
+            'bookingsHeaderWidth', {}) if header != 'default')
+        fields.update(self.settings[key] for key in (
+            'bookingsCostlocationColumnHeader', 'bookingsDateColumnHeader', 'bookingsAmountColumnHeader')
+            if key in self.settings)
+        return sorted(fields)
+
+    def _fetch_bb_posts_page(self, start_date: str, end_date: str, offset: int, limit: int, order: dict = None,
+                             fields: frozenset = None):
+        # Prepare payload for the request, api key and auth headers are added by the client
+        payload = {
+            "date_from": start_date,
+            "date_to": end_date,
+            "offset": offset,
+            "limit": limit
+        }
+        if order:
+            payload["order"] = json.dumps(order)
+
+        # Send request to BB API and decode the postings while they arrive
+        self.logger.debug(f"Sending request with offset {offset}.")
+        response = self.conn_clients['bb_client'].post(
+            '/postings/get', payload, stream=True)
+
+        # A failed page must never look like the last page, the caller would take a partial download as complete
+        if response.status_code >= 400 or RequestScheduler.is_html(response):
+            status = response.status_code
+            response.close()
+            raise ValueError(
+                f"API answered the postings request for offset {offset} with status {status}.")
+        try:
+            return list(stream_json_array(response, 'data', record_hook=lambda record: compact_record(record, fields=fields)))
+        except ValueError as e:
+            self.logger.error(
+                f"Unexpected response structure received from API for offset {offset}: {e}")
+            raise
+
+    @staticmethod
+    def _deduplicate_posts(postings: list) -> list:
+        # Keep the last downloaded version of every posting, in the order of first appearance
+        unique = {}
+        for posting in postings:
+            unique[str(posting['id_by_customer'])] = posting
+        return list(unique.values())
+
+    def _get_all_bb_posts_keyset(self, start_date: str, end_date: str, limit: int, fields: frozenset = None):
+        """
+        Downloads the postings with a "since date" cursor instead of growing offsets.
+
+        The postings are requested in ascending date order, every page starts at the last date of the
+        previous page, so the offset stays 0 and postings created or deleted before the cursor cannot
+        shift the following pages. The overlapping postings of the cursor date are removed by
+        'id_by_customer'. Only a single date with more postings than the limit is paged with offsets.
+
+        The API does not always honour the order parameter. A page out of date order would move the cursor past
+        dates that were never fetched, so every page is checked and the cursor is given up on the first such page.
+
+        Returns:
+        list: The postings of the date range, each posting once, or None if a page was not in ascending date order.
+        """
+        retrieved_posts = {}
+        cursor = start_date
+        offset = 0
+        order = {"date": "ASC"}
+        while True:
+            page = self._fetch_bb_posts_page(
+                cursor, end_date, offset, limit, order, fields)
+            dates = [posting['date'][:10] for posting in page]
+            if any(earlier > later for earlier, later in zip([cursor] + dates, dates)):
+                self.logger.warning(
+                    f"Postings from {cursor} (offset {offset}) are not in ascending date order, the date cursor cannot be used.")
+                return None
+            for posting in page:
+                retrieved_posts[str(posting['id_by_customer'])] = posting
+            self.logger.debug(
+                f"Retrieved {len(page)} rows from {cursor} (offset {offset}); total collected: {len(retrieved_posts)}.")
+            if len(page) < limit:
+                self.logger.debug("Final batch retrieved; exiting loop.")
+                break
+
+            last_date = dates[-1]
+            if last_date > cursor:
+                cursor, offset = last_date, 0
+            else:
+                # The whole page has the cursor date, continue within that date
+                offset += limit
+        return list(retrieved_posts.values())
+
+    def get_all_bb_posts(self, start_date="2021-01-01", end_date="2039-12-31", max_concurrency=None, pagination=None):
+        """
+        Downloads all BB postings of a date range.
+
+        Parameters:
+        start_date (str, optional): First posting date (YYYY-MM-DD).
+        end_date (str, optional): Last posting date (YYYY-MM-DD).
+        max_concurrency (int, optional): Pages in flight in offset mode. Default from settings.
+        pagination (str, optional): 'keyset' for the date cursor, 'offset' for concurrent offset pages. Default from settings.
+            The date cursor falls back to offset pages if the API does not return the postings in date order.
+
+        Returns:
+        list: The postings with the fields of get_posting_fields, each 'id_by_customer' once.
+
+        Raises:
+        ValueError: If a page could not be downloaded completely, no partial result is returned.
+        """
         self.logger.debug("Starting get_all_bb_posts function.")
 
         try:
             # Initialize variables for pagination
-            base_url = "https://webapp.buchhaltungsbutler.de/api/v1"
-            request = '/postings/get'
-            url = base_url + request
-            offset = 0
-            limit = 1000
-            retrieved_posts = []
+            api_settings = self.settings.get('bb_api', {})
+            limit = api_settings.get('posts_page_limit', 1000)
+            fields = self.get_posting_fields()
+            fields = frozenset(fields) if fields is not None else None
+            pagination = pagination or api_settings.get(
+                'posts_pagination', 'keyset')
+            if pagination == 'keyset':
+                retrieved_posts = self._get_all_bb_posts_keyset(
+                    start_date, end_date, limit, fields)
+                if retrieved_posts is not None:
+                    self.logger.debug(
+                        f"Completed fetching all posts with date cursor: {len(retrieved_posts)} postings.")
+                    return retrieved_posts
+                # Without a reliable date order the whole range is downloaded again with offsets
+                self.logger.info(
+                    "Falling back to offset pagination for the postings.")
 
-            # Loop to fetch posts until returned rows are less than the limit
-            while True:
-                # Prepare payload and headers for the request
-                payload = json.dumps({
-                    "api_key": self.conn_clients['bb_api_key'],
-                    "date_from": start_date,
-                    "date_to": end_date,
-                    "offset": offset,
-                    "limit": limit
-                })
-                headers = {
-                    'Content-Type': 'application/json',
-                    'Authorization': self.conn_clients['bb_authorization'],
-                    'Cookie': 'bbutler=' + self.conn_clients['bb_cookie']
-                }
+            max_concurrency = max(
+                1, max_concurrency or api_settings.get('max_concurrency', 4))
+            retrieved_posts = []
 
-                # Send request to BB API
-                self.logger.debug(f"Sending request with offset {offset}.")
-                response = requests.request(
-                    "POST", url, headers=headers, data=payload)
-                self.logger.debug("Request sent, awaiting response.")
-
-                # Parse response
-                result = json.loads(response.text)
-                if 'rows' in result and 'data' in result:
-                    rows = result['rows']
-                    retrieved_posts.extend(result['data'])
+            # The first page tells whether there is anything left to fetch at all
+            page = self._fetch_bb_posts_page(
+                start_date, end_date, 0, limit, fields=fields)
+            retrieved_posts.extend(page)
+            self.logger.debug(
+                f"Retrieved {len(page)} rows; total collected: {len(retrieved_posts)}.")
+            if len(page) < limit:
+                self.logger.debug("Final batch retrieved with first request.")
+                return retrieved_posts
+
+            # Keep a window of up to max_concurrency pages in flight and consume them in offset order,
+            # the first short page ends the download and all pages beyond it are discarded
+            next_offset = limit
+            in_flight = deque()
+            with ThreadPoolExecutor(max_workers=max_concurrency) as executor:
+                while True:
+                    while len(in_flight) < max_concurrency:
+                        in_flight.append((next_offset, executor.submit(
+                            self._fetch_bb_posts_page, start_date, end_date, next_offset, limit, None, fields)))
+                        next_offset += limit
+
+                    offset, future = in_flight.popleft()
+                    try:
+                        page = future.result()
+                    except Exception:
+                        for _, pending in in_flight:
+                            pending.cancel()
+                        raise
+                    retrieved_posts.extend(page)
                     self.logger.debug(
-                        f"Retrieved {rows} rows; total collected: {len(retrieved_posts)}.")
-
-                    # If rows returned are fewer than limit, exit loop
-                    if rows < limit:
+                        f"Retrieved {len(page)} rows at offset {offset}; total collected: {len(retrieved_posts)}.")
+                    if len(page) < limit:
                         self.logger.debug(
                             "Final batch retrieved; exiting loop.")
                         break
 
-                    # Increment offset for next batch
-                    offset += limit
-                else:
-                    # If unexpected response structure, log warning and exit
-                    self.logger.warning(
-                        "Unexpected response structure received from API.")
-                    break
+                for _, future in in_flight:
+                    future.cancel()
 
+            # Postings created or deleted during the download shift the offsets of later pages
+            retrieved_posts = self._deduplicate_posts(retrieved_posts)
             self.logger.debug("Completed fetching all posts.")
             return retrieved_posts
 
@@ -1503,62 +2646,336 @@ class DevIntConnector:
             self.logger.error(f"Error in get_all_bb_posts: {e}")
             raise
 
-    def get_all_bb_accounts(self):
-        self.logger.debug("Starting get_all_bb_accounts function.")
+    def get_posting_store(self, partition: str = None):
+        store_settings = self.settings.get('posting_store', {})
+        container = None
+        if self.conn_clients:
+            container = self.conn_clients.get(
+                f"{store_settings.get('container', 'financial_reports')}_folder")
+        if partition is not None:
+            blob_name = self.settings.get('posting_partitions', {}).get(
+                'blob_name', 'cache/bb_postings_{partition}.json.gz').format(partition=partition)
+        else:
+            blob_name = store_settings.get(
+                'blob_name', 'cache/bb_postings.json.gz')
+        return PostingStore(container=container, blob_name=blob_name,
+                            parent_logger=self.logger)
 
-        try:
-            # Set up API URL and endpoint
-            base_url = "https://webapp.buchhaltungsbutler.de/api/v1"
-            request = '/accounts/get'
-            url = base_url + request
-            self.logger.debug(f"Request URL: {url}")
-
-            # Prepare payload and headers for the request
-            payload = json.dumps({
-                "api_key": self.conn_clients['bb_api_key']
+    @staticmethod
+    def _shift_months(date: datetime.date, months: int) -> datetime.date:
+        month_index = date.month - 1 + months
+        return datetime.date(date.year + month_index // 12, month_index % 12 + 1, 1)
+
+    def get_bb_posts_partitions(self, start_date="2021-01-01", end_date="2039-12-31", today: datetime.date = None):
+        """
+        Splits the posting history into the partitions of closed fiscal years and the open period.
+
+        A fiscal year counts as closed once 'closed_after_months' have passed since its end. Closed partitions
+        always cover complete fiscal years (or months), also if start_date lies inside of one.
+
+        Returns:
+        tuple: (list of closed partitions as dicts with 'name', 'start' and 'end', first date of the open period)
+        """
+        partition_settings = self.settings.get('posting_partitions', {})
+        granularity = partition_settings.get('granularity', 'year')
+        fiscal_month = partition_settings.get('fiscal_year_start_month', 1)
+        closed_after_months = partition_settings.get('closed_after_months', 6)
+        today = today or datetime.date.today()
+
+        # The open period starts with the oldest fiscal year which is not closed yet
+        open_start = datetime.date(
+            today.year if today.month >= fiscal_month else today.year - 1, fiscal_month, 1)
+        while today < self._shift_months(open_start, closed_after_months):
+            open_start = self._shift_months(open_start, -12)
+
+        first = datetime.datetime.strptime(start_date, '%Y-%m-%d').date()
+        last = min(datetime.datetime.strptime(end_date, '%Y-%m-%d').date(),
+                   open_start - datetime.timedelta(days=1))
+        step = 12 if granularity == 'year' else 1
+        partition_start = datetime.date(
+            first.year if first.month >= fiscal_month else first.year - 1, fiscal_month, 1)
+        while self._shift_months(partition_start, step) <= first:
+            partition_start = self._shift_months(partition_start, step)
+
+        partitions = []
+        while partition_start <= last:
+            partition_end = self._shift_months(
+                partition_start, step) - datetime.timedelta(days=1)
+            partitions.append({
+                'name': partition_start.strftime('%Y' if granularity == 'year' else '%Y-%m'),
+                'start': partition_start.strftime('%Y-%m-%d'),
+                'end': partition_end.strftime('%Y-%m-%d')
             })
-            headers = {
-                'Content-Type': 'application/json',
-                'Authorization': self.conn_clients['bb_authorization'],
-                'Cookie': 'bbutler=' + self.conn_clients['bb_cookie']
-            }
+            partition_start = partition_end + datetime.timedelta(days=1)
+        return partitions, open_start.strftime('%Y-%m-%d')
+
+    @staticmethod
+    def _months_between(start_date: str, end_date: str) -> list:
+        """Returns (month, first date, last date) of every month touched by the date range, clipped to the range."""
+        months = []
+        month_start = datetime.datetime.strptime(
+            start_date[:7] + '-01', '%Y-%m-%d').date()
+        last = datetime.datetime.strptime(end_date, '%Y-%m-%d').date()
+        while month_start <= last:
+            next_month = DevIntConnector._shift_months(month_start, 1)
+            months.append((month_start.strftime('%Y-%m'),
+                           max(start_date, month_start.strftime('%Y-%m-%d')),
+                           min(end_date, (next_month - datetime.timedelta(days=1)).strftime('%Y-%m-%d'))))
+            month_start = next_month
+        return months
+
+    def _mark_months_verified(self, store: PostingStore, start_date: str, end_date: str):
+        # Months which were just downloaded completely do not need to be reconciled soon. Only call this after
+        # get_all_bb_posts returned, a failed download raises and must leave the months due
+        end_date = min(end_date, datetime.date.today().strftime('%Y-%m-%d'))
+        if end_date < start_date:
+            return
+        verified = store.checkpoint.setdefault('monthsVerified', {})
+        now = datetime.datetime.now(
+            datetime.timezone.utc).strftime('%Y-%m-%d %H:%M:%S')
+        for month, month_start, month_end in self._months_between(start_date, end_date):
+            if month_start == f"{month}-01":
+                verified[month] = now
+
+    def _reconcile_posting_store(self, store: PostingStore, start_date: str, end_date: str) -> bool:
+        """
+        Re-checks the months of a posting store which were not verified for the longest time.
 
-            # Send request to BB API
-            self.logger.debug("Sending request to download all BB accounts.")
-            response = requests.request(
-                "POST", url, headers=headers, data=payload)
-            self.logger.debug("Request sent, awaiting response.")
+        Postings can be edited in BB after the fact, which an incremental download never sees. A month is due once
+        'interval_days' have passed since it was last verified, at most 'months_per_run' due months are downloaded
+        again per store and run. Only months whose checksum differs from the stored postings are replaced.
 
-            # Parse response
-            result = json.loads(response.text)
-            if 'rows' in result and 'data' in result:
-                self.logger.debug(
-                    f"Downloaded {result['rows']} accounts successfully.")
-            else:
+        Parameters:
+        store (PostingStore): The loaded store.
+        start_date (str): First date of the store to reconcile (YYYY-MM-DD).
+        end_date (str): Last date of the store to reconcile (YYYY-MM-DD).
+
+        Returns:
+        bool: True if the checkpoint or the postings changed and the store needs to be saved. A month whose
+            download fails keeps its old verification time and stays due for the next run.
+        """
+        reconcile_settings = self.settings.get('posting_reconciliation', {})
+        if not reconcile_settings.get('enabled', True) or end_date < start_date:
+            return False
+        interval = datetime.timedelta(
+            days=reconcile_settings.get('interval_days', 30))
+        months_per_run = reconcile_settings.get('months_per_run', 2)
+        now = datetime.datetime.now(datetime.timezone.utc)
+        verified = store.checkpoint.setdefault('monthsVerified', {})
+
+        def is_due(month):
+            return month not in verified or now - datetime.datetime.strptime(
+                verified[month], '%Y-%m-%d %H:%M:%S').replace(tzinfo=datetime.timezone.utc) >= interval
+
+        # Months never verified come first, then the ones verified longest ago
+        due = [month for month in self._months_between(start_date, end_date)
+               if is_due(month[0])]
+        due.sort(key=lambda month: verified.get(month[0], ''))
+        changed = False
+        for month, month_start, month_end in due[:months_per_run]:
+            try:
+                fetched = self.get_all_bb_posts(
+                    start_date=month_start, end_date=month_end)
+            except Exception as e:
+                # The remaining due months would most likely fail as well, they are tried again by the next run
                 self.logger.warning(
-                    "Unexpected response structure received from API.")
+                    f"Reconciling postings of {month} in {store.blob_name} failed, it stays due: {e}")
+                break
+            stored_checksum = PostingStore.month_checksums(
+                store.get_postings(month_start, month_end)).get(month)
+            if PostingStore.month_checksums(fetched).get(month) != stored_checksum:
+                counts = store.merge(
+                    fetched, window_start=month_start, window_end=month_end)
+                self.logger.info(
+                    f"Reconciled postings of {month} in {store.blob_name}: {counts['added']} added, {counts['updated']} updated, {counts['removed']} removed.")
+            else:
+                self.logger.debug(
+                    f"Postings of {month} in {store.blob_name} are unchanged.")
+            verified[month] = now.strftime('%Y-%m-%d %H:%M:%S')
+            changed = True
+        return changed
+
+    def _load_closed_partition(self, partition: dict, invalidate=False):
+        store = self.get_posting_store(partition['name'])
+        fields = self.get_posting_fields()
+        if not invalidate and store.load(fields) and store.checkpoint.get('closed') \
+                and store.checkpoint.get('startDate') == partition['start'] \
+                and store.checkpoint.get('endDate') == partition['end'] \
+                and store.has_fields(fields):
+            self.logger.debug(
+                f"Loaded {len(store.postings)} postings of closed partition {partition['name']}.")
+            if self._reconcile_posting_store(store, partition['start'], partition['end']):
+                store.save()
+            return store.get_postings()
+
+        # Closed partitions are downloaded once and then never changed, so they are only stored, marked closed and
+        # verified after every page was downloaded. A failed download raises and is tried again by the next run
+        self.logger.info(
+            f"Downloading closed partition {partition['name']} ({partition['start']} to {partition['end']}).")
+        fetched_posts = self.get_all_bb_posts(
+            start_date=partition['start'], end_date=partition['end'])
+        store.postings = {}
+        store.checkpoint = {'startDate': partition['start'],
+                            'endDate': partition['end'], 'closed': True, 'fields': fields}
+        store.merge(fetched_posts)
+        self._mark_months_verified(
+            store, partition['start'], partition['end'])
+        store.save()
+        return store.get_postings()
+
+    def _sync_open_posts(self, start_date: str, end_date: str, full_refresh=False):
+        store_settings = self.settings.get('posting_store', {})
+        overlap_days = store_settings.get('overlap_days', 31)
+
+        store = self.get_posting_store()
+        fields = self.get_posting_fields()
+        store.load(fields)
+
+        if full_refresh or store.is_empty() or store.checkpoint.get('startDate', start_date) > start_date \
+                or not store.has_fields(fields):
+            # No usable checkpoint, download the complete open period once
+            self.logger.info(
+                f"Downloading all postings from {start_date} to {end_date}.")
+            fetch_start = start_date
+            store.postings = {}
+            store.checkpoint = {'startDate': start_date, 'fields': fields}
+        else:
+            # Re-download a window before the checkpoint to catch late and backdated postings
+            last_date = datetime.datetime.strptime(
+                store.checkpoint['lastPostingDate'], '%Y-%m-%d')
+            fetch_start = max(start_date, (last_date - datetime.timedelta(
+                days=overlap_days)).strftime('%Y-%m-%d'))
+            self.logger.info(
+                f"Loaded {len(store.postings)} stored postings, fetching postings from {fetch_start} to {end_date}.")
+
+        # Only a completely downloaded window replaces the stored postings, a failed download raises before the merge
+        fetched_posts = self.get_all_bb_posts(
+            start_date=fetch_start, end_date=end_date)
+        counts = store.merge(fetched_posts, window_start=fetch_start,
+                             window_end=end_date)
+        self._mark_months_verified(store, fetch_start, end_date)
+
+        # Postings before the download window can have been edited in BB since they were stored
+        self._reconcile_posting_store(store, start_date, (datetime.datetime.strptime(
+            fetch_start, '%Y-%m-%d') - datetime.timedelta(days=1)).strftime('%Y-%m-%d'))
+
+        # Postings of fiscal years which were closed in the meantime now live in their partitions
+        closed_keys = [key for key, posting in store.postings.items()
+                       if posting['date'][:10] < start_date]
+        for key in closed_keys:
+            del store.postings[key]
+        store.checkpoint['startDate'] = start_date
+        self.logger.info(
+            f"Posting store synchronised: {counts['added']} added, {counts['updated']} updated, {counts['removed']} removed, {len(closed_keys)} moved to closed partitions.")
+        store.save()
+        return store.get_postings(start_date, end_date)
+
+    def sync_bb_posts(self, start_date="2021-01-01", end_date="2039-12-31", full_refresh=False, invalidate_partitions: list = None):
+        self.logger.debug("Starting sync_bb_posts function.")
+
+        closed_partitions, open_start = self.get_bb_posts_partitions(
+            start_date, end_date)
+        invalidate = set(invalidate_partitions or [])
+        max_workers = max(1, self.settings.get(
+            'posting_partitions', {}).get('max_concurrency', 2))
+        self.logger.debug(
+            f"Using {len(closed_partitions)} closed partitions, open period starts {open_start}.")
+
+        # Closed partitions and the open period are loaded independently and concurrently
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            closed_futures = [executor.submit(self._load_closed_partition, partition,
+                                              full_refresh or partition['name'] in invalidate)
+                              for partition in closed_partitions]
+            open_future = None
+            if end_date >= open_start:
+                # The open store always covers the whole open period, a narrower range must not prune it
+                open_future = executor.submit(
+                    self._sync_open_posts, open_start, end_date, full_refresh)
+            postings = []
+            for future in closed_futures:
+                postings.extend(future.result())
+            if open_future is not None:
+                postings.extend(open_future.result())
+
+        postings = [posting for posting in postings
+                    if start_date <= posting['date'][:10] <= end_date]
+        self.logger.debug(
+            f"Completed sync_bb_posts with {len(postings)} postings.")
+        return postings
+
+    def _fetch_bb_accounts(self, etag: str = None):
+        headers = {'If-None-Match': etag} if etag else {}
+        response = self.conn_clients['bb_client'].post(
+            '/accounts/get', headers=headers)
+        if response.status_code == 304:
+            return TTLCache.NOT_MODIFIED, etag
+        response.raise_for_status()
+
+        # Parse response
+        result = json.loads(response.text)
+        if 'rows' in result and 'data' in result:
+            self.logger.debug(
+                f"Downloaded {result['rows']} accounts successfully.")
+        else:
+            self.logger.warning(
+                "Unexpected response structure received from API.")
+        return result.get('data', []), response.headers.get('ETag')
 
-            return result.get('data', [])
+    def get_all_bb_accounts(self):
+        self.logger.debug("Starting get_all_bb_accounts function.")
+
+        try:
+            # Send request to BB API, api key and auth headers are added by the client
+            self.logger.debug("Sending request to download all BB accounts.")
+            accounts, _ = self._fetch_bb_accounts()
+            return accounts
 
         except Exception as e:
             self.logger.error(f"Error in get_all_bb_accounts: {e}")
             raise
 
-    def read_expected_bookings(self, container=None):
+    def get_bb_accounts(self):
+        """
+        Returns the BB chart of accounts from the process wide cache, loading it only when it is first needed.
+
+        Expired accounts are refreshed conditionally with the ETag of the cached copy, if the API provides one.
+        """
+        self.logger.debug("Starting get_bb_accounts function.")
+        cache_settings = self.settings.get('bb_api', {})
+        try:
+            accounts = warm_cache.get(
+                'bb_accounts',
+                self._fetch_bb_accounts,
+                ttl_seconds=cache_settings.get('accounts_ttl_seconds', 21600),
+                stale_if_error_seconds=cache_settings.get('accounts_stale_if_error_seconds', 604800))
+            self.logger.debug(f"Completed get_bb_accounts with {len(accounts)} accounts.")
+            return accounts
+        except Exception as e:
+            self.logger.error(f"Error in get_bb_accounts: {e}")
+            raise
+
+    def read_expected_bookings(self, container=None, workbook_contents: dict = None):
         self.logger.debug("Starting read_expected_bookings function.")
+        container = container or self.conn_clients["financialplanning_folder"]
+        return self.read_compiled_workbooks(
+            'expected_bookings', container,
+            lambda container, files: self.parse_expected_bookings(
+                container, files, workbook_contents),
+            ["Expected Bookings.xlsx"])
+
+    def parse_expected_bookings(self, container, files: list, workbook_contents: dict = None):
+        self.logger.debug("Starting parse_expected_bookings function.")
 
         try:
             # Initialize the expected bookings structure
-            container = container or self.conn_clients["financialplanning_folder"]
             expected_bookings = {
                 "sheets": {},
                 "unprocessedSheets": {},
                 "processedSheets": {}
             }
 
-            # List and check files in the container
-            files_list = container.list_blobs()
-            filenames = [file.name for file in files_list]
+            # Check files in the container
+            filenames = [file.name for file in files]
             self.logger.debug(f"Files found in container: {filenames}")
 
             # Check for "Expected Bookings.xlsx" and process if available
@@ -1567,8 +2984,13 @@ class DevIntConnector:
                     "Expected Bookings.xlsx")
                 self.logger.debug("Found 'Expected Bookings.xlsx'.")
 
-                # Download all sheets from the Excel file
-                expected_bookings_dfs = self.download_all_sheets(blob_client)
+                # Download all sheets from the Excel file, unless the current version was already downloaded
+                contents = get_current_contents(files, workbook_contents)
+                if "Expected Bookings.xlsx" in contents:
+                    expected_bookings_dfs = read_all_sheets(
+                        contents["Expected Bookings.xlsx"], self.get_excel_engine())
+                else:
+                    expected_bookings_dfs = self.download_all_sheets(blob_client)
                 for key, df in expected_bookings_dfs.items():
                     expected_bookings["sheets"][key] = df
                     expected_bookings["unprocessedSheets"][key] = df
@@ -1582,79 +3004,135 @@ class DevIntConnector:
             return expected_bookings
 
         except Exception as e:
-            self.logger.error(f"Error in read_expected_bookings: {e}")
+            self.logger.error(f"Error in parse_expected_bookings: {e}")
             raise
 
     def add_more_account_information_to_bookings(self, bookings, kontenrahmen):
         self.logger.debug(
             "Starting add_more_account_information_to_bookings function.")
 
-        for booking in bookings:
-            debit_account = int(booking['debit_postingaccount_number'])
-            credit_account = int(booking['credit_postingaccount_number'])
-
-            # Process debit account information
-            # self.logger.debug(f"Processing debit account information for account number {debit_account}.")
-            for account in kontenrahmen:
-                if account['accountRangeStart'] <= debit_account <= account['accountRangeEnd']:
-                    booking['debit_booking_type_1'] = account['type1']
-                    booking['debit_booking_type_2'] = account['type2']
-                    categories = [
-                        account.get('category1'),
-                        account.get('category2'),
-                        account.get('category3')
-                    ]
-                    booking['debit_booking_categories'] = [
-                        cat for cat in categories if cat]
-                    # self.logger.debug(f"Assigned debit types and categories for account {debit_account}.")
-                    break
-
-            # Process credit account information
-            # self.logger.debug(f"Processing credit account information for account number {credit_account}.")
-            for account in kontenrahmen:
-                if account['accountRangeStart'] <= credit_account <= account['accountRangeEnd']:
-                    booking['credit_booking_type_1'] = account['type1']
-                    booking['credit_booking_type_2'] = account['type2']
-                    categories = [
-                        account.get('category1'),
-                        account.get('category2'),
-                        account.get('category3')
-                    ]
-                    booking['credit_booking_categories'] = [
-                        cat for cat in categories if cat]
-                    # self.logger.debug(f"Assigned credit types and categories for account {credit_account}.")
-                    break
+        classifier = self.get_account_classifier(kontenrahmen)
+
+        # Classify the debit and credit account columns at once
+        debit_positions = classifier.classify_array(
+            [int(booking['debit_postingaccount_number']) for booking in bookings]).tolist()
+        credit_positions = classifier.classify_array(
+            [int(booking['credit_postingaccount_number']) for booking in bookings]).tolist()
+
+        for booking, debit_position, credit_position in zip(bookings, debit_positions, credit_positions):
+            for side, position in (('debit', debit_position), ('credit', credit_position)):
+                if position < 0:
+                    continue
+                account = classifier.kontenrahmen[position]
+                booking[f'{side}_booking_type_1'] = account['type1']
+                booking[f'{side}_booking_type_2'] = account['type2']
+                booking[f'{side}_booking_categories'] = list(
+                    classifier.categories[position])
 
         self.logger.debug(
             "Completed adding account information to all bookings.")
 
+    def get_enrichment_cache(self):
+        cache_settings = self.settings.get('enrichment_cache', {})
+        container = None
+        if self.conn_clients:
+            container = self.conn_clients.get(
+                f"{cache_settings.get('container', 'financial_reports')}_folder")
+        return EnrichmentCache(container=container,
+                               blob_name=cache_settings.get(
+                                   'blob_name', 'cache/bb_enrichment.json.gz'),
+                               parent_logger=self.logger)
+
+    def enrich_bookings(self, bookings: list, kontenrahmen):
+        """
+        Adds the account types and categories to the bookings and marks them as booked.
+
+        The enriched fields of postings classified in earlier runs are taken from the EnrichmentCache, so only new
+        postings, postings booked on other accounts, or all postings after a change of the Kontenrahmen are classified.
+        The cache is pruned to the given postings, so bookings must be all stored postings, as load_report_inputs loads them.
+
+        Parameters:
+        bookings (list): The BB postings, modified in place.
+        kontenrahmen (list or AccountClassifier): The Kontenrahmen to classify the accounts with.
+        """
+        self.logger.debug("Starting enrich_bookings function.")
+        classifier = self.get_account_classifier(kontenrahmen)
+
+        def classify(pending):
+            self.add_more_account_information_to_bookings(pending, classifier)
+            # Mark each booking as "booked"
+            for booking in pending:
+                booking['realisation'] = 'booked'
+
+        if not self.settings.get('enrichment_cache', {}).get('enabled', True):
+            classify(bookings)
+            return
+
+        # build_reports gets all postings of the posting stores, entries of any other posting are outdated
+        cache = self.get_enrichment_cache()
+        cache.load(classifier.fingerprint)
+        counts = cache.enrich(bookings, classify)
+        pruned = cache.prune(booking.get('id_by_customer')
+                             for booking in bookings if booking.get('id_by_customer') is not None)
+        if counts['classified'] or pruned or cache.dropped:
+            cache.save()
+        self.logger.info(
+            f"Completed enrich_bookings: {counts['reused']} bookings reused, {counts['classified']} classified.")
+
+    def get_account_classifier(self, kontenrahmen) -> AccountClassifier:
+        """
+        Returns an AccountClassifier for a Kontenrahmen, kontenrahmen can already be one.
+        """
+        if isinstance(kontenrahmen, AccountClassifier):
+            return kontenrahmen
+        return AccountClassifier(kontenrahmen, parent_logger=self.logger)
+
     def collect_all_accounts(self, bookings, kontenrahmen):
         self.logger.debug("Starting collect_all_accounts function.")
 
         # Initialize dictionary to store account information
         all_accounts = {}
-
-        # Collect all unique debit and credit accounts from bookings
-        for booking in bookings:
-            debit_account = int(booking['debit_postingaccount_number'])
-            credit_account = int(booking['credit_postingaccount_number'])
-
-            # Initialize account entry if it doesn't exist
-            if debit_account not in all_accounts:
-                all_accounts[debit_account] = {
-                    'bookings': [],
-                    'type 1': booking['debit_booking_type_1'],
-                    'type 2': booking['debit_booking_type_2']
+        is_table = isinstance(bookings, BookingTable)
+
+        if is_table:
+            # One entry per booking and side (debit before credit), grouped by the account number columns
+            entry_accounts = np.column_stack(
+                (bookings.debit_account, bookings.credit_account)).ravel()
+            entry_order = np.argsort(entry_accounts, kind='stable')
+            boundaries = np.flatnonzero(
+                np.diff(entry_accounts[entry_order])) + 1
+            for entries in np.split(entry_order, boundaries):
+                if len(entries) == 0:
+                    continue
+                side = 'debit' if entries[0] % 2 == 0 else 'credit'
+                first_booking = bookings[int(entries[0] // 2)]
+                all_accounts[int(entry_accounts[entries[0]])] = {
+                    'bookings': bookings.take(entries // 2),
+                    'type 1': first_booking[f'{side}_booking_type_1'],
+                    'type 2': first_booking[f'{side}_booking_type_2']
                 }
-                # self.logger.debug(f"Added new debit account {debit_account}.")
+        else:
+            # Collect all unique debit and credit accounts from bookings
+            for booking in bookings:
+                debit_account = int(booking['debit_postingaccount_number'])
+                credit_account = int(booking['credit_postingaccount_number'])
+
+                # Initialize account entry if it doesn't exist
+                if debit_account not in all_accounts:
+                    all_accounts[debit_account] = {
+                        'bookings': [],
+                        'type 1': booking['debit_booking_type_1'],
+                        'type 2': booking['debit_booking_type_2']
+                    }
+                    # self.logger.debug(f"Added new debit account {debit_account}.")
 
-            if credit_account not in all_accounts:
-                all_accounts[credit_account] = {
-                    'bookings': [],
-                    'type 1': booking['credit_booking_type_1'],
-                    'type 2': booking['credit_booking_type_2']
-                }
-                # self.logger.debug(f"Added new credit account {credit_account}.")
+                if credit_account not in all_accounts:
+                    all_accounts[credit_account] = {
+                        'bookings': [],
+                        'type 1': booking['credit_booking_type_1'],
+                        'type 2': booking['credit_booking_type_2']
+                    }
+                    # self.logger.debug(f"Added new credit account {credit_account}.")
 
         # Sort accounts by account number
         all_accounts = {i: all_accounts[i] for i in sorted(all_accounts)}
@@ -1663,29 +3141,28 @@ class DevIntConnector:
             f"Found {len(all_accounts)} accounts from {accounts_list[0]} to {accounts_list[-1]}.")
 
         # Append each booking to its respective debit and credit account
-        for booking in bookings:
-            all_accounts[int(booking['debit_postingaccount_number'])
-                         ]['bookings'].append(booking)
-            all_accounts[int(booking['credit_postingaccount_number'])
-                         ]['bookings'].append(booking)
+        if not is_table:
+            for booking in bookings:
+                all_accounts[int(booking['debit_postingaccount_number'])
+                             ]['bookings'].append(booking)
+                all_accounts[int(booking['credit_postingaccount_number'])
+                             ]['bookings'].append(booking)
+
+        # Find the categories of all accounts in the kontenrahmen at once
+        classifier = self.get_account_classifier(kontenrahmen)
+        positions = classifier.classify_array(accounts_list).tolist()
 
         # Add category information and calculate balances for each account
-        for account_number, account in all_accounts.items():
-            # Find and assign categories from kontenrahmen
-            for account_info in kontenrahmen:
-                if account_info['accountRangeStart'] <= account_number <= account_info['accountRangeEnd']:
-                    categories = [
-                        account_info.get('category1'),
-                        account_info.get('category2'),
-                        account_info.get('category3')
-                    ]
-                    account['booking_categories'] = [
-                        cat for cat in categories if cat]
-                    # self.logger.debug(f"Assigned categories to account {account_number}: {account['booking_categories']}")
-                    break
+        for (account_number, account), position in zip(all_accounts.items(), positions):
+            if position >= 0:
+                account['booking_categories'] = list(
+                    classifier.categories[position])
 
             # Sort bookings by date
-            account['bookings'].sort(key=lambda x: x['date'])
+            if is_table:
+                account['bookings'] = account['bookings'].sort_by_date()
+            else:
+                account['bookings'].sort(key=lambda x: x['date'])
             # self.logger.debug(f"Sorted bookings for account {account_number} by date.")
 
             # Initialize financial fields
@@ -1694,12 +3171,19 @@ class DevIntConnector:
             account['haben'] = 0.0
 
             # Calculate soll (debit) and haben (credit) values
-            for booking in account['bookings']:
-                amount = float(booking['amount'])
-                if booking['debit_postingaccount_number'] == str(account_number):
-                    account['soll'] += amount
-                if booking['credit_postingaccount_number'] == str(account_number):
-                    account['haben'] += amount
+            if is_table:
+                account_bookings = account['bookings']
+                account['soll'] = account_bookings.sum_amounts(
+                    account_bookings.debit_account == account_number)
+                account['haben'] = account_bookings.sum_amounts(
+                    account_bookings.credit_account == account_number)
+            else:
+                for booking in account['bookings']:
+                    amount = float(booking['amount'])
+                    if booking['debit_postingaccount_number'] == str(account_number):
+                        account['soll'] += amount
+                    if booking['credit_postingaccount_number'] == str(account_number):
+                        account['haben'] += amount
 
             # Calculate saldo (balance)
             account['saldo'] = account['soll'] - account['haben']
@@ -1716,25 +3200,40 @@ class DevIntConnector:
         result = {}
         einnahmen, ausgaben, activa, passiva = 0.0, 0.0, 0.0, 0.0
 
-        # Sum up values based on booking types
-        for booking in bookings:
-            amount = float(booking['amount'])
-            if booking['debit_booking_type_2'] == self.settings["income_term"]:
-                einnahmen -= amount
-            if booking['credit_booking_type_2'] == self.settings["income_term"]:
-                einnahmen += amount
-            if booking['debit_booking_type_2'] == self.settings["expense_term"]:
-                ausgaben += amount
-            if booking['credit_booking_type_2'] == self.settings["expense_term"]:
-                ausgaben -= amount
-            if booking['debit_booking_type_2'] == 'Activa':
-                activa += amount
-            if booking['credit_booking_type_2'] == 'Activa':
-                activa -= amount
-            if booking['debit_booking_type_2'] == 'Passiva':
-                passiva -= amount
-            if booking['credit_booking_type_2'] == 'Passiva':
-                passiva += amount
+        if isinstance(bookings, BookingTable):
+            # Sum up the integer cent amounts of the matching rows per booking type
+            def total(field, term):
+                return bookings.sum_amounts(bookings.equals(field, term))
+            income_term = self.settings["income_term"]
+            expense_term = self.settings["expense_term"]
+            einnahmen = total('credit_booking_type_2', income_term) - \
+                total('debit_booking_type_2', income_term)
+            ausgaben = total('debit_booking_type_2', expense_term) - \
+                total('credit_booking_type_2', expense_term)
+            activa = total('debit_booking_type_2', 'Activa') - \
+                total('credit_booking_type_2', 'Activa')
+            passiva = total('credit_booking_type_2', 'Passiva') - \
+                total('debit_booking_type_2', 'Passiva')
+        else:
+            # Sum up values based on booking types
+            for booking in bookings:
+                amount = float(booking['amount'])
+                if booking['debit_booking_type_2'] == self.settings["income_term"]:
+                    einnahmen -= amount
+                if booking['credit_booking_type_2'] == self.settings["income_term"]:
+                    einnahmen += amount
+                if booking['debit_booking_type_2'] == self.settings["expense_term"]:
+                    ausgaben += amount
+                if booking['credit_booking_type_2'] == self.settings["expense_term"]:
+                    ausgaben -= amount
+                if booking['debit_booking_type_2'] == 'Activa':
+                    activa += amount
+                if booking['credit_booking_type_2'] == 'Activa':
+                    activa -= amount
+                if booking['debit_booking_type_2'] == 'Passiva':
+                    passiva -= amount
+                if booking['credit_booking_type_2'] == 'Passiva':
+                    passiva += amount
 
         # Store results in the result dictionary
         result['revenue'] = einnahmen
@@ -1757,27 +3256,35 @@ class DevIntConnector:
         self.logger.debug(
             f"Collecting all cost locations with {len(bookings)} bookings and {len(costlocations)} cost locations.")
 
+        # Group bookings by cost location, a booking table is split by its cost location codes
+        grouped_bookings = {}
+        if isinstance(bookings, BookingTable):
+            with_cl = bookings.isin('cost_location', [
+                cl for cl in bookings.categories['cost_location'] if cl])
+            grouped_bookings = bookings.take(
+                with_cl).group_by('cost_location')
+            if not with_cl.all():
+                grouped_bookings['without'] = bookings.take(~with_cl)
+        else:
+            for booking in bookings:
+                cl = booking['cost_location'] if booking['cost_location'] else 'without'
+                grouped_bookings.setdefault(cl, []).append(booking)
+
         # Initialize dictionary to store cost location information
         all_costlocations = {}
-
-        # Iterate over each booking to categorize by cost location
-        for booking in bookings:
-            cl = booking['cost_location'] if booking['cost_location'] else 'without'
-
-            # Initialize cost location entry if it doesn't exist
-            if cl not in all_costlocations:
-                all_costlocations[cl] = {'bookings': []}
-
-                # Assign cost location details if available in the costlocations dictionary
-                if str(cl) in costlocations:
-                    costlocation_info = costlocations[cl]
-                    all_costlocations[cl].update({
-                        "limits": costlocation_info.get("limits"),
-                        "type": costlocation_info.get("type"),
-                        "name": costlocation_info.get("name"),
-                        "number": costlocation_info.get("number")
-                    })
-                    # self.logger.debug(f"Added cost location '{cl}' with details: {all_costlocations[cl]}")
+        for cl, cl_bookings in grouped_bookings.items():
+            all_costlocations[cl] = {'bookings': cl_bookings}
+
+            # Assign cost location details if available in the costlocations dictionary
+            if str(cl) in costlocations:
+                costlocation_info = costlocations[cl]
+                all_costlocations[cl].update({
+                    "limits": costlocation_info.get("limits"),
+                    "type": costlocation_info.get("type"),
+                    "name": costlocation_info.get("name"),
+                    "number": costlocation_info.get("number")
+                })
+                # self.logger.debug(f"Added cost location '{cl}' with details: {all_costlocations[cl]}")
 
         # Sort cost locations by key
         all_costlocations = {i: all_costlocations[i]
@@ -1786,14 +3293,6 @@ class DevIntConnector:
         self.logger.debug(
             f"Found {len(all_costlocations)} cost locations, ranging from '{costlocations_list[0]}' to '{costlocations_list[-1]}'.")
 
-        # Append bookings to their respective cost location
-        for booking in bookings:
-            if booking['cost_location']:
-                all_costlocations[booking['cost_location']
-                                  ]['bookings'].append(booking)
-            else:
-                all_costlocations['without']['bookings'].append(booking)
-
         # Log the number of bookings without a cost location, if present
         if 'without' in all_costlocations:
             self.logger.debug(
@@ -1801,7 +3300,10 @@ class DevIntConnector:
 
         # Sort bookings by date within each cost location and calculate summary information
         for cl, costlocation in all_costlocations.items():
-            costlocation['bookings'].sort(key=lambda x: x['date'])
+            if isinstance(costlocation['bookings'], BookingTable):
+                costlocation['bookings'] = costlocation['bookings'].sort_by_date()
+            else:
+                costlocation['bookings'].sort(key=lambda x: x['date'])
             # self.logger.debug(f"Sorted bookings for cost location '{cl}' by date.")
 
             # Calculate summary statistics for each cost location
@@ -2087,6 +3589,13 @@ class DevIntConnector:
 
         # Convert cost locations to strings for comparison
         string_cost_locations = [str(cl) for cl in cost_locations]
+
+        if isinstance(bookings, BookingTable) and not nur_erfolg:
+            # Select on the cost location codes and date column of the booking table
+            mask = bookings.isin('cost_location', string_cost_locations) & \
+                bookings.between_dates(start_date, end_date)
+            return list(bookings.take(mask))
+
         selected_bookings = []
         non_erfolg_bookings: list = []
         # Select bookings that match any of the specified cost locations
@@ -2128,11 +3637,7 @@ class DevIntConnector:
             f"Calculated report structure levels: {report_structure_levels}.")
 
         crow = 1
-        selected_headers = [
-            'date', 'booking_number', 'cost_location',
-            'debit_postingaccount_number', 'credit_postingaccount_number',
-            'postingtext', 'amount', 'currency', 'debit_booking_type_2', 'credit_booking_type_2',
-        ]
+        selected_headers = self.settings['listing_headers']
         header_width = self.settings['bookingsHeaderWidth']
 
         # Add information about the time window
@@ -2995,22 +4500,6 @@ class DevIntConnector:
                 return -amount
             return 0
 
-        def calculate_costlocation_group_expense(row, costlocation_group: str):
-            if row['cost_location'].startswith(costlocation_group):
-                # float(str(row['amount']) #.replace('.', '').replace(',', '.'))
-                amount = float(row['amount'])
-                if (row['debit_booking_type_1'] == "Erfolg") ^ (row['credit_booking_type_1'] == "Erfolg"):
-                    if row['debit_booking_type_2'] == self.settings['expense_term'] or row['credit_booking_type_2'] == self.settings['income_term']:
-                        return amount
-                    elif row['debit_booking_type_2'] == self.settings['income_term'] or row['credit_booking_type_2'] == self.settings['expense_term']:
-                        return -amount
-                    else:
-                        return 0.0
-                else:
-                    return 0.0
-            else:
-                return 0.0
-
         # Filter bookings by relevant accounts
         relevant_accounts: list[int] = [
             int(account) for accounts in account_groups for account in accounts.keys()]
@@ -3035,9 +4524,33 @@ class DevIntConnector:
             self.logger.debug(
                 f"Calculated liability for column {account}:{description}.")
 
+        # Expenses count positive and income negative, only for bookings between a result and a balance account
+        result_booking = (p_bookings['debit_booking_type_1'] == "Erfolg") ^ (
+            p_bookings['credit_booking_type_1'] == "Erfolg")
+        expense = (p_bookings['debit_booking_type_2'] == self.settings['expense_term']) | (
+            p_bookings['credit_booking_type_2'] == self.settings['income_term'])
+        income = (p_bookings['debit_booking_type_2'] == self.settings['income_term']) | (
+            p_bookings['credit_booking_type_2'] == self.settings['expense_term'])
+        sign = np.select([result_booking & expense, result_booking & income], [
+                         1.0, -1.0], default=0.0)
+
+        # The groups of each distinct cost location are looked up once in a prefix index
+        group_index = CostLocationIndex.from_prefixes(
+            cost_location_cols_nums, parent_logger=self.logger)
+        cost_location_groups = {}
+        booking_groups = []
+        for cl in p_bookings['cost_location']:
+            if cl not in cost_location_groups:
+                cost_location_groups[cl] = set(
+                    group_index.groups_with_prefix(cl))
+            booking_groups.append(cost_location_groups[cl])
+        amounts = np.array([float(amount) if groups else 0.0 for amount, groups in zip(
+            p_bookings['amount'], booking_groups)], dtype=np.float64)
+
         for costlocation_group in cost_location_cols_nums:
-            p_bookings[f"P{costlocation_group}"] = p_bookings.apply(
-                lambda row: calculate_costlocation_group_expense(row, costlocation_group), axis=1)
+            in_group = np.array([costlocation_group in groups for groups in booking_groups], dtype=bool)
+            p_bookings[f"P{costlocation_group}"] = np.where(
+                in_group & (sign != 0.0), sign * amounts, 0.0)
             self.logger.debug(
                 f"Calculated costlocation group expenses for group {costlocation_group}.")
 
@@ -3122,25 +4635,84 @@ class DevIntConnector:
         self.logger.debug("Completed compiling all sheets into the workbook.")
         return save_virtual_workbook(wb)
 
+    def load_report_inputs(self, trigger_selector: list = None):
+        """
+        Loads the inputs of the report pipeline concurrently.
+
+        The instruction files, the BB postings and the expected bookings have no data dependency on each other,
+        so the stage takes as long as the slowest load instead of the sum of all loads. The postings are always
+        synchronised for the whole 'posting_history', as the account saldos and the rolling payroll saldo are
+        cumulative and do not depend on the time slots or on the reports selected by the trigger.
+
+        Parameters:
+        trigger_selector (list, optional): The triggers of the request, only the reports their sendings refer to
+            are loaded. All reports are loaded if None.
+
+        Returns:
+        dict: The loaded 'instructions', 'bookings' and 'expected_bookings'.
+
+        Raises:
+        Exception: The error of the first failing load, raised after all loads have finished.
+        """
+        self.logger.debug("Starting load_report_inputs function.")
+        stage_start = time.perf_counter()
+
+        def timed_load(name, load):
+            load_start = time.perf_counter()
+            try:
+                return load()
+            finally:
+                self.logger.debug(
+                    f"Load '{name}' finished after {time.perf_counter() - load_start:.2f}s.")
+
+        history_settings = self.settings.get('posting_history', {})
+        loads = {
+            'instructions': lambda: self.read_instruction_files(trigger_selector=trigger_selector),
+            'bookings': lambda: self.sync_bb_posts(
+                start_date=history_settings.get('start_date', '2021-01-01'),
+                end_date=history_settings.get('end_date', '2039-12-31')),
+            'expected_bookings': self.read_expected_bookings,
+        }
+
+        with ThreadPoolExecutor(max_workers=len(loads)) as executor:
+            futures = {name: executor.submit(timed_load, name, load)
+                       for name, load in loads.items()}
+
+        inputs = {}
+        errors = {}
+        for name, future in futures.items():
+            try:
+                inputs[name] = future.result()
+            except Exception as e:
+                errors[name] = e
+                self.logger.error(f"Error in load '{name}' of load_report_inputs: {e}")
+        if errors:
+            raise next(iter(errors.values()))
+
+        self.logger.debug(
+            f"Completed load_report_inputs after {time.perf_counter() - stage_start:.2f}s.")
+        return inputs
+
     def build_reports(self,
                       bookings: list,
                       expected_bookings: list,
                       instructions: dict,
-                      accounts: list):
+                      accounts: list = None):
         self.logger.debug("Starting build_reports function.")
 
         # Initialize the reports dictionary
         reports = {}
 
-        # Add account information to bookings
+        # Add account information to bookings, the classifier is built once for bookings and accounts
         self.logger.debug("Adding account information to bookings.")
-        self.add_more_account_information_to_bookings(
-            bookings, instructions['kontenrahmen']['default'])
+        account_classifier = self.get_account_classifier(
+            instructions['kontenrahmen']['default'])
+        self.enrich_bookings(bookings, account_classifier)
 
-        # Mark each booking as "booked"
-        for booking in bookings:
-            booking['realisation'] = 'booked'
-        reports['bookings'] = bookings
+        # Parse amounts, dates, accounts and categories once into a columnar booking table
+        booking_table = BookingTable.from_records(
+            bookings, parent_logger=self.logger)
+        reports['bookings'] = booking_table
 
         # Build personnel bookings report
         reports['personnelbookings'] = self.build_personnel_bookings(bookings)
@@ -3148,18 +4720,18 @@ class DevIntConnector:
         # Collect accounts and cost locations for reports
         self.logger.debug("Collecting all accounts.")
         reports['accounts'] = self.collect_all_accounts(
-            bookings, instructions['kontenrahmen']['default'])
+            booking_table, account_classifier)
         self.logger.debug("Collecting all cost locations.")
         reports['costlocations'] = self.collect_all_costlocations(
-            bookings, instructions['kostenstellenplan'])
+            booking_table, instructions['kostenstellenplan'])
 
         # Build individual reports based on the provided instructions
         for report_id, report in instructions['reports'].items():
             self.logger.debug(f"Building report '{report['name']}'.")
 
             # Add relevant bookings to the report dictionary
-            report_bookings = [
-                booking for booking in bookings if booking['cost_location'] in report['costLocationsStrings']]
+            report_bookings = booking_table.take(booking_table.isin(
+                'cost_location', report['costLocationsStrings']))
             reports[report_id] = report
             reports[report_id]['bookings'] = report_bookings
             self.logger.debug(
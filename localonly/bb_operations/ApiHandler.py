@@ -1,9 +1,14 @@
 #!/usr/bin/env python3
+import os
+import sys
 import requests
-from requests.auth import HTTPBasicAuth
 import json
 from datetime import datetime, timedelta
 
+# The BB client is shared with the Azure Functions code in hrmlib
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+from hrmlib.bbclient import BBClient
+
 class ApiHandler:
     """Base class for all BuchhaltungsButler API handlers"""
     
@@ -19,12 +24,24 @@ class ApiHandler:
         self.api_key = api_key
         self.api_secret = api_secret
         self.api_client = api_client
-        self.base_url = "https://app.buchhaltungsbutler.de/api/v1"
+        # BB_API_BASE_URL points the handlers to another server, e.g. the local stand-in (bb_standin_server.py)
+        self.base_url = os.environ.get("BB_API_BASE_URL", "https://app.buchhaltungsbutler.de/api/v1")
         self.timeout_seconds = 20
         
         # Validate credentials
         self.is_valid = all([self.api_key, self.api_secret, self.api_client])
         
+        # Pooled keep-alive client with HTTP Basic Auth (Client:Secret), reused for every request
+        self.client = BBClient(
+            base_url=self.base_url,
+            api_key=self.api_key,
+            api_client=self.api_client,
+            api_secret=self.api_secret,
+            api_version='1.8.1',
+            json_payload=False,
+            timeout=self.timeout_seconds
+        )
+        
     def _make_request(self, endpoint, data, timeout=None):
         """
         Make an API request with proper error handling
@@ -46,21 +63,10 @@ class ApiHandler:
         
         # Use provided timeout or default
         timeout = timeout or self.timeout_seconds
-        url = f"{self.base_url}{endpoint}"
-        
-        # Set up Basic Auth header (Client:Secret)
-        auth = HTTPBasicAuth(self.api_client, self.api_secret)
-        
-        # Set headers with API version
-        headers = {
-            'Content-Type': 'application/x-www-form-urlencoded',
-            'Accept': 'application/json',
-            'X-API-Version': '1.8.1'
-        }
         
         try:
-            # Make the request with headers and timeout
-            response = requests.post(url, data=data, headers=headers, auth=auth, timeout=timeout)
+            # Make the request through the shared session (auth and API version headers are set there)
+            response = self.client.post(endpoint, data, timeout=timeout)
             
             # Check if request was successful
             if response.status_code == 200:
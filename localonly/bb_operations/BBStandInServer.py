@@ -0,0 +1,414 @@
+#!/usr/bin/env python3
+import bisect
+import gzip
+import json
+import random
+import threading
+import time
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs
+from rich.console import Console
+from rich.table import Table
+
+HTML_ERROR_PAGE = """<!DOCTYPE html>
+<html><head><title>500 Internal Server Error</title></head>
+<body><h1>Internal Server Error</h1><p>The server encountered an internal error.</p></body></html>"""
+
+class BBStandInServer:
+    """Local stand-in for the BuchhaltungsButler API that replays recorded or synthetic data"""
+    
+    # endpoint -> (data set key, date field used by date_from/date_to, maximum limit of the real API)
+    ENDPOINTS = {
+        '/postings/get': ('postings', 'date', 1000),
+        '/transactions/get': ('transactions', 'booking_date', 500),
+        '/receipts/get': ('receipts', 'date', 500),
+        '/accounts/get': ('accounts', None, None),
+    }
+    
+    def __init__(self, dataset, host='127.0.0.1', port=8765, latency_ms=0, latency_per_row_ms=0.0,
+                 jitter_ms=0, page_size=None, error_rates=None, hang_seconds=30, retry_after=1,
+                 seed=None, upstream=None, console=None):
+        """
+        Initialize the stand-in server
+        
+        Args:
+            dataset (dict): Data set in the format of the backup files (postings, transactions,
+                            receipts with inbound/outbound and optionally accounts)
+            host (str): Interface to listen on
+            port (int): Port to listen on, 0 picks a free port
+            latency_ms (float): Fixed latency added to every response
+            latency_per_row_ms (float): Additional latency per returned row
+            jitter_ms (float): Random latency between 0 and jitter_ms added to every response
+            page_size (int, optional): Maximum rows per response, defaults to the limits of the real API
+            error_rates (dict, optional): Probability per request of the injected errors 'html'
+                                          (500 with an HTML page), 'timeout' (no answer) and '429'
+            hang_seconds (float): How long a request with an injected timeout hangs before the connection is closed
+            retry_after (int): Retry-After header in seconds sent with injected 429 responses
+            seed (int, optional): Seed for latency jitter and error injection
+            upstream (BBClient, optional): Recorder mode - forward every request to this client and
+                                           add the returned data to the data set
+            console (optional): Rich console for output
+        """
+        self.dataset = dataset
+        self.host = host
+        self.port = port
+        self.latency_ms = latency_ms
+        self.latency_per_row_ms = latency_per_row_ms
+        self.jitter_ms = jitter_ms
+        self.page_size = page_size
+        self.error_rates = error_rates or {}
+        self.hang_seconds = hang_seconds
+        self.retry_after = retry_after
+        self.random = random.Random(seed)
+        self.upstream = upstream
+        self.console = console or Console()
+        self.lock = threading.Lock()
+        self.stats = {}
+        self.httpd = None
+        self.thread = None
+        
+        self.dataset.setdefault('postings', [])
+        self.dataset.setdefault('transactions', [])
+        self.dataset.setdefault('receipts', {})
+        self.dataset['receipts'].setdefault('inbound', [])
+        self.dataset['receipts'].setdefault('outbound', [])
+        if not self.dataset.get('accounts'):
+            self.dataset['accounts'] = self._accounts_from_postings(self.dataset['postings'])
+        self._build_indexes()
+    
+    @staticmethod
+    def load_backups(paths):
+        """
+        Merge backup files created by BackupService (or recordings of this server) into one data set
+        
+        Args:
+            paths (list): Paths of the JSON files, later files win for records with the same id_by_customer
+        
+        Returns:
+            dict: The merged data set
+        """
+        merged = {'postings': {}, 'transactions': {}, 'inbound': {}, 'outbound': {}, 'accounts': {}}
+        for path in paths:
+            with open(path, 'r') as f:
+                backup = json.load(f)
+            receipts = backup.get('receipts', {})
+            for key, records in [('postings', backup.get('postings', [])),
+                                 ('transactions', backup.get('transactions', [])),
+                                 ('inbound', receipts.get('inbound', [])),
+                                 ('outbound', receipts.get('outbound', [])),
+                                 ('accounts', backup.get('accounts', []))]:
+                for record in records:
+                    record_id = record.get('id_by_customer', record.get('postingaccount_number'))
+                    merged[key][record_id if record_id is not None else len(merged[key])] = record
+        return {
+            'metadata': {'source': 'backups', 'files': [str(path) for path in paths]},
+            'postings': list(merged['postings'].values()),
+            'transactions': list(merged['transactions'].values()),
+            'receipts': {
+                'inbound': list(merged['inbound'].values()),
+                'outbound': list(merged['outbound'].values())
+            },
+            'accounts': list(merged['accounts'].values())
+        }
+    
+    @staticmethod
+    def scale_dataset(dataset, factor):
+        """
+        Multiply the records of a data set to simulate a larger accounting system
+        
+        Every copy gets new id_by_customer values, so paging and deduplication behave as with real data.
+        
+        Args:
+            dataset (dict): The data set to scale
+            factor (int): Number of copies of every record
+        
+        Returns:
+            dict: The scaled data set
+        """
+        if factor <= 1:
+            return dataset
+        
+        def scale(records):
+            scaled = []
+            id_step = max([int(r['id_by_customer']) for r in records
+                           if str(r.get('id_by_customer', '')).isdigit()] or [0]) + 1
+            for copy in range(factor):
+                for record in records:
+                    record = dict(record)
+                    if str(record.get('id_by_customer', '')).isdigit():
+                        record['id_by_customer'] = str(int(record['id_by_customer']) + copy * id_step)
+                    scaled.append(record)
+            return scaled
+        
+        scaled = dict(dataset)
+        scaled['postings'] = scale(dataset.get('postings', []))
+        scaled['transactions'] = scale(dataset.get('transactions', []))
+        scaled['receipts'] = {direction: scale(records)
+                              for direction, records in dataset.get('receipts', {}).items()}
+        return scaled
+    
+    @staticmethod
+    def _accounts_from_postings(postings):
+        """Derive the account list from the account numbers used in the postings"""
+        numbers = set()
+        for posting in postings:
+            for field in ['debit_postingaccount_number', 'credit_postingaccount_number']:
+                if str(posting.get(field, '')).isdigit():
+                    numbers.add(int(posting[field]))
+        return [{'postingaccount_number': str(number), 'name': f"Konto {number}"} for number in sorted(numbers)]
+    
+    def _build_indexes(self):
+        """Sort every record list by date once, so date ranges are found by bisection"""
+        self.indexes = {}
+        lists = {
+            'postings': self.dataset['postings'],
+            'transactions': self.dataset['transactions'],
+            'receipts:inbound': self.dataset['receipts']['inbound'],
+            'receipts:outbound': self.dataset['receipts']['outbound'],
+        }
+        for key, records in lists.items():
+            date_field = self.ENDPOINTS[f"/{key.split(':')[0]}/get"][1]
+            ordered = sorted(records, key=lambda r: (str(r.get(date_field) or '')[:10],
+                                                     str(r.get('id_by_customer', '')).zfill(12)))
+            self.indexes[key] = (ordered, [str(r.get(date_field) or '')[:10] for r in ordered])
+    
+    def query(self, endpoint, params):
+        """
+        Answer a request from the data set like the real API would
+        
+        Args:
+            endpoint (str): API endpoint (like '/postings/get')
+            params (dict): Request parameters (date_from, date_to, offset, limit, order, list_direction)
+        
+        Returns:
+            tuple: (HTTP status, response dictionary)
+        """
+        if endpoint not in self.ENDPOINTS:
+            return 404, {'success': False, 'message': f"Unknown endpoint {endpoint}", 'data': []}
+        key, date_field, max_limit = self.ENDPOINTS[endpoint]
+        
+        if key == 'accounts':
+            data = self.dataset['accounts']
+            return 200, {'success': True, 'rows': len(data), 'data': data}
+        
+        if key == 'receipts':
+            direction = params.get('list_direction')
+            if direction not in ['inbound', 'outbound']:
+                return 200, {'success': False, 'message': 'list_direction must be inbound or outbound', 'data': []}
+            key = f"receipts:{direction}"
+        
+        ordered, dates = self.indexes[key]
+        start = bisect.bisect_left(dates, params['date_from']) if params.get('date_from') else 0
+        end = bisect.bisect_right(dates, params['date_to']) if params.get('date_to') else len(dates)
+        selected = ordered[start:end]
+        if 'DESC' in str(params.get('order', '')).upper():
+            selected = selected[::-1]
+        
+        limit = int(params.get('limit') or max_limit)
+        limit = min(limit, self.page_size or max_limit)
+        offset = int(params.get('offset') or 0)
+        data = selected[offset:offset + limit]
+        return 200, {'success': True, 'rows': len(data), 'data': data}
+    
+    def record(self, endpoint, params, result):
+        """
+        Recorder mode - add the data of a real API response to the data set
+        
+        Args:
+            endpoint (str): API endpoint the response belongs to
+            params (dict): The request parameters
+            result (dict): The decoded API response
+        """
+        if endpoint not in self.ENDPOINTS or not isinstance(result, dict) or not result.get('success'):
+            return
+        key = self.ENDPOINTS[endpoint][0]
+        with self.lock:
+            if key == 'receipts':
+                records = self.dataset['receipts'].setdefault(params.get('list_direction', 'inbound'), [])
+            else:
+                records = self.dataset[key]
+            id_field = 'postingaccount_number' if key == 'accounts' else 'id_by_customer'
+            known = {r.get(id_field): i for i, r in enumerate(records)}
+            for record in result.get('data', []):
+                if record.get(id_field) in known:
+                    records[known[record.get(id_field)]] = record
+                else:
+                    known[record.get(id_field)] = len(records)
+                    records.append(record)
+            self._build_indexes()
+    
+    def save_dataset(self, path):
+        """
+        Save the data set (e.g. a recording) in the backup file format for later replay
+        
+        Args:
+            path (str): Path of the JSON file
+        """
+        with self.lock:
+            metadata = dict(self.dataset.get('metadata', {}))
+            metadata['saved'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+            metadata['source'] = 'recording' if self.upstream else metadata.get('source', 'stand-in')
+            data = dict(self.dataset, metadata=metadata)
+            with open(path, 'w') as f:
+                json.dump(data, f, indent=2, ensure_ascii=False)
+        self.console.print(f"[green]Saved data set to {path}[/]")
+    
+    def choose_error(self):
+        """Pick an error to inject for the current request, or None"""
+        draw = self.random.random()
+        for error in ['html', 'timeout', '429']:
+            rate = self.error_rates.get(error, 0)
+            if draw < rate:
+                return error
+            draw -= rate
+        return None
+    
+    def delay(self, rows):
+        """Simulated server latency in seconds for a response with the given number of rows"""
+        jitter = self.random.uniform(0, self.jitter_ms) if self.jitter_ms else 0
+        return (self.latency_ms + self.latency_per_row_ms * rows + jitter) / 1000
+    
+    def count(self, endpoint, outcome, rows=0):
+        """Add a request to the statistics"""
+        with self.lock:
+            entry = self.stats.setdefault(endpoint, {'requests': 0, 'rows': 0})
+            entry['requests'] += 1
+            entry['rows'] += rows
+            entry[outcome] = entry.get(outcome, 0) + 1
+    
+    def start(self):
+        """
+        Start serving in a background thread
+        
+        Returns:
+            str: The base URL of the stand-in, to be used instead of the real API URL
+        """
+        self.httpd = ThreadingHTTPServer((self.host, self.port), _StandInRequestHandler)
+        self.httpd.daemon_threads = True
+        self.httpd.standin = self
+        self.port = self.httpd.server_address[1]
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+        return self.base_url
+    
+    @property
+    def base_url(self):
+        return f"http://{self.host}:{self.port}/api/v1"
+    
+    def shutdown(self):
+        """Stop serving"""
+        if self.httpd:
+            self.httpd.shutdown()
+            self.httpd.server_close()
+            self.httpd = None
+    
+    def create_stats_table(self):
+        """
+        Create a Rich table with the request statistics
+        
+        Returns:
+            rich.table.Table: Table object for display
+        """
+        table = Table(title="Stand-in requests")
+        table.add_column("Endpoint", style="cyan")
+        table.add_column("Requests", justify="right")
+        table.add_column("Rows", justify="right", style="magenta")
+        table.add_column("OK", justify="right", style="green")
+        table.add_column("HTML", justify="right", style="red")
+        table.add_column("Timeout", justify="right", style="red")
+        table.add_column("429", justify="right", style="red")
+        with self.lock:
+            for endpoint, entry in sorted(self.stats.items()):
+                table.add_row(endpoint, str(entry['requests']), str(entry['rows']), str(entry.get('ok', 0)),
+                              str(entry.get('html', 0)), str(entry.get('timeout', 0)), str(entry.get('429', 0)))
+        return table
+
+
+class _StandInRequestHandler(BaseHTTPRequestHandler):
+    """HTTP handler of BBStandInServer, answers the POST endpoints of the API"""
+    
+    protocol_version = 'HTTP/1.1'
+    
+    def log_message(self, format, *args):
+        pass
+    
+    def handle(self):
+        # clients close kept-alive connections at will, e.g. after a retry
+        try:
+            super().handle()
+        except (ConnectionResetError, BrokenPipeError):
+            pass
+    
+    def _read_params(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        body = self.rfile.read(length).decode('utf-8') if length else ''
+        if not body:
+            return {}
+        if 'json' in (self.headers.get('Content-Type') or ''):
+            return json.loads(body)
+        return {key: values[-1] for key, values in parse_qs(body).items()}
+    
+    def _send(self, status, body, content_type='application/json', headers=None):
+        payload = body.encode('utf-8')
+        if 'gzip' in (self.headers.get('Accept-Encoding') or ''):
+            payload = gzip.compress(payload, compresslevel=5)
+            headers = dict(headers or {}, **{'Content-Encoding': 'gzip'})
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(payload)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(payload)
+    
+    def do_POST(self):
+        standin = self.server.standin
+        endpoint = self.path.split('?')[0]
+        endpoint = endpoint[endpoint.index('/api/v1') + len('/api/v1'):] if '/api/v1' in endpoint else endpoint
+        try:
+            params = self._read_params()
+        except ValueError:
+            standin.count(endpoint, 'bad_request')
+            self._send(400, json.dumps({'success': False, 'message': 'Invalid request body', 'data': []}))
+            return
+        
+        # Recorder mode: forward to the real API and keep what it answers
+        if standin.upstream is not None:
+            params.pop('api_key', None)
+            response = standin.upstream.post(endpoint, params)
+            try:
+                result = response.json()
+            except ValueError:
+                result = None
+            if isinstance(result, dict):
+                standin.record(endpoint, params, result)
+                standin.count(endpoint, 'ok' if response.status_code == 200 else str(response.status_code),
+                              len(result.get('data') or []))
+            else:
+                standin.count(endpoint, 'html')
+            self._send(response.status_code, response.text,
+                       content_type=response.headers.get('Content-Type', 'application/json'))
+            return
+        
+        error = standin.choose_error()
+        if error == 'timeout':
+            standin.count(endpoint, 'timeout')
+            time.sleep(standin.hang_seconds)
+            self.close_connection = True
+            return
+        if error == '429':
+            standin.count(endpoint, '429')
+            self._send(429, json.dumps({'success': False, 'message': 'Too many requests', 'data': []}),
+                       headers={'Retry-After': str(standin.retry_after)})
+            return
+        if error == 'html':
+            standin.count(endpoint, 'html')
+            time.sleep(standin.delay(0))
+            self._send(500, HTML_ERROR_PAGE, content_type='text/html')
+            return
+        
+        status, result = standin.query(endpoint, params)
+        time.sleep(standin.delay(len(result.get('data', []))))
+        standin.count(endpoint, 'ok' if status == 200 else str(status), len(result.get('data', [])))
+        self._send(status, json.dumps(result, ensure_ascii=False))
\ No newline at end of file
@@ -2,6 +2,7 @@
 import json
 import os
 import pathlib
+import textwrap
 from datetime import datetime, timedelta
 from rich.console import Console
 from rich.panel import Panel
@@ -23,7 +24,7 @@ class BackupService:
         self.postings_handler = postings_handler
         self.receipts_handler = receipts_handler
         self.console = console or Console()
-        
+    
     def create_backup(self, days_backup=10, backup_include=None):
         """
         Backup data from BuchhaltungsButler for the specified number of days.
@@ -32,7 +33,7 @@ class BackupService:
             days_backup (int): Number of days to backup (default: 10)
             backup_include (dict): Dictionary specifying which data types to include in the backup
                                  (default: {"transactions": True, "postings": True, "receipts": True})
-            
+        
         Returns:
             str: Path to the created backup file
         """
@@ -55,142 +56,150 @@ class BackupService:
         }
         
         # Initialize with empty data
-        transactions = {'success': False, 'data': []}
         postings = {'success': False, 'data': []}
         inbound_receipts = {'success': False, 'data': []}
         outbound_receipts = {'success': False, 'data': []}
         
-        # Get transactions if enabled
-        if backup_include.get('transactions', True):
-            self.console.print("[bold cyan]Fetching transactions...[/]")
-            transactions = self.transactions_handler.get_by_date_range(date_from, date_to)
-            if transactions and transactions.get('success'):
-                backup_status["transactions"] = {"success": True, "count": len(transactions.get('data', []))}
-                self.console.print(f"[green]Successfully retrieved {len(transactions.get('data', []))} transactions[/]")
+        # Create backups directory if it doesn't exist
+        backups_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'backups')
+        pathlib.Path(backups_dir).mkdir(parents=True, exist_ok=True)
+        
+        # Create backup filename with date and time
+        timestamp = today.strftime('%Y-%m-%d_%H-%M-%S')
+        backup_filename = f"bb_backup_{timestamp}_{days_backup}days.json"
+        backup_path = os.path.join(backups_dir, backup_filename)
+        
+        # The backup is written while it is fetched, under a temporary name until it is complete
+        partial_path = f"{backup_path}.partial"
+        with open(partial_path, 'w', encoding='utf-8') as f:
+            f.write('{\n')
+            
+            # Get transactions if enabled, they are streamed to the backup file window by window
+            transactions_count = 0
+            if backup_include.get('transactions', True):
+                self.console.print("[bold cyan]Fetching transactions...[/]")
+                transactions_count, error = self._write_json_array(
+                    f, "transactions", self.transactions_handler.iter_by_date_range(date_from, date_to))
+                if error is None:
+                    backup_status["transactions"] = {"success": True, "count": transactions_count}
+                    self.console.print(f"[green]Successfully retrieved {transactions_count} transactions[/]")
+                else:
+                    backup_status["transactions"] = {"success": False, "message": f"Failed to retrieve transactions: {error}",
+                                                     "count": transactions_count}
+                    self.console.print(f"[bold red]Failed to retrieve transactions ({error}) - "
+                                       f"backup contains only the {transactions_count} transactions retrieved before[/]")
             else:
-                backup_status["transactions"] = {"success": False, "message": "Failed to retrieve transactions"}
-                self.console.print("[bold red]Failed to retrieve transactions - continuing with empty transactions data[/]")
-                transactions = {'success': False, 'data': []}
-        else:
-            backup_status["transactions"] = {"success": False, "message": "Transactions backup disabled"}
-            self.console.print("[cyan]Transactions backup disabled - skipping[/]")
-        
-        # Get postings if enabled
-        if backup_include.get('postings', True):
-            self.console.print("[bold cyan]Fetching postings...[/]")
-            postings = self.postings_handler.get_by_date_range(date_from, date_to)
-            if postings and postings.get('success'):
-                backup_status["postings"] = {"success": True, "count": len(postings.get('data', []))}
-                self.console.print(f"[green]Successfully retrieved {len(postings.get('data', []))} postings[/]")
+                self._write_json_array(f, "transactions", [])
+                backup_status["transactions"] = {"success": False, "message": "Transactions backup disabled"}
+                self.console.print("[cyan]Transactions backup disabled - skipping[/]")
+            
+            # Get postings if enabled
+            if backup_include.get('postings', True):
+                self.console.print("[bold cyan]Fetching postings...[/]")
+                postings = self.postings_handler.get_by_date_range(date_from, date_to)
+                if postings and postings.get('success'):
+                    backup_status["postings"] = {"success": True, "count": len(postings.get('data', []))}
+                    self.console.print(f"[green]Successfully retrieved {len(postings.get('data', []))} postings[/]")
+                else:
+                    backup_status["postings"] = {"success": False, "message": "Failed to retrieve postings"}
+                    self.console.print("[bold red]Failed to retrieve postings - continuing with empty postings data[/]")
+                    postings = {'success': False, 'data': []}
             else:
-                backup_status["postings"] = {"success": False, "message": "Failed to retrieve postings"}
-                self.console.print("[bold red]Failed to retrieve postings - continuing with empty postings data[/]")
-                postings = {'success': False, 'data': []}
-        else:
-            backup_status["postings"] = {"success": False, "message": "Postings backup disabled"}
-            self.console.print("[cyan]Postings backup disabled - skipping[/]")
-        
-        # Get receipts if enabled
-        if backup_include.get('receipts', True):
-            # Get inbound receipts with enhanced error handling
-            self.console.print("[bold cyan]Fetching inbound receipts...[/]")
-            inbound_receipts = self.receipts_handler.get_by_date_range(date_from, date_to, limit=500, list_direction='inbound')
+                backup_status["postings"] = {"success": False, "message": "Postings backup disabled"}
+                self.console.print("[cyan]Postings backup disabled - skipping[/]")
             
-            # Check if we got valid data with our enhanced functions (they now always return a structured response)
-            if inbound_receipts and inbound_receipts.get('success'):
-                backup_status["receipts_inbound"] = {"success": True, "count": len(inbound_receipts.get('data', []))}
-                self.console.print(f"[green]Successfully retrieved {len(inbound_receipts.get('data', []))} inbound receipts[/]")
+            # Get receipts if enabled
+            if backup_include.get('receipts', True):
+                # Fetch all pages of both directions concurrently, an interrupted fetch resumes from the checkpoint
+                self.console.print("[bold cyan]Fetching inbound and outbound receipts...[/]")
+                checkpoint_path = os.path.join(backups_dir, f".receipts_checkpoint_{date_from}_{date_to}.json")
+                receipts = self.receipts_handler.get_all_by_date_range(date_from, date_to, checkpoint_path=checkpoint_path)
+                inbound_receipts = receipts['inbound']
                 
-                # Store receipt counts by type for diagnostics
-                if inbound_receipts.get('data'):
-                    # Count receipts by type
-                    inbound_types = {}
-                    for receipt in inbound_receipts.get('data', []):
-                        receipt_type = receipt.get('type', 'unknown')
-                        if receipt_type in inbound_types:
-                            inbound_types[receipt_type] += 1
-                        else:
-                            inbound_types[receipt_type] = 1
+                # Check if we got valid data with our enhanced functions (they now always return a structured response)
+                if inbound_receipts and inbound_receipts.get('success'):
+                    backup_status["receipts_inbound"] = {"success": True, "count": len(inbound_receipts.get('data', []))}
+                    self.console.print(f"[green]Successfully retrieved {len(inbound_receipts.get('data', []))} inbound receipts[/]")
                     
-                    if inbound_types:
-                        backup_status["receipts_inbound"]["types"] = inbound_types
-                        self.console.print(f"[green]Inbound receipt types: {inbound_types}[/]")
-                
-                # Note if client-side filtering was applied
-                if inbound_receipts.get('client_filtered'):
-                    self.console.print("[yellow]Note: Client-side date filtering was applied to inbound receipts[/]")
-                    backup_status["receipts_inbound"]["note"] = "Client-side date filtering was applied"
+                    # Store receipt counts by type for diagnostics
+                    if inbound_receipts.get('data'):
+                        # Count receipts by type
+                        inbound_types = {}
+                        for receipt in inbound_receipts.get('data', []):
+                            receipt_type = receipt.get('type', 'unknown')
+                            if receipt_type in inbound_types:
+                                inbound_types[receipt_type] += 1
+                            else:
+                                inbound_types[receipt_type] = 1
+                        
+                        if inbound_types:
+                            backup_status["receipts_inbound"]["types"] = inbound_types
+                            self.console.print(f"[green]Inbound receipt types: {inbound_types}[/]")
                     
-                # If we have zero receipts, make additional diagnostics
-                if len(inbound_receipts.get('data', [])) == 0:
-                    self.console.print("[bold yellow]WARNING: Retrieved 0 inbound receipts. Attempting unfiltered fetch for diagnostics.[/]")
+                    # If we have zero receipts, make additional diagnostics
+                    if len(inbound_receipts.get('data', [])) == 0:
+                        self.console.print("[bold yellow]WARNING: Retrieved 0 inbound receipts. Attempting unfiltered fetch for diagnostics.[/]")
+                        
+                        # Make an additional diagnostics call
+                        try:
+                            diagnostics_receipts = self.receipts_handler.get_latest(limit=10, list_direction='inbound')
+                            if diagnostics_receipts and diagnostics_receipts.get('success') and diagnostics_receipts.get('data'):
+                                self.console.print(f"[green]Found {len(diagnostics_receipts.get('data', []))} inbound receipts in diagnostics fetch.[/]")
+                                backup_status["receipts_inbound"]["diagnostics"] = True
+                                backup_status["receipts_inbound"]["diagnostics_count"] = len(diagnostics_receipts.get('data', []))
+                            else:
+                                self.console.print("[yellow]Diagnostics fetch also found no inbound receipts.[/]")
+                        except Exception as e:
+                            self.console.print(f"[yellow]Error in diagnostics fetch: {e}[/]")
+                else:
+                    backup_status["receipts_inbound"] = {
+                        "success": False, 
+                        "message": inbound_receipts.get('message', "Failed to retrieve inbound receipts")
+                    }
+                    self.console.print("[bold red]Unable to fetch inbound receipts - continuing with empty inbound receipts data[/]")
+                
+                outbound_receipts = receipts['outbound']
+                
+                # Check if we got valid data
+                if outbound_receipts and outbound_receipts.get('success'):
+                    backup_status["receipts_outbound"] = {"success": True, "count": len(outbound_receipts.get('data', []))}
+                    self.console.print(f"[green]Successfully retrieved {len(outbound_receipts.get('data', []))} outbound receipts[/]")
                     
-                    # Make an additional diagnostics call
-                    try:
-                        diagnostics_receipts = self.receipts_handler.get_latest(limit=10, list_direction='inbound')
-                        if diagnostics_receipts and diagnostics_receipts.get('success') and diagnostics_receipts.get('data'):
-                            self.console.print(f"[green]Found {len(diagnostics_receipts.get('data', []))} inbound receipts in diagnostics fetch.[/]")
-                            backup_status["receipts_inbound"]["diagnostics"] = True
-                            backup_status["receipts_inbound"]["diagnostics_count"] = len(diagnostics_receipts.get('data', []))
-                        else:
-                            self.console.print("[yellow]Diagnostics fetch also found no inbound receipts.[/]")
-                    except Exception as e:
-                        self.console.print(f"[yellow]Error in diagnostics fetch: {e}[/]")
+                    # Store receipt counts by type for diagnostics
+                    if outbound_receipts.get('data'):
+                        # Count receipts by type
+                        outbound_types = {}
+                        for receipt in outbound_receipts.get('data', []):
+                            receipt_type = receipt.get('type', 'unknown')
+                            if receipt_type in outbound_types:
+                                outbound_types[receipt_type] += 1
+                            else:
+                                outbound_types[receipt_type] = 1
+                        
+                        if outbound_types:
+                            backup_status["receipts_outbound"]["types"] = outbound_types
+                            self.console.print(f"[green]Outbound receipt types: {outbound_types}[/]")
+                else:
+                    backup_status["receipts_outbound"] = {
+                        "success": False, 
+                        "message": outbound_receipts.get('message', "Failed to retrieve outbound receipts")
+                    }
+                    self.console.print("[bold red]Unable to fetch outbound receipts - continuing with empty outbound receipts data[/]")
             else:
-                backup_status["receipts_inbound"] = {
-                    "success": False, 
-                    "message": inbound_receipts.get('message', "Failed to retrieve inbound receipts")
-                }
-                self.console.print("[bold red]Unable to fetch inbound receipts - continuing with empty inbound receipts data[/]")
+                backup_status["receipts_inbound"] = {"success": False, "message": "Receipts backup disabled"}
+                backup_status["receipts_outbound"] = {"success": False, "message": "Receipts backup disabled"}
+                self.console.print("[cyan]Receipts backup disabled - skipping[/]")
             
-            # Get outbound receipts with enhanced error handling
-            self.console.print("[bold cyan]Fetching outbound receipts...[/]")
-            outbound_receipts = self.receipts_handler.get_by_date_range(date_from, date_to, limit=500, list_direction='outbound')
+            # Prepare receipts data
+            receipts_data = {
+                "inbound": inbound_receipts.get('data', []) if inbound_receipts and inbound_receipts.get('success') else [],
+                "outbound": outbound_receipts.get('data', []) if outbound_receipts and outbound_receipts.get('success') else []
+            }
             
-            # Check if we got valid data
-            if outbound_receipts and outbound_receipts.get('success'):
-                backup_status["receipts_outbound"] = {"success": True, "count": len(outbound_receipts.get('data', []))}
-                self.console.print(f"[green]Successfully retrieved {len(outbound_receipts.get('data', []))} outbound receipts[/]")
-                
-                # Store receipt counts by type for diagnostics
-                if outbound_receipts.get('data'):
-                    # Count receipts by type
-                    outbound_types = {}
-                    for receipt in outbound_receipts.get('data', []):
-                        receipt_type = receipt.get('type', 'unknown')
-                        if receipt_type in outbound_types:
-                            outbound_types[receipt_type] += 1
-                        else:
-                            outbound_types[receipt_type] = 1
-                    
-                    if outbound_types:
-                        backup_status["receipts_outbound"]["types"] = outbound_types
-                        self.console.print(f"[green]Outbound receipt types: {outbound_types}[/]")
-                
-                # Note if client-side filtering was applied
-                if outbound_receipts.get('client_filtered'):
-                    self.console.print("[yellow]Note: Client-side date filtering was applied to outbound receipts[/]")
-                    backup_status["receipts_outbound"]["note"] = "Client-side date filtering was applied"
-            else:
-                backup_status["receipts_outbound"] = {
-                    "success": False, 
-                    "message": outbound_receipts.get('message', "Failed to retrieve outbound receipts")
-                }
-                self.console.print("[bold red]Unable to fetch outbound receipts - continuing with empty outbound receipts data[/]")
-        else:
-            backup_status["receipts_inbound"] = {"success": False, "message": "Receipts backup disabled"}
-            backup_status["receipts_outbound"] = {"success": False, "message": "Receipts backup disabled"}
-            self.console.print("[cyan]Receipts backup disabled - skipping[/]")
-        
-        # Prepare receipts data
-        receipts_data = {
-            "inbound": inbound_receipts.get('data', []) if inbound_receipts and inbound_receipts.get('success') else [],
-            "outbound": outbound_receipts.get('data', []) if outbound_receipts and outbound_receipts.get('success') else []
-        }
-        
-        # Create backup data object with enhanced metadata
-        backup_data = {
-            "metadata": {
+            # Write the remaining data, the metadata comes last because the API status is only known now
+            self._write_json_member(f, "postings", postings.get('data', []) if postings and postings.get('success') else [])
+            self._write_json_member(f, "receipts", receipts_data)
+            self._write_json_member(f, "metadata", {
                 "backup_date": today.strftime('%Y-%m-%d %H:%M:%S'),
                 "date_range": {
                     "from": date_from,
@@ -200,24 +209,9 @@ class BackupService:
                 "backup_include": backup_include,
                 "notes": "Some data may be missing if API endpoints were unavailable",
                 "api_status": backup_status
-            },
-            "transactions": transactions.get('data', []) if transactions and transactions.get('success') else [],
-            "postings": postings.get('data', []) if postings and postings.get('success') else [],
-            "receipts": receipts_data
-        }
-        
-        # Create backups directory if it doesn't exist
-        backups_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'backups')
-        pathlib.Path(backups_dir).mkdir(parents=True, exist_ok=True)
-        
-        # Create backup filename with date and time
-        timestamp = today.strftime('%Y-%m-%d_%H-%M-%S')
-        backup_filename = f"bb_backup_{timestamp}_{days_backup}days.json"
-        backup_path = os.path.join(backups_dir, backup_filename)
-        
-        # Write backup data to file
-        with open(backup_path, 'w', encoding='utf-8') as f:
-            json.dump(backup_data, f, ensure_ascii=False, indent=2)
+            }, last=True)
+            f.write('}')
+        os.replace(partial_path, backup_path)
         
         self.console.print(f"[bold green]Backup saved to: {backup_path}[/]")
         
@@ -229,10 +223,10 @@ class BackupService:
         inbound_status = "[bold green]✓[/]" if backup_status["receipts_inbound"].get("success") else "[bold red]✗[/]"
         outbound_status = "[bold green]✓[/]" if backup_status["receipts_outbound"].get("success") else "[bold red]✗[/]"
         
-        self.console.print(f"Transactions: {transaction_status} [bold green]{len(backup_data['transactions'])}[/]")
-        self.console.print(f"Postings: {posting_status} [bold green]{len(backup_data['postings'])}[/]")
-        self.console.print(f"Inbound Receipts: {inbound_status} [bold green]{len(backup_data['receipts']['inbound'])}[/]")
-        self.console.print(f"Outbound Receipts: {outbound_status} [bold green]{len(backup_data['receipts']['outbound'])}[/]")
+        self.console.print(f"Transactions: {transaction_status} [bold green]{transactions_count}[/]")
+        self.console.print(f"Postings: {posting_status} [bold green]{len(postings.get('data', [])) if postings.get('success') else 0}[/]")
+        self.console.print(f"Inbound Receipts: {inbound_status} [bold green]{len(receipts_data['inbound'])}[/]")
+        self.console.print(f"Outbound Receipts: {outbound_status} [bold green]{len(receipts_data['outbound'])}[/]")
         
         # Overall backup status
         if all(status.get("success") for status in backup_status.values()):
@@ -244,4 +238,36 @@ class BackupService:
             if missing:
                 self.console.print(f"[yellow]Missing data: {', '.join(missing)}[/]")
         
-        return backup_path
\ No newline at end of file
+        return backup_path
+    
+    @staticmethod
+    def _write_json_array(f, key, items):
+        """
+        Write items as an array member of the backup JSON object while they are produced
+        
+        Args:
+            f (file): The open backup file
+            key (str): Name of the member
+            items (iterable): The items, e.g. a generator of a handler
+        
+        Returns:
+            tuple: (number of items written, exception that ended the items early or None)
+        """
+        f.write(f"  {json.dumps(key)}: [")
+        count = 0
+        error = None
+        try:
+            for item in items:
+                f.write(",\n" if count else "\n")
+                f.write(textwrap.indent(json.dumps(item, ensure_ascii=False, indent=2), "    "))
+                count += 1
+        except Exception as e:
+            error = e
+        f.write("\n  ],\n" if count else "],\n")
+        return count, error
+    
+    @staticmethod
+    def _write_json_member(f, key, value, last=False):
+        """Write a member of the backup JSON object, formatted like json.dump with indent=2"""
+        text = json.dumps(value, ensure_ascii=False, indent=2).replace("\n", "\n  ")
+        f.write(f"  {json.dumps(key)}: {text}" + ("\n" if last else ",\n"))
\ No newline at end of file
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+import json
+import os
+import threading
+
+class ReceiptsCheckpoint:
+    """Records the progress of a paginated receipts fetch, so an interrupted fetch can be resumed"""
+    
+    def __init__(self, path, date_from, date_to, page_size):
+        """
+        Initialize the checkpoint, starting over if the saved one belongs to another fetch
+        
+        The state (next offset per direction) is kept in the JSON file at path, the receipts already
+        retrieved are appended page by page to one JSON lines file per direction next to it.
+        
+        Args:
+            path (str): Path of the checkpoint state file
+            date_from (str): Start date of the fetch in YYYY-MM-DD format
+            date_to (str): End date of the fetch in YYYY-MM-DD format
+            page_size (int): Receipts per request, offsets are only valid for the same page size
+        """
+        self.path = path
+        self.lock = threading.Lock()
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.state = {'date_from': date_from, 'date_to': date_to, 'page_size': page_size, 'directions': {}}
+        
+        saved = self._load()
+        if saved and all(saved.get(key) == self.state[key] for key in ('date_from', 'date_to', 'page_size')):
+            self.state['directions'] = saved.get('directions', {})
+        else:
+            self.remove()
+    
+    def _load(self):
+        """Load the saved state, None if there is none or it is unreadable"""
+        try:
+            with open(self.path, 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+    
+    def _save(self):
+        """Save the state atomically, so a crash never leaves a half written checkpoint"""
+        temp_path = f"{self.path}.tmp"
+        with open(temp_path, 'w') as f:
+            json.dump(self.state, f)
+        os.replace(temp_path, self.path)
+    
+    def _rows_path(self, list_direction):
+        """Path of the JSON lines file with the retrieved receipts of a direction"""
+        return f"{self.path}.{list_direction}.jsonl"
+    
+    def resume(self, list_direction):
+        """
+        Get the receipts already retrieved for a direction and the offset to continue at
+        
+        Args:
+            list_direction (str): Either 'inbound' or 'outbound'
+        
+        Returns:
+            tuple: (list of receipts, next offset, whether the direction is complete),
+                   ([], 0, False) if the direction has not been started
+        """
+        with self.lock:
+            progress = self.state['directions'].get(list_direction, {})
+            offset = progress.get('offset', 0)
+            pages = offset // self.state['page_size']
+            receipts = []
+            if offset:
+                try:
+                    with open(self._rows_path(list_direction), 'r') as f:
+                        lines = f.readlines()
+                    if len(lines) < pages:
+                        raise ValueError("fewer pages than recorded")
+                    # A page written without its offset is fetched again
+                    for line in lines[:pages]:
+                        receipts.extend(json.loads(line))
+                    with open(self._rows_path(list_direction), 'w') as f:
+                        f.writelines(lines[:pages])
+                except (OSError, ValueError):
+                    # Receipts and offset no longer fit together, start the direction over
+                    offset, receipts = 0, []
+            if not offset:
+                self.state['directions'].pop(list_direction, None)
+                if os.path.exists(self._rows_path(list_direction)):
+                    os.remove(self._rows_path(list_direction))
+                return receipts, 0, False
+            return receipts, offset, progress.get('complete', False)
+    
+    def add_page(self, list_direction, next_offset, page, complete=False):
+        """
+        Record a retrieved page of receipts
+        
+        The page is written before the offset, a crash in between only means the page is fetched again.
+        
+        Args:
+            list_direction (str): Either 'inbound' or 'outbound'
+            next_offset (int): Offset of the next page to fetch
+            page (list): The receipts of the page, one line in the JSON lines file
+            complete (bool): Whether this was the last page of the direction
+        """
+        with self.lock:
+            with open(self._rows_path(list_direction), 'a') as f:
+                f.write(json.dumps(page) + '\n')
+            self.state['directions'][list_direction] = {'offset': next_offset, 'complete': complete}
+            self._save()
+    
+    def remove(self):
+        """Delete the checkpoint files"""
+        directions = self.state.get('directions', {}).keys() | {'inbound', 'outbound'}
+        for path in [self.path, f"{self.path}.tmp"] + [self._rows_path(direction) for direction in directions]:
+            if os.path.exists(path):
+                os.remove(path)
\ No newline at end of file
@@ -1,9 +1,9 @@
 #!/usr/bin/env python3
 from ApiHandler import ApiHandler
-from datetime import datetime, timedelta
 import json
-import requests
-from requests.auth import HTTPBasicAuth
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from ReceiptsCheckpoint import ReceiptsCheckpoint
 from rich.console import Console
 from rich.table import Table
 
@@ -14,313 +14,225 @@ class ReceiptsHandler(ApiHandler):
         """Initialize with API credentials"""
         super().__init__(api_key, api_secret, api_client)
         self.endpoint = "/receipts/get"
-        self.max_retries = 3
         # Debug modes will be set by the main function
         self.debug_mode = False  
         self.enhanced_logging = False
-        
+    
     def get_by_date_range(self, date_from, date_to, limit=500, list_direction='inbound'):
         """
-        Get receipts in a specific date range with enhanced error handling and fallback.
+        Get receipts in a specific date range.
+        
+        Retries, throttling and failing fast on HTML error pages are handled by the shared
+        request scheduler of the client, so the date filter is always applied by the API.
         
         Args:
             date_from (str): Start date in YYYY-MM-DD format
             date_to (str): End date in YYYY-MM-DD format
             limit (int): Number of receipts to retrieve (max 500)
             list_direction (str): Either 'inbound' (Eingangsbelege) or 'outbound' (Ausgangsbelege)
-            
+        
         Returns:
             dict: The API response containing receipt data
         """
-        if not self.is_valid:
-            return {
-                'success': False,
-                'message': 'Missing API credentials',
-                'data': []
-            }
-        
-        # Storage for successful API response
-        result = None
-        
-        # Log the direction for debugging
         print(f"=== Fetching {list_direction} receipts for date range {date_from} to {date_to} ===")
         
-        # Implement a retry approach with progressive fallbacks
-        for attempt in range(1, self.max_retries + 1):
-            try:
-                # Base request data - required fields are api_key and list_direction
-                data = {
-                    'api_key': self.api_key,
-                    'list_direction': list_direction,
-                    'limit': limit,
-                    'order': json.dumps({"date": "DESC"})  # Get the most recent receipts
-                }
-                
-                # First attempt: Try with date filters
-                if attempt == 1 and date_from and date_to:
-                    data['date_from'] = date_from
-                    data['date_to'] = date_to
-                    print(f"Attempt {attempt}: Fetching {list_direction} receipts with date range {date_from} to {date_to}")
-                
-                # Second attempt: Try without date filters, using full limit
-                elif attempt == 2:
-                    data['limit'] = 500  # Use maximum allowed limit
-                    print(f"Attempt {attempt}: Fetching {list_direction} receipts without date filtering (limit: {data['limit']})")
-                
-                # Third attempt: Try with minimal parameters
-                elif attempt == 3:
-                    # Simplify the order parameter
-                    data = {
-                        'api_key': self.api_key,
-                        'list_direction': list_direction,
-                        'limit': 100  # Reduce limit to minimize chance of timeout
-                    }
-                    print(f"Attempt {attempt}: Fetching {list_direction} receipts with minimal parameters (limit: {data['limit']})")
-                
-                # Make the request
-                url = f"{self.base_url}{self.endpoint}"
-                auth = HTTPBasicAuth(self.api_client, self.api_secret)
-                headers = {
-                    'Content-Type': 'application/x-www-form-urlencoded',
-                    'Accept': 'application/json',
-                    'X-API-Version': '1.8.1'
-                }
-                
-                # Print full request details for debugging
-                if self.enhanced_logging:
-                    print(f"Request URL: {url}")
-                    print(f"Request data: {data}")
-                
-                # Increased timeout for potentially slow endpoint
-                timeout = 20 if attempt < 3 else 10
-                
-                # Make the request with headers and timeout
-                response = requests.post(url, data=data, headers=headers, auth=auth, timeout=timeout)
-                
-                # Check if request was successful
-                if response.status_code == 200:
-                    try:
-                        result = response.json()
-                        
-                        # Check if the response is actually valid JSON with expected structure
-                        if 'success' in result and result['success'] and 'data' in result:
-                            print(f"Successfully retrieved {len(result['data'])} {list_direction} receipts on attempt {attempt}")
-                            
-                            # If we retrieved receipts without date filtering, apply client-side filtering
-                            if attempt > 1 and date_from and date_to:
-                                # Manual date filtering
-                                filtered_data = self._filter_by_date_range(result['data'], date_from, date_to)
-                                result['data'] = filtered_data
-                                result['rows'] = len(filtered_data)
-                                result['client_filtered'] = True  # Flag that client-side filtering was applied
-                                print(f"Applied client-side filtering: {result['rows']} {list_direction} receipts in date range")
-                            
-                            # Check if we actually have data in the response
-                            if len(result['data']) == 0:
-                                print(f"WARNING: Retrieved 0 {list_direction} receipts after filtering")
-                                
-                                # Check first few receipts in unfiltered data if available
-                                if 'unfiltered_data' not in result and attempt > 1 and len(result.get('data', [])) == 0:
-                                    print(f"No {list_direction} receipts found in date range. Checking raw response data...")
-                            
-                            return result
-                        else:
-                            print(f"API returned success=False or missing data on attempt {attempt}")
-                            # Debug the actual response 
-                            print(f"Response content: {json.dumps(result, indent=2)[:500]}...")
-                            # Continue to next attempt if we didn't get valid data
-                    except json.JSONDecodeError:
-                        print(f"Failed to parse JSON response on attempt {attempt}")
-                        # Check if this is an HTML response
-                        if '<!DOCTYPE html>' in response.text or '<html' in response.text:
-                            print("Received HTML instead of JSON - API may be experiencing issues")
-                else:
-                    print(f"Error with {list_direction} receipts API on attempt {attempt}: {response.status_code}")
-                    # Check if this is an HTML response
-                    if '<!DOCTYPE html>' in response.text or '<html' in response.text:
-                        print("Received HTML instead of JSON - API may be experiencing issues")
-                    else:
-                        # Print the first 100 characters of the response to help diagnose the issue
-                        print(f"Response preview: {response.text[:500]}...")
-            
-            except requests.exceptions.Timeout:
-                print(f"Timeout after {timeout} seconds on attempt {attempt}")
-            except requests.exceptions.ConnectionError:
-                print(f"Connection error on attempt {attempt}")
-            except requests.exceptions.RequestException as e:
-                print(f"Request exception on attempt {attempt}: {e}")
-            except Exception as e:
-                print(f"Unexpected exception on attempt {attempt}: {e}")
+        # Request data - required fields are api_key and list_direction
+        data = {
+            'api_key': self.api_key,
+            'list_direction': list_direction,
+            'limit': limit,
+            'order': json.dumps({"date": "DESC"})  # Get the most recent receipts
+        }
+        if date_from and date_to:
+            data['date_from'] = date_from
+            data['date_to'] = date_to
         
-        # If we reach here, all attempts failed
-        print(f"All attempts to fetch {list_direction} receipts failed")
+        # Print full request details for debugging
+        if self.enhanced_logging:
+            print(f"Request URL: {self.base_url}{self.endpoint}")
+            print(f"Request data: {data}")
         
-        # Return empty result structure for graceful degradation
-        return {
-            'success': False,
-            'error_code': 999,
-            'message': f"Failed to retrieve {list_direction} receipts after multiple attempts",
-            'rows': 0,
-            'data': []
-        }
+        result = self._make_request(self.endpoint, data)
+        if result.get('success') and 'data' in result:
+            print(f"Successfully retrieved {len(result['data'])} {list_direction} receipts")
+            if len(result['data']) == 0:
+                print(f"WARNING: Retrieved 0 {list_direction} receipts")
+        else:
+            print(f"Failed to fetch {list_direction} receipts: {result.get('message', 'unknown error')}")
+        return result
     
     def get_latest(self, limit=5, list_direction='inbound'):
         """
-        Get the latest receipts from the BB accounting system with enhanced error handling.
+        Get the latest receipts from the BB accounting system.
         
         Args:
             limit (int): Number of receipts to retrieve (max 500)
             list_direction (str): Either 'inbound' (Eingangsbelege) or 'outbound' (Ausgangsbelege)
-            
+        
         Returns:
             dict: The API response containing receipt data
         """
-        if not self.is_valid:
-            return {
-                'success': False,
-                'message': 'Missing API credentials',
-                'data': []
-            }
+        # Request data - required fields are api_key and list_direction
+        data = {
+            'api_key': self.api_key,
+            'list_direction': list_direction,
+            'limit': min(100, limit * 5),  # Fetch more to sort client-side
+            'order': json.dumps({"date": "DESC"})  # Get the most recent receipts
+        }
         
-        # Implement a retry approach
-        max_retries = 2
-        for attempt in range(1, max_retries + 1):
-            try:
-                # Request data - required fields are api_key and list_direction
-                data = {
-                    'api_key': self.api_key,
-                    'list_direction': list_direction,
-                    'limit': min(100, limit * 5) if attempt == 1 else min(500, limit * 10),  # Fetch more to sort client-side
-                    'order': json.dumps({"date": "DESC"})  # Get the most recent receipts
-                }
-                
-                # Second attempt: Try with minimal parameters
-                if attempt == 2:
-                    # Simplify request to minimum required parameters
-                    data = {
-                        'api_key': self.api_key,
-                        'list_direction': list_direction,
-                        'limit': min(100, limit * 5)  # Reduce limit to minimize chance of timeout, but fetch extra for sorting
-                    }
-                    print(f"Retry attempt with minimal parameters (limit: {data['limit']})")
-                
-                # Make the request
-                url = f"{self.base_url}{self.endpoint}"
-                auth = HTTPBasicAuth(self.api_client, self.api_secret)
-                headers = {
-                    'Content-Type': 'application/x-www-form-urlencoded',
-                    'Accept': 'application/json',
-                    'X-API-Version': '1.8.1'
-                }
-                
-                # Timeout settings
-                timeout = 20 if attempt == 1 else 10
-                
-                # Make the request with headers and timeout
-                response = requests.post(url, data=data, headers=headers, auth=auth, timeout=timeout)
-                
-                # Check if request was successful
-                if response.status_code == 200:
-                    try:
-                        result = response.json()
-                        
-                        # Check if the response is actually valid JSON with expected structure
-                        if 'success' in result and result['success'] and 'data' in result:
-                            print(f"Successfully retrieved {len(result['data'])} receipts")
-                            
-                            # Sort receipts by date, newest first (in case API sort didn't work)
-                            if result['data']:
-                                try:
-                                    # Sort by date descending (newest first)
-                                    sorted_data = sorted(
-                                        result['data'],
-                                        key=lambda x: x.get('date', '0000-00-00 00:00:00'),
-                                        reverse=True
-                                    )
-                                    
-                                    # Take only the requested limit
-                                    result['data'] = sorted_data[:limit]
-                                    print(f"Sorted by date and limited to {limit} most recent receipts")
-                                except Exception as e:
-                                    print(f"Error sorting receipts by date: {e}")
-                            
-                            return result
-                        else:
-                            print(f"API returned success=False or missing data on attempt {attempt}")
-                    except json.JSONDecodeError:
-                        print(f"Failed to parse JSON response on attempt {attempt}")
-                        # Check if this is an HTML response
-                        if '<!DOCTYPE html>' in response.text or '<html' in response.text:
-                            print("Received HTML instead of JSON - API may be experiencing issues")
-                else:
-                    print(f"Error with receipts API on attempt {attempt}: {response.status_code}")
-                    # Check if this is an HTML response
-                    if '<!DOCTYPE html>' in response.text or '<html' in response.text:
-                        print("Received HTML instead of JSON - API may be experiencing issues")
-                    else:
-                        # Print the first 100 characters of the response to help diagnose the issue
-                        print(f"Response preview: {response.text[:100]}...")
+        result = self._make_request(self.endpoint, data)
+        if result.get('success') and 'data' in result:
+            print(f"Successfully retrieved {len(result['data'])} receipts")
             
-            except requests.exceptions.Timeout:
-                print(f"Timeout after {timeout} seconds on attempt {attempt}")
-            except requests.exceptions.ConnectionError:
-                print(f"Connection error on attempt {attempt}")
-            except requests.exceptions.RequestException as e:
-                print(f"Request exception on attempt {attempt}: {e}")
-            except Exception as e:
-                print(f"Unexpected exception on attempt {attempt}: {e}")
-        
-        # If we reach here, all attempts failed
-        print("All attempts to fetch receipts failed")
+            # Sort receipts by date, newest first (in case API sort didn't work)
+            result['data'] = sorted(
+                result['data'],
+                key=lambda x: x.get('date') or '0000-00-00',
+                reverse=True
+            )[:limit]
+        else:
+            print(f"Failed to fetch receipts: {result.get('message', 'unknown error')}")
+        return result
+    
+    def _request_page(self, date_from, date_to, list_direction, offset, limit):
+        """
+        Request one page of receipts with server-side date filter, in a stable ascending order
         
-        # Return an empty result structure for graceful degradation
-        return {
-            'success': False,
-            'error_code': 999,
-            'message': "Failed to retrieve receipts after multiple attempts",
-            'rows': 0,
-            'data': []
+        Raises:
+            RuntimeError: If the page could not be retrieved, so that results are never silently partial
+        """
+        data = {
+            'api_key': self.api_key,
+            'list_direction': list_direction,
+            'date_from': date_from,
+            'date_to': date_to,
+            'offset': offset,
+            'limit': limit,
+            'order': json.dumps({"date": "ASC"})
         }
+        result = self._make_request(self.endpoint, data)
+        if not result.get('success') or not isinstance(result.get('data'), list):
+            raise RuntimeError(f"Failed to fetch {list_direction} receipts at offset {offset}: {result.get('message', 'unknown error')}")
+        return result['data']
     
-    def _filter_by_date_range(self, receipts, date_from, date_to):
+    def iter_pages(self, date_from, date_to, list_direction='inbound', page_size=500, max_concurrency=2, start_offset=0):
         """
-        Filter receipts by date range (client-side filtering)
+        Iterate over all pages of receipts in a date range
+        
+        Up to max_concurrency pages are requested at the same time, pages are yielded in offset order
+        and the first page shorter than page_size ends the iteration.
         
         Args:
-            receipts (list): List of receipt dictionaries
             date_from (str): Start date in YYYY-MM-DD format
             date_to (str): End date in YYYY-MM-DD format
-            
+            list_direction (str): Either 'inbound' (Eingangsbelege) or 'outbound' (Ausgangsbelege)
+            page_size (int): Receipts per request (max 500)
+            max_concurrency (int): Number of pages requested at the same time
+            start_offset (int): Offset of the first page, e.g. from a checkpoint
+        
+        Yields:
+            tuple: (offset of the page, list of receipts)
+        """
+        next_offset = start_offset
+        in_flight = deque()
+        with ThreadPoolExecutor(max_workers=max(1, max_concurrency)) as executor:
+            try:
+                while True:
+                    while len(in_flight) < max(1, max_concurrency):
+                        in_flight.append((next_offset, executor.submit(
+                            self._request_page, date_from, date_to, list_direction, next_offset, page_size)))
+                        next_offset += page_size
+                    
+                    offset, future = in_flight.popleft()
+                    page = future.result()
+                    yield offset, page
+                    if len(page) < page_size:
+                        break
+            finally:
+                for _, future in in_flight:
+                    future.cancel()
+    
+    def iter_by_date_range(self, date_from, date_to, list_direction='inbound', page_size=500, max_concurrency=2):
+        """
+        Iterate over all receipts in a date range, without holding them all in memory
+        
+        Args:
+            date_from (str): Start date in YYYY-MM-DD format
+            date_to (str): End date in YYYY-MM-DD format
+            list_direction (str): Either 'inbound' (Eingangsbelege) or 'outbound' (Ausgangsbelege)
+            page_size (int): Receipts per request (max 500)
+            max_concurrency (int): Number of pages requested at the same time
+        
+        Yields:
+            dict: One receipt, receipts appearing on two pages are yielded once
+        """
+        seen_ids = set()
+        for _, page in self.iter_pages(date_from, date_to, list_direction, page_size, max_concurrency):
+            for receipt in page:
+                receipt_id = receipt.get('id_by_customer')
+                if receipt_id in seen_ids:
+                    continue
+                seen_ids.add(receipt_id)
+                yield receipt
+    
+    def _fetch_direction(self, date_from, date_to, list_direction, page_size, max_concurrency, checkpoint):
+        """Fetch all receipts of one direction, resuming from and updating the checkpoint if given"""
+        receipts, start_offset, complete = [], 0, False
+        if checkpoint:
+            receipts, start_offset, complete = checkpoint.resume(list_direction)
+            if start_offset:
+                print(f"Resuming {list_direction} receipts at offset {start_offset} ({len(receipts)} already retrieved)")
+        
+        pages = [] if complete else self.iter_pages(date_from, date_to, list_direction, page_size, max_concurrency, start_offset)
+        for offset, page in pages:
+            receipts.extend(page)
+            if checkpoint:
+                checkpoint.add_page(list_direction, offset + page_size, page, complete=len(page) < page_size)
+            if self.debug_mode:
+                print(f"Retrieved {len(page)} {list_direction} receipts at offset {offset}")
+        
+        # Receipts may shift between pages while paging, keep each one once
+        unique = {}
+        for receipt in receipts:
+            unique[receipt.get('id_by_customer', len(unique))] = receipt
+        return list(unique.values())
+    
+    def get_all_by_date_range(self, date_from, date_to, directions=('inbound', 'outbound'), page_size=500,
+                              max_concurrency=2, checkpoint_path=None):
+        """
+        Get all receipts in a date range, with the directions fetched concurrently
+        
+        Args:
+            date_from (str): Start date in YYYY-MM-DD format
+            date_to (str): End date in YYYY-MM-DD format
+            directions (tuple): The list directions to fetch ('inbound' and/or 'outbound')
+            page_size (int): Receipts per request (max 500)
+            max_concurrency (int): Number of pages requested at the same time per direction
+            checkpoint_path (str, optional): File to record progress in. An interrupted fetch with the same
+                                             date range continues where it stopped, the file is removed
+                                             when all directions are complete
+        
         Returns:
-            list: Filtered list of receipts
+            dict: Direction -> API response like structure with 'success', 'rows' and 'data' (or 'message')
         """
-        try:
-            # Convert date strings to datetime objects
-            from_date = datetime.strptime(date_from, '%Y-%m-%d')
-            to_date = datetime.strptime(date_to, '%Y-%m-%d')
-            
-            # Add one day to to_date to make the comparison inclusive
-            to_date = to_date + timedelta(days=1)
-            
-            filtered_receipts = []
-            for receipt in receipts:
-                receipt_date_str = receipt.get('date')
-                if receipt_date_str:
-                    try:
-                        # Parse the receipt date string
-                        receipt_date = datetime.strptime(receipt_date_str, '%Y-%m-%d')
-                        # Include receipt if date is within range
-                        if from_date <= receipt_date < to_date:
-                            filtered_receipts.append(receipt)
-                    except (ValueError, TypeError):
-                        # If date parsing fails, skip this receipt
-                        pass
-            
-            return filtered_receipts
-        except Exception as e:
-            print(f"Error in client-side date filtering: {e}")
-            # Return original list if filtering fails
-            return receipts
+        checkpoint = ReceiptsCheckpoint(checkpoint_path, date_from, date_to, page_size) if checkpoint_path else None
+        results = {}
+        with ThreadPoolExecutor(max_workers=len(directions)) as executor:
+            futures = {direction: executor.submit(self._fetch_direction, date_from, date_to, direction,
+                                                  page_size, max_concurrency, checkpoint)
+                       for direction in directions}
+            for direction, future in futures.items():
+                try:
+                    data = future.result()
+                    results[direction] = {'success': True, 'rows': len(data), 'data': data}
+                    print(f"Successfully retrieved {len(data)} {direction} receipts")
+                except Exception as e:
+                    results[direction] = {'success': False, 'message': str(e), 'rows': 0, 'data': []}
+                    print(f"Failed to fetch {direction} receipts: {e}")
+        
+        if checkpoint and all(result['success'] for result in results.values()):
+            checkpoint.remove()
+        return results
     
     def create_table(self, receipts_data):
         """
@@ -328,7 +240,7 @@ class ReceiptsHandler(ApiHandler):
         
         Args:
             receipts_data (list): List of receipt dictionaries
-            
+        
         Returns:
             rich.table.Table: Table object for display
         """
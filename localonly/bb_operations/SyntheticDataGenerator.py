@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+import random
+from datetime import datetime, timedelta
+
+class SyntheticDataGenerator:
+    """Generates BuchhaltungsButler-like data sets for load tests without real accounting data"""
+    
+    # (debit account, credit account, posting text) patterns of typical SKR49 postings
+    POSTING_PATTERNS = [
+        (4100, 1200, 'Gehalt {month}'),
+        (4130, 1200, 'Sozialversicherung {month}'),
+        (1700, 1200, 'STEUERVERWALTUNG Lohnsteuer {month}'),
+        (1730, 1712, 'Lohn- und Gehaltsverrechnung {month}'),
+        (4900, 1200, 'Bürobedarf'),
+        (4910, 1200, 'Porto und Versand'),
+        (4210, 1200, 'Miete {month}'),
+        (1200, 8200, 'Spende'),
+        (1200, 8300, 'Zuschuss Projekt'),
+        (1200, 940, 'Zahlung Rechnung'),
+        (940, 8400, 'Rechnung'),
+        (1360, 1200, 'Geldtransit'),
+    ]
+    COST_LOCATIONS = ['', '1100', '1200', '2301', '2302', '2310', '3100', '4500']
+    
+    def __init__(self, seed=42, date_from='2021-01-01', date_to='2025-12-31'):
+        """
+        Initialize the generator
+        
+        Args:
+            seed (int): Seed for the random generator, the same seed produces the same data set
+            date_from (str): First date of the generated data in YYYY-MM-DD format
+            date_to (str): Last date of the generated data in YYYY-MM-DD format
+        """
+        self.seed = seed
+        self.date_from = datetime.strptime(date_from, '%Y-%m-%d')
+        self.date_to = datetime.strptime(date_to, '%Y-%m-%d')
+        self.random = random.Random(seed)
+    
+    def _random_date(self):
+        """Random date between date_from and date_to"""
+        days = (self.date_to - self.date_from).days
+        return self.date_from + timedelta(days=self.random.randint(0, days))
+    
+    def generate_postings(self, count):
+        """
+        Generate postings with the fields of the /postings/get endpoint
+        
+        Args:
+            count (int): Number of postings
+        
+        Returns:
+            list: Posting dictionaries, all values as strings like in the API responses
+        """
+        postings = []
+        for i in range(1, count + 1):
+            debit, credit, text = self.random.choice(self.POSTING_PATTERNS)
+            date = self._random_date()
+            amount = round(self.random.lognormvariate(5, 1.2), 2)
+            postings.append({
+                'id_by_customer': str(i),
+                'booking_number': str(100000 + i),
+                'date': date.strftime('%Y-%m-%d 00:00:00'),
+                'date_vat_effective': date.strftime('%Y-%m-%d'),
+                'date_delivery': None,
+                'postingtext': text.format(month=date.strftime('%m/%Y')),
+                'amount': f"{amount:.2f}",
+                'currency': 'EUR',
+                'debit_postingaccount_number': str(debit),
+                'credit_postingaccount_number': str(credit),
+                'cost_location': self.random.choice(self.COST_LOCATIONS),
+                'tax_key': '0',
+                'vat': '0.00',
+                'credit_type': 'H',
+                'comment': '',
+                'transaction_id_by_customer': str(i) if credit == 1200 or debit == 1200 else None,
+                'transaction_purpose': text.format(month=date.strftime('%m/%Y')),
+            })
+        return postings
+    
+    def generate_transactions(self, count):
+        """
+        Generate bank transactions with the fields of the /transactions/get endpoint
+        
+        Args:
+            count (int): Number of transactions
+        
+        Returns:
+            list: Transaction dictionaries
+        """
+        transactions = []
+        for i in range(1, count + 1):
+            date = self._random_date()
+            amount = round(self.random.lognormvariate(5, 1.2), 2) * self.random.choice([1, -1])
+            transactions.append({
+                'id_by_customer': str(i),
+                'account': '1200',
+                'to_from': self.random.choice(['Stadtwerke', 'Krankenkasse', 'Finanzamt', 'Mitglied', 'Stiftung']),
+                'amount': f"{amount:.2f}",
+                'booking_date': date.strftime('%Y-%m-%d'),
+                'value_date': date.strftime('%Y-%m-%d'),
+                'purpose': f"Verwendungszweck {i}",
+                'currency': 'EUR',
+            })
+        return transactions
+    
+    def generate_receipts(self, count, list_direction='inbound'):
+        """
+        Generate receipts with the fields of the /receipts/get endpoint
+        
+        Args:
+            count (int): Number of receipts
+            list_direction (str): Either 'inbound' (Eingangsbelege) or 'outbound' (Ausgangsbelege)
+        
+        Returns:
+            list: Receipt dictionaries
+        """
+        receipts = []
+        offset = 0 if list_direction == 'inbound' else 500000
+        for i in range(1, count + 1):
+            date = self._random_date()
+            amount = round(self.random.lognormvariate(5, 1.2), 2)
+            receipts.append({
+                'filename': f"Beleg_{list_direction}_{i}",
+                'id_by_customer': str(offset + i),
+                'date': date.strftime('%Y-%m-%d'),
+                'delivery_date': None,
+                'counterparty': self.random.choice(['Stadtwerke', 'Bürohandel', 'Stiftung', 'Gemeinde']),
+                'invoicenumber': f"{date.year}{i:04d}",
+                'amount': f"{amount:.2f}",
+                'payment_date': (date + timedelta(days=14)).strftime('%Y-%m-%d'),
+                'due_date': None,
+                'account': '1600' if list_direction == 'inbound' else '940',
+                'amount_paid': '0.00',
+                'amount_paid_fixed': '0.00',
+                'deleted': '0',
+                'link_to_receipt_id_by_customer': None,
+            })
+        return receipts
+    
+    def accounts_from_postings(self, postings):
+        """
+        Derive the account list of the /accounts/get endpoint from the accounts used in postings
+        
+        Args:
+            postings (list): Posting dictionaries
+        
+        Returns:
+            list: Account dictionaries sorted by account number
+        """
+        numbers = set()
+        for posting in postings:
+            numbers.add(int(posting['debit_postingaccount_number']))
+            numbers.add(int(posting['credit_postingaccount_number']))
+        return [{'postingaccount_number': str(number), 'name': f"Konto {number}"} for number in sorted(numbers)]
+    
+    def generate(self, postings=10000, transactions=3000, receipts=1000):
+        """
+        Generate a complete data set in the format of the backup files
+        
+        Args:
+            postings (int): Number of postings
+            transactions (int): Number of transactions
+            receipts (int): Number of inbound and of outbound receipts
+        
+        Returns:
+            dict: Data set with postings, transactions, receipts (inbound/outbound) and accounts
+        """
+        generated_postings = self.generate_postings(postings)
+        return {
+            'metadata': {
+                'source': 'synthetic',
+                'seed': self.seed,
+                'date_range': {
+                    'from': self.date_from.strftime('%Y-%m-%d'),
+                    'to': self.date_to.strftime('%Y-%m-%d')
+                }
+            },
+            'postings': generated_postings,
+            'transactions': self.generate_transactions(transactions),
+            'receipts': {
+                'inbound': self.generate_receipts(receipts, 'inbound'),
+                'outbound': self.generate_receipts(receipts, 'outbound')
+            },
+            'accounts': self.accounts_from_postings(generated_postings)
+        }
\ No newline at end of file
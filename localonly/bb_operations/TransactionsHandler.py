@@ -1,5 +1,7 @@
 #!/usr/bin/env python3
 from ApiHandler import ApiHandler
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from rich.console import Console
 from rich.table import Table
@@ -11,37 +13,133 @@ class TransactionsHandler(ApiHandler):
         """Initialize with API credentials"""
         super().__init__(api_key, api_secret, api_client)
         self.endpoint = "/transactions/get"
+    
+    def get_by_date_range(self, date_from, date_to, limit=500, max_concurrency=4):
+        """
+        Get all transactions in a specific date range.
         
-    def get_by_date_range(self, date_from, date_to, limit=500):
+        Args:
+            date_from (str): Start date in YYYY-MM-DD format
+            date_to (str): End date in YYYY-MM-DD format
+            limit (int): Number of transactions per request (max 500)
+            max_concurrency (int): Number of date windows requested at the same time
+        
+        Returns:
+            dict: API response like structure with 'success', 'rows' and 'data' (or 'message')
+        """
+        try:
+            data = list(self.iter_by_date_range(date_from, date_to, limit, max_concurrency))
+        except Exception as e:
+            return {'success': False, 'message': str(e), 'rows': 0, 'data': []}
+        return {'success': True, 'rows': len(data), 'data': data}
+    
+    def iter_by_date_range(self, date_from, date_to, limit=500, max_concurrency=4, window_days=31):
         """
-        Get transactions in a specific date range.
+        Iterate over all transactions in a date range, without holding them all in memory
+        
+        The range is split into date windows that are requested concurrently. A window that returns
+        as many transactions as the limit may be truncated and is split in halves, a single day with
+        more transactions than the limit is paged with offsets.
         
         Args:
             date_from (str): Start date in YYYY-MM-DD format
             date_to (str): End date in YYYY-MM-DD format
-            limit (int): Number of transactions to retrieve (max 500)
-            
+            limit (int): Number of transactions per request (max 500)
+            max_concurrency (int): Number of date windows requested at the same time
+            window_days (int): Length of the initial date windows
+        
+        Yields:
+            dict: One transaction, windows in date order
+        
+        Raises:
+            RuntimeError: If a window could not be retrieved, so that results are never silently partial
+        """
+        start = datetime.strptime(date_from, '%Y-%m-%d')
+        end = datetime.strptime(date_to, '%Y-%m-%d')
+        pending = deque()
+        while start <= end:
+            window_end = min(start + timedelta(days=window_days - 1), end)
+            pending.append((start.strftime('%Y-%m-%d'), window_end.strftime('%Y-%m-%d')))
+            start = window_end + timedelta(days=1)
+        
+        seen_ids = set()
+        in_flight = deque()
+        with ThreadPoolExecutor(max_workers=max(1, max_concurrency)) as executor:
+            try:
+                while pending or in_flight:
+                    while pending and len(in_flight) < max(1, max_concurrency):
+                        window = pending.popleft()
+                        in_flight.append(executor.submit(self._fetch_window, *window, limit))
+                    
+                    transactions, halves = in_flight.popleft().result()
+                    if halves:
+                        # The halves come before all windows in flight, so they go to the front
+                        for window in reversed(halves):
+                            in_flight.appendleft(executor.submit(self._fetch_window, *window, limit))
+                        continue
+                    
+                    for transaction in transactions:
+                        transaction_id = transaction.get('id_by_customer')
+                        if transaction_id in seen_ids:
+                            continue
+                        seen_ids.add(transaction_id)
+                        yield transaction
+            finally:
+                for future in in_flight:
+                    future.cancel()
+    
+    def _fetch_window(self, date_from, date_to, limit):
+        """
+        Fetch the transactions of a date window
+        
         Returns:
-            dict: The API response containing transaction data
+            tuple: (list of transactions, None) if the window is complete,
+                   (None, list of two date windows) if it reached the limit and has to be split
+        """
+        transactions = self._request_window(date_from, date_to, limit)
+        if len(transactions) < limit:
+            return transactions, None
+        
+        start = datetime.strptime(date_from, '%Y-%m-%d')
+        end = datetime.strptime(date_to, '%Y-%m-%d')
+        if end > start:
+            middle = start + timedelta(days=(end - start).days // 2)
+            return None, [(date_from, middle.strftime('%Y-%m-%d')),
+                          ((middle + timedelta(days=1)).strftime('%Y-%m-%d'), date_to)]
+        
+        # A single day cannot be split further, page through it
+        page = transactions
+        while len(page) == limit:
+            page = self._request_window(date_from, date_to, limit, offset=len(transactions))
+            transactions.extend(page)
+        return transactions, None
+    
+    def _request_window(self, date_from, date_to, limit, offset=0):
+        """
+        Request one page of transactions of a date window
+        
+        Raises:
+            RuntimeError: If the page could not be retrieved
         """
-        # Request data
         data = {
             'api_key': self.api_key,
             'limit': limit,
+            'offset': offset,
             'date_from': date_from,
             'date_to': date_to
         }
-        
-        # Make the request
-        return self._make_request(self.endpoint, data)
-        
+        result = self._make_request(self.endpoint, data)
+        if not result.get('success') or not isinstance(result.get('data'), list):
+            raise RuntimeError(f"Failed to fetch transactions from {date_from} to {date_to}: {result.get('message', 'unknown error')}")
+        return result['data']
+    
     def get_latest(self, limit=5):
         """
         Get the latest transactions from the BB accounting system.
         
         Args:
             limit (int): Number of transactions to retrieve (max 500)
-            
+        
         Returns:
             dict: The API response containing transaction data
         """
@@ -60,7 +158,7 @@ class TransactionsHandler(ApiHandler):
         
         Args:
             transactions_data (list): List of transaction dictionaries
-            
+        
         Returns:
             rich.table.Table: Table object for display
         """
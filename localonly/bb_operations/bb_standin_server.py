@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+import argparse
+import glob
+import os
+import sys
+from rich.console import Console
+
+from BBStandInServer import BBStandInServer
+from SyntheticDataGenerator import SyntheticDataGenerator
+
+def parse_arguments():
+    """Parse the command line arguments"""
+    parser = argparse.ArgumentParser(
+        description="Local stand-in for the BuchhaltungsButler API, replays backups or synthetic data")
+    
+    source = parser.add_argument_group('data source')
+    source.add_argument('--backups', nargs='*', metavar='FILE',
+                        help="Backup or recording files to replay (default: backups/*.json)")
+    source.add_argument('--synthetic', type=int, metavar='POSTINGS',
+                        help="Generate a synthetic data set with this many postings instead of replaying backups")
+    source.add_argument('--transactions', type=int, default=3000, help="Synthetic transactions (default: 3000)")
+    source.add_argument('--receipts', type=int, default=1000, help="Synthetic receipts per direction (default: 1000)")
+    source.add_argument('--date-from', default='2021-01-01', help="First date of synthetic data")
+    source.add_argument('--date-to', default='2025-12-31', help="Last date of synthetic data")
+    source.add_argument('--scale', type=int, default=1, help="Multiply every record this many times (default: 1)")
+    source.add_argument('--save-dataset', metavar='FILE', help="Save the served data set for later replay")
+    
+    server = parser.add_argument_group('server')
+    server.add_argument('--host', default='127.0.0.1')
+    server.add_argument('--port', type=int, default=8765)
+    server.add_argument('--seed', type=int, default=42, help="Seed for data, jitter and error injection")
+    server.add_argument('--page-size', type=int, help="Maximum rows per response (default: limits of the real API)")
+    server.add_argument('--latency-ms', type=float, default=0, help="Fixed latency per response")
+    server.add_argument('--latency-per-row-ms', type=float, default=0, help="Additional latency per returned row")
+    server.add_argument('--jitter-ms', type=float, default=0, help="Random additional latency up to this value")
+    
+    errors = parser.add_argument_group('error injection (probability per request)')
+    errors.add_argument('--error-html', type=float, default=0, help="Answer with a 500 HTML error page")
+    errors.add_argument('--error-timeout', type=float, default=0, help="Do not answer within --hang-seconds")
+    errors.add_argument('--error-429', type=float, default=0, help="Answer with 429 and a Retry-After header")
+    errors.add_argument('--hang-seconds', type=float, default=30, help="Duration of an injected timeout")
+    errors.add_argument('--retry-after', type=int, default=1, help="Retry-After seconds of injected 429s")
+    
+    recorder = parser.add_argument_group('recorder mode')
+    recorder.add_argument('--record', metavar='FILE',
+                          help="Forward all requests to the real API and save the responses to FILE on exit")
+    recorder.add_argument('--upstream-url', default="https://app.buchhaltungsbutler.de/api/v1",
+                          help="URL of the real API in recorder mode")
+    return parser.parse_args()
+
+def load_dataset(args, console):
+    """Build the data set to serve from the command line arguments"""
+    if args.record:
+        if args.backups:
+            return BBStandInServer.load_backups(args.backups)
+        return {'metadata': {'source': 'recording', 'upstream': args.upstream_url}}
+    if args.synthetic is not None:
+        console.print(f"Generating synthetic data set with {args.synthetic} postings")
+        generator = SyntheticDataGenerator(args.seed, args.date_from, args.date_to)
+        dataset = generator.generate(args.synthetic, args.transactions, args.receipts)
+    else:
+        paths = args.backups or sorted(glob.glob(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'backups', '*.json')))
+        console.print(f"Replaying {len(paths)} backup files")
+        dataset = BBStandInServer.load_backups(paths)
+    return BBStandInServer.scale_dataset(dataset, args.scale)
+
+def create_upstream_client(args, console):
+    """Create the client of the real API for recorder mode"""
+    # The BB client is shared with the Azure Functions code in hrmlib
+    sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+    from hrmlib.bbclient import BBClient
+    from bookings_backup import load_api_credentials
+    
+    api_key, api_secret, api_client = load_api_credentials()
+    if not all([api_key, api_secret, api_client]):
+        console.print("[bold red]Error: Missing API credentials. Please check your environment file.[/]")
+        sys.exit(1)
+    return BBClient(base_url=args.upstream_url, api_key=api_key, api_client=api_client,
+                    api_secret=api_secret, api_version='1.8.1', json_payload=False, timeout=60)
+
+def main():
+    """Run the BuchhaltungsButler API stand-in until Ctrl+C"""
+    console = Console()
+    console.rule("[bold blue]BuchhaltungsButler API Stand-in[/]")
+    args = parse_arguments()
+    
+    dataset = load_dataset(args, console)
+    upstream = create_upstream_client(args, console) if args.record else None
+    server = BBStandInServer(
+        dataset,
+        host=args.host,
+        port=args.port,
+        latency_ms=args.latency_ms,
+        latency_per_row_ms=args.latency_per_row_ms,
+        jitter_ms=args.jitter_ms,
+        page_size=args.page_size,
+        error_rates={'html': args.error_html, 'timeout': args.error_timeout, '429': args.error_429},
+        hang_seconds=args.hang_seconds,
+        retry_after=args.retry_after,
+        seed=args.seed,
+        upstream=upstream,
+        console=console
+    )
+    if args.save_dataset:
+        server.save_dataset(args.save_dataset)
+    
+    base_url = server.start()
+    receipts = server.dataset['receipts']
+    console.print(f"Serving {len(server.dataset['postings'])} postings, {len(server.dataset['transactions'])} transactions, "
+                  f"{len(receipts['inbound'])}/{len(receipts['outbound'])} inbound/outbound receipts "
+                  f"and {len(server.dataset['accounts'])} accounts")
+    console.print(f"[bold green]Listening on {base_url}[/] "
+                  f"(set BB_API_BASE_URL or bb_api.base_url to this URL), stop with Ctrl+C")
+    if args.record:
+        console.print(f"[yellow]Recorder mode: forwarding to {args.upstream_url}[/]")
+    
+    try:
+        server.thread.join()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.shutdown()
+        console.print(server.create_stats_table())
+        if args.record:
+            server.save_dataset(args.record)
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Compare the Excel reader engines on the instruction and expected bookings workbooks.
+
+Download the workbooks from the financialplanning container first, then run from the repository root:
+
+    python localonly/excel_reader_benchmark.py "Instructions.xlsx" "Budget Plans.xlsx" "Expected Bookings.xlsx"
+
+"per-sheet openpyxl" is how the workbooks were read before: one pd.read_excel call per sheet of a pd.ExcelFile.
+The single pass engines are checked against it, so a faster engine that reads different values shows up.
+"""
+import argparse
+import os
+import sys
+import time
+from io import BytesIO
+
+import pandas as pd
+from rich.console import Console
+from rich.table import Table
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from hrmlib.hrmtools import read_all_sheets  # noqa: E402
+
+console = Console()
+
+
+def read_per_sheet(data):
+    """Read all sheets the way download_all_sheets did before the single pass reader"""
+    workbook = pd.ExcelFile(BytesIO(data), engine='openpyxl')
+    return {sheet: pd.read_excel(workbook, engine='openpyxl', sheet_name=sheet) for sheet in workbook.sheet_names}
+
+
+def available_readers():
+    """Readers to compare, calamine only if python-calamine is installed"""
+    readers = {
+        'per-sheet openpyxl': read_per_sheet,
+        'openpyxl': lambda data: read_all_sheets(data, 'openpyxl'),
+    }
+    try:
+        import python_calamine  # noqa: F401
+        readers['calamine'] = lambda data: read_all_sheets(data, 'calamine')
+    except ImportError:
+        console.print("[yellow]python-calamine is not installed, skipping the calamine engine[/]")
+    return readers
+
+
+def compare(reference, sheets):
+    """Names of the sheets that differ from the reference"""
+    if set(reference) != set(sheets):
+        return sorted(set(reference) ^ set(sheets))
+    return [name for name in reference if not reference[name].equals(sheets[name])]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('workbooks', nargs='+', help="Paths of the .xlsx workbooks")
+    parser.add_argument('--repeat', type=int, default=3, help="Runs per engine, the fastest one is reported")
+    args = parser.parse_args()
+
+    readers = available_readers()
+    table = Table(title="Excel readers")
+    table.add_column("Workbook", style="cyan")
+    table.add_column("Sheets", justify="right")
+    for name in readers:
+        table.add_column(f"{name} [s]", justify="right", style="magenta")
+    table.add_column("Differences", style="yellow")
+
+    for path in args.workbooks:
+        with open(path, 'rb') as f:
+            data = f.read()
+        timings, results = {}, {}
+        for name, reader in readers.items():
+            best = None
+            for _ in range(max(1, args.repeat)):
+                start = time.perf_counter()
+                results[name] = reader(data)
+                elapsed = time.perf_counter() - start
+                best = elapsed if best is None else min(best, elapsed)
+            timings[name] = best
+
+        reference = results['per-sheet openpyxl']
+        differences = []
+        for name, sheets in results.items():
+            differing = compare(reference, sheets)
+            if differing:
+                differences.append(f"{name}: {', '.join(differing)}")
+        table.add_row(os.path.basename(path), str(len(reference)),
+                      *[f"{timings[name]:.3f}" for name in readers], "; ".join(differences) or "none")
+
+    console.print(table)
+
+
+if __name__ == "__main__":
+    main()